@@ -0,0 +1,124 @@
+"""Capture benchmark: how often checks reuse a frame instead of grabbing.
+
+Replays a stream of condition checks against FrameCapture and
+BackgroundCapture with a fake grab function serving a synthetic screen
+(``--grab-ms`` adds the cost of a real screenshot). Checks alternate
+between a full-frame read (an image search) and a three-point pixel
+sample, ``--gap-ms`` apart, and every ``--input-every`` checks an input
+action invalidates the frame, as a click or key press does in a run.
+
+For FrameCapture each (freshness window, gap) pair reports the hit rate
+(checks served from a cached frame or pixel box), grabs made and mean check
+latency. For BackgroundCapture each (fps, gap) pair reports how many reads
+had to wait for a post-input frame and the mean read latency.
+
+    python benchmarks/bench_capture.py --screen 1080p --checks 100 --out benchmarks/results/capture.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from automation_maker2.capture import BackgroundCapture, FrameCapture  # noqa: E402
+from bench_matcher import parse_screens, synthetic_screen  # noqa: E402
+
+MAX_AGES_MS = (0, 30, 100)
+GAPS_MS = (0, 10, 40)
+FPS = (20, 60)
+
+
+def fake_grab(screen, grab_ms):
+    def grab(region=None):
+        if grab_ms:
+            time.sleep(grab_ms / 1000)
+        if region is None:
+            return screen.copy()  # a new object per grab, like a real screenshot
+        left, top, width, height = region
+        return screen.crop((left, top, left + width, top + height))
+    return grab
+
+
+def replay(capture, screen, checks, gap_ms, input_every):
+    """Run the check stream; returns the mean check latency in ms."""
+    width, height = screen.size
+    points = [(width // 4, height // 4), (width // 4 + 40, height // 4 + 8), (width // 4 + 12, height // 4 + 30)]
+    spent = 0.0
+    for i in range(checks):
+        if input_every and i and i % input_every == 0:
+            capture.invalidate()
+        t0 = time.perf_counter()
+        if i % 2:
+            capture.sample(points)
+        else:
+            capture.frame()
+        spent += time.perf_counter() - t0
+        if gap_ms:
+            time.sleep(gap_ms / 1000)
+    return spent * 1000 / checks
+
+
+def bench_frame_capture(screen, checks, grab_ms, input_every):
+    rows = []
+    for max_age_ms in MAX_AGES_MS:
+        for gap_ms in GAPS_MS:
+            capture = FrameCapture(max_age_s=max_age_ms / 1000, grab=fake_grab(screen, grab_ms))
+            mean_ms = replay(capture, screen, checks, gap_ms, input_every)
+            rows.append({"max_age_ms": max_age_ms, "gap_ms": gap_ms, "checks": checks,
+                         "hit_rate": capture.reuses / checks, "full_grabs": capture.grabs,
+                         "box_grabs": capture.box_grabs, "check_ms_mean": mean_ms})
+    return rows
+
+
+def bench_background_capture(screen, checks, grab_ms, input_every):
+    rows = []
+    for fps in FPS:
+        for gap_ms in GAPS_MS:
+            capture = BackgroundCapture(fps=fps, grab=fake_grab(screen, grab_ms))
+            capture.start()
+            try:
+                capture.frame()  # wait for the first frame so start-up is not counted
+                capture.reads = capture.fresh_waits = 0
+                mean_ms = replay(capture, screen, checks, gap_ms, input_every)
+            finally:
+                capture.stop()
+            stats = capture.stats()
+            rows.append({"fps": fps, "gap_ms": gap_ms, "checks": checks, "reads": stats["reads"],
+                         "fresh_waits": stats["fresh_waits"], "wait_rate": stats["fresh_waits"] / max(1, stats["reads"]),
+                         "frames": stats["frames"], "check_ms_mean": mean_ms})
+    return rows
+
+
+def collect(screen_size, checks, grab_ms, input_every):
+    width, height = screen_size
+    screen = synthetic_screen(width, height)
+    return {"benchmark": "capture", "python": sys.version.split()[0], "screen": f"{width}x{height}",
+            "grab_ms": grab_ms, "input_every": input_every,
+            "frame_capture": bench_frame_capture(screen, checks, grab_ms, input_every),
+            "background_capture": bench_background_capture(screen, checks, grab_ms, input_every)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--screen", default="1080p", help="Synthetic screen size WIDTHxHEIGHT or a preset (1080p, 1440p, 4k).")
+    parser.add_argument("--checks", type=int, default=100, help="Checks replayed per configuration.")
+    parser.add_argument("--grab-ms", type=float, default=15.0, help="Simulated cost of one screenshot.")
+    parser.add_argument("--input-every", type=int, default=5, help="Invalidate the frame every N checks (0: never).")
+    parser.add_argument("--out", default=None, help="Write results as JSON to this path.")
+    args = parser.parse_args(argv)
+
+    results = collect(parse_screens(args.screen)[0], args.checks, args.grab_ms, args.input_every)
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Engine benchmark: compile time and dispatch overhead per step.
+
+Builds synthetic programs of ``--steps`` steps (10,000 by default) and runs
+them once each against the fake input backend (fake_backend.py), so no
+display or real mouse/keyboard is touched:
+
+- ``wait``: zero-length Waits, the cheapest handler;
+- ``input``: Press Key, Keyboard Input, Hotkey Combo, Click (region) and
+  Scroll in turn, each invalidating the capture;
+- ``branch``: If Pixel Color on a synthetic screen alternating with Goto
+  Step, both jumping to the next step;
+- ``mixed``: all of the above interleaved.
+
+Each program is run with engine logging at WARNING (no per-step records),
+at INFO (a record per step, formatted on the listener thread with no
+output attached) and at WARNING with a RunTrace attached. ``handler_us``
+calls every compiled handler directly in order; ``dispatch_us`` is what
+the engine loop (events, logging, statistics, tracing) adds on top.
+
+    python benchmarks/bench_engine.py --steps 10000 --runs 3 --out benchmarks/results/engine.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fake_backend  # noqa: E402
+from bench_matcher import synthetic_screen  # noqa: E402
+
+PROGRAMS = ("wait", "input", "branch", "mixed")
+CONFIGS = (("warning", "WARNING", False), ("info", "INFO", False), ("warning+trace", "WARNING", True))
+POINT = (300, 200)
+
+
+def _input_steps():
+    return [{"action": "Press Key", "params": {"key_to_press": "tab"}},
+            {"action": "Keyboard Input", "params": {"text_to_type": "abc", "interval": 0}},
+            {"action": "Hotkey Combo", "params": {"selected_hotkey_name": "Switch Apps (Alt+Tab)"}},
+            {"action": "Click", "object_name": "button", "params": {"clicks": 1}},
+            {"action": "Scroll", "params": {"direction": "down", "amount": 3}}]
+
+
+def synthetic_program(kind, count, screen):
+    """(steps, objects) for a program of ``count`` steps; every jump goes to the next step."""
+    objects = {"button": {"type": "region", "coords": [100, 100, 80, 30]},
+               "point": {"type": "pointRGB", "coords": list(POINT), "rgb": list(screen.getpixel(POINT)[:3])}}
+    inputs = _input_steps()
+    steps = []
+    for i in range(count):
+        role = kind if kind != "mixed" else ("wait", "input", "pixel", "goto")[i % 4]
+        if role == "branch":
+            role = "pixel" if i % 2 == 0 else "goto"
+        if role == "wait" or i == count - 1:  # the last step has nothing to jump to
+            steps.append({"action": "Wait", "params": {"duration_s": 0}})
+        elif role == "input":
+            steps.append(inputs[i % len(inputs)] if kind == "input" else inputs[i // 4 % len(inputs)])
+        elif role == "pixel":
+            steps.append({"action": "If Pixel Color", "params": {"condition_object_name": "point",
+                                                                 "then_step": i + 2, "else_step": i + 2}})
+        else:
+            steps.append({"action": "Goto Step", "params": {"target_step": i + 2}})
+    return steps, objects
+
+
+def bench_program(kind, count, screen, runs):
+    from automation_maker2.engine import SequenceEngine
+    from automation_maker2.tracing import RunTrace
+    steps, objects = synthetic_program(kind, count, screen)
+    compile_ms, handler_us = [], []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        engine = SequenceEngine(steps, objects, log_level="WARNING")
+        compile_ms.append((time.perf_counter() - t0) * 1000)
+        engine.capture.start()
+        for step in engine.program[:100]:
+            step.run()  # warm up first-call costs (imports, the first grab)
+        t0 = time.perf_counter()
+        for step in engine.program:
+            step.run()
+        handler_us.append((time.perf_counter() - t0) * 1e6 / count)
+        engine.capture.stop()
+    row = {"program": kind, "steps": count, "compile_ms": statistics.median(compile_ms),
+           "handler_us": statistics.median(handler_us)}
+    for label, level, traced in CONFIGS:
+        per_step = []
+        for _ in range(runs):
+            engine = SequenceEngine(steps, objects, log_level=level, trace=RunTrace(kind) if traced else None)
+            t0 = time.perf_counter()
+            reason = engine.run()
+            wall = time.perf_counter() - t0
+            executed = sum(a.count for a in engine.stats.by_action.values())
+            if reason != "completed" or executed != count:
+                raise RuntimeError(f"{kind} program ended '{reason}' after {executed} of {count} steps")
+            per_step.append(wall * 1e6 / executed)
+        row[f"{label}_step_us"] = statistics.median(per_step)
+        row[f"{label}_dispatch_us"] = statistics.median(per_step) - row["handler_us"]
+    return row
+
+
+def collect(count, runs):
+    backend = fake_backend.install(synthetic_screen(1920, 1080))
+    from automation_maker2 import logs
+    logs.configure(level="WARNING", console=False)
+    try:
+        rows = [bench_program(kind, count, backend.screen, runs) for kind in PROGRAMS]
+    finally:
+        logs.shutdown()
+    return {"benchmark": "engine", "python": sys.version.split()[0], "steps": count, "runs": runs,
+            "input_calls": dict(backend.calls), "programs": rows}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=10000, help="Steps per synthetic program.")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--out", default=None, help="Write results as JSON to this path.")
+    args = parser.parse_args(argv)
+
+    results = collect(args.steps, args.runs)
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Matcher benchmark: built-in NumPy NCC against pyautogui.locate.
+
+Builds a synthetic screen for each requested resolution (``1080p``,
+``1440p`` and ``4k`` by default), cuts templates of several sizes out of it and
+times a full-frame and a region-of-interest search with each backend, plus
+the NumPy coarse-to-fine (pyramid) mode. The pyautogui backend is skipped
+when pyscreeze cannot do confidence matching (it needs OpenCV for
+``confidence=``). Every result records whether it found the template.
+
+``--validate N`` also checks the pyramid search against the full-resolution
+search on a corpus of N random templates per screen: the pyramid must find
+a match scoring as high as the full search's best.
+
+    python benchmarks/bench_matcher.py --screen 1080p,2560x1440 --runs 5 --validate 20 --out benchmarks/results/matcher.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from automation_maker2.matcher import NumpyMatcher, PyAutoGUIMatcher  # noqa: E402
+
+TEMPLATE_SIZES = ((8, 8), (32, 24), (96, 64), (200, 120))
+ROI_PADDING = 64
+SCREEN_PRESETS = {"1080p": (1920, 1080), "1440p": (2560, 1440), "4k": (3840, 2160)}
+
+
+def parse_screens(text):
+    """``"1080p,1280x720"`` -> [(1920, 1080), (1280, 720)]; presets are 1080p, 1440p and 4k."""
+    screens = []
+    for item in text.lower().split(","):
+        item = item.strip()
+        screens.append(SCREEN_PRESETS.get(item) or tuple(int(v) for v in item.split("x")))
+    return screens
+
+
+def synthetic_screen(width, height, seed=0):
+    """Overlapping outlined panels with labels on a dark background, roughly like a desktop."""
+    import random
+    from PIL import Image, ImageDraw
+    rng = random.Random(seed)
+    image = Image.new("RGB", (width, height), (30, 30, 36))
+    draw = ImageDraw.Draw(image)
+    for i in range(width * height // 5000):
+        x, y = rng.randrange(width), rng.randrange(height)
+        w, h = rng.randint(20, 300), rng.randint(10, 120)
+        colour = lambda: tuple(rng.randrange(256) for _ in range(3))
+        draw.rectangle((x, y, x + w, y + h), fill=colour(), outline=colour())
+        draw.text((x + 3, y + 3), f"Button {i}", fill=(255, 255, 255))
+    return image
+
+
+def _time(fn, runs):
+    samples, result = [], None
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return {"median_ms": statistics.median(samples), "min_ms": min(samples), "runs": runs}, result
+
+
+def _pyautogui_usable(screen):
+    try:
+        needle = screen.crop((0, 0, 4, 4))
+        PyAutoGUIMatcher().find(needle, screen.crop((0, 0, 16, 16)), None, 0.9)
+        return True
+    except Exception:
+        return False
+
+
+def bench(width, height, runs, confidence):
+    screen = synthetic_screen(width, height)
+    backends = [NumpyMatcher()]
+    if _pyautogui_usable(screen):
+        backends.append(PyAutoGUIMatcher())
+    results = []
+    for tw, th in TEMPLATE_SIZES:
+        x, y = min(width * 2 // 3, width - tw), min(height * 3 // 4, height - th)
+        template = screen.crop((x, y, x + tw, y + th))
+        roi = (x - ROI_PADDING, y - ROI_PADDING, x + tw + ROI_PADDING, y + th + ROI_PADDING)
+        row = {"template": f"{tw}x{th}", "expected": [x, y]}
+        modes = [(m, False) for m in backends] + [(backends[0], True)]
+        for matcher, pyramid in modes:
+            prepared = matcher.prepare(template)
+            for label, region in (("full", None), ("roi", roi)):
+                timing, (box, score) = _time(
+                    lambda: matcher.find(prepared, screen, region, confidence, pyramid=pyramid), runs)
+                timing["found"] = list(box[:2]) if box else None
+                timing["score"] = score
+                # Flat templates can tie at several places; any spot with identical pixels is correct
+                timing["correct"] = bool(box) and screen.crop(
+                    (box[0], box[1], box[0] + tw, box[1] + th)).tobytes() == template.tobytes()
+                row[f"{matcher.name}{'_pyramid' if pyramid else ''}_{label}"] = timing
+        results.append(row)
+    return {"screen": f"{width}x{height}", "backends": [m.name for m in backends], "cases": results}
+
+
+def validate_pyramid(width, height, per_screen, confidence, screens=3):
+    """Compare pyramid and full-resolution results on random templates."""
+    import random
+    matcher = NumpyMatcher()
+    agree, failures, full_ms, pyramid_ms = 0, [], 0.0, 0.0
+    for seed in range(screens):
+        screen = synthetic_screen(width, height, seed)
+        rng = random.Random(seed + 1000)
+        for _ in range(per_screen):
+            tw, th = rng.choice(TEMPLATE_SIZES[1:] + ((40, 24), (64, 64), (150, 40)))
+            x, y = rng.randrange(width - tw), rng.randrange(height - th)
+            prepared = matcher.prepare(screen.crop((x, y, x + tw, y + th)))
+            t0 = time.perf_counter()
+            _, full_score = matcher.find(prepared, screen, None, confidence)
+            t1 = time.perf_counter()
+            box, score = matcher.find(prepared, screen, None, confidence, pyramid=True)
+            full_ms += (t1 - t0) * 1000
+            pyramid_ms += (time.perf_counter() - t1) * 1000
+            # Flat templates can tie at several places; any spot scoring as well as the full search counts
+            if box is not None and score >= full_score - 1e-6:
+                agree += 1
+            else:
+                failures.append({"screen": seed, "template": f"{tw}x{th}", "at": [x, y],
+                                 "pyramid_found": list(box[:2]) if box else None})
+    total = screens * per_screen
+    return {"cases": total, "agree": agree, "failures": failures,
+            "full_ms_mean": full_ms / total, "pyramid_ms_mean": pyramid_ms / total}
+
+
+def collect(screens, runs, confidence, validate=0):
+    """Results for every (width, height) in ``screens``."""
+    results = []
+    for width, height in screens:
+        result = bench(width, height, runs, confidence)
+        if validate:
+            result["pyramid_validation"] = validate_pyramid(width, height, validate, confidence)
+        results.append(result)
+    return {"benchmark": "matcher", "python": sys.version.split()[0], "screens": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--screen", default="1080p,1440p,4k",
+                        help="Comma-separated screen sizes: WIDTHxHEIGHT or a preset (1080p, 1440p, 4k).")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--confidence", type=float, default=0.9)
+    parser.add_argument("--validate", type=int, default=0, metavar="N",
+                        help="Validate pyramid against full search on N random templates per screen.")
+    parser.add_argument("--out", default=None, help="Write results as JSON to this path.")
+    args = parser.parse_args(argv)
+
+    results = collect(parse_screens(args.screen), args.runs, args.confidence, args.validate)
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Match pool benchmark: Wait for Any Image latency by worker process count.
+
+Saves a set of templates cut from a synthetic screen, then times one
+``ImageLocator.locate_any`` call over all of them (what one Wait for Any
+Image poll does) with in-process threads and with a MatchPool of 1, 2, 4,
+... worker processes. Each run matches against a new frame object, so the
+pool republishes the frame to shared memory every time, as it would for a
+new screen grab. Results include the speed-up over one worker and how many
+runs found a match.
+
+    python benchmarks/bench_matchpool.py --screen 1920x1080 --templates 16 --workers 1,2,4,8,16 --out benchmarks/results/matchpool.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from automation_maker2.locator import ImageLocator, ImageTarget  # noqa: E402
+from automation_maker2.templates import TemplateCache  # noqa: E402
+from bench_matcher import parse_screens, synthetic_screen  # noqa: E402
+
+TEMPLATE_SIZES = ((32, 24), (96, 64), (200, 120))
+
+
+def make_targets(screen, count, directory, pyramid):
+    """Templates cut from random spots; none has a capture box, so every search is full-frame."""
+    import random
+    rng = random.Random(7)
+    width, height = screen.size
+    targets = []
+    for i in range(count):
+        tw, th = TEMPLATE_SIZES[i % len(TEMPLATE_SIZES)]
+        x, y = rng.randrange(width - tw), rng.randrange(height - th)
+        path = os.path.join(directory, f"t{i}.png")
+        screen.crop((x, y, x + tw, y + th)).save(path)
+        targets.append(ImageTarget(f"t{i}", path, padding=-1, backend="numpy", pyramid=pyramid))
+    return targets
+
+
+def bench(screen, targets, processes, runs, confidence):
+    locator = ImageLocator(None, TemplateCache(), processes=processes)
+    requests = [(target, confidence) for target in targets]
+    try:
+        locator.start()
+        locator.locate_any(requests, frame=screen.copy())  # warm template caches in every worker
+        samples, found = [], 0
+        for _ in range(runs):
+            frame = screen.copy()
+            t0 = time.perf_counter()
+            result = locator.locate_any(requests, frame=frame)
+            samples.append((time.perf_counter() - t0) * 1000)
+            found += result is not None
+    finally:
+        locator.close()
+    return {"median_ms": statistics.median(samples), "min_ms": min(samples), "runs": runs, "found": found}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--screen", default="1920x1080", help="Synthetic screen size WIDTHxHEIGHT or a preset (1080p, 1440p, 4k).")
+    parser.add_argument("--templates", type=int, default=16, help="Templates checked per poll.")
+    parser.add_argument("--workers", default=None,
+                        help="Comma-separated worker counts (default: powers of two up to the CPU count).")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--confidence", type=float, default=0.9)
+    parser.add_argument("--pyramid", action="store_true", help="Use coarse-to-fine search.")
+    parser.add_argument("--out", default=None, help="Write results as JSON to this path.")
+    args = parser.parse_args(argv)
+
+    cpus = os.cpu_count() or 1
+    if args.workers:
+        counts = [int(v) for v in args.workers.split(",")]
+    else:
+        counts = [n for n in (1, 2, 4, 8, 16, 32, 64) if n <= cpus] or [1]
+    width, height = parse_screens(args.screen)[0]
+    screen = synthetic_screen(width, height)
+    with tempfile.TemporaryDirectory() as directory:
+        targets = make_targets(screen, args.templates, directory, args.pyramid)
+        threads = bench(screen, targets, 0, args.runs, args.confidence)
+        scaling = []
+        for n in counts:
+            row = {"workers": n, **bench(screen, targets, n, args.runs, args.confidence)}
+            scaling.append(row)
+    one = next((row["median_ms"] for row in scaling if row["workers"] == 1), None)
+    for row in scaling:
+        row["speedup_vs_1"] = one / row["median_ms"] if one else None
+    results = {"benchmark": "matchpool", "python": sys.version.split()[0], "cpus": cpus,
+               "screen": f"{width}x{height}", "templates": args.templates, "pyramid": args.pyramid,
+               "threads": threads, "processes": scaling}
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Sequence file benchmark: save, load and compile time for large sequences.
+
+Writes synthetic sequences of 1,000 to 50,000 steps (the ``mixed`` program
+of bench_engine.py with every tenth step an If Image Found on one of
+``--objects`` image objects) the way the editor saves them
+(``json.dump(..., indent=4)``), then times ``engine.load_sequence_file``
+(parse and resolve image paths) and ``engine.load_engine`` (load and
+compile). Uses the fake input backend, so no display is needed.
+
+    python benchmarks/bench_sequence_io.py --steps 1000,10000,50000 --out benchmarks/results/sequence_io.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fake_backend  # noqa: E402
+from bench_engine import synthetic_program  # noqa: E402
+from bench_matcher import synthetic_screen  # noqa: E402
+
+
+def synthetic_sequence(count, object_count, screen, directory):
+    """A saved-sequence dict whose image objects point at one template in ``directory``."""
+    steps, objects = synthetic_program("mixed", count, screen)
+    screen.crop((500, 400, 560, 430)).save(os.path.join(directory, "template.png"))
+    for n in range(object_count):
+        objects[f"image{n}"] = {"type": "image", "image_path": "template.png", "confidence": 0.9,
+                                "capture_coords": [500, 400, 60, 30]}
+    for i in range(0, count - 1, 10):
+        steps[i] = {"action": "If Image Found", "params": {"condition_object_name": f"image{i // 10 % object_count}",
+                                                           "then_step": i + 2, "else_step": i + 2}}
+    return {"sequence_name": f"synthetic-{count}", "loop_count": 1, "objects": objects, "steps": steps}
+
+
+def bench(count, object_count, screen, runs):
+    from automation_maker2.engine import load_engine, load_sequence_file
+    save_ms, load_ms, engine_ms = [], [], []
+    with tempfile.TemporaryDirectory() as directory:
+        data = synthetic_sequence(count, object_count, screen, directory)
+        path = os.path.join(directory, "sequence.json")
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            with open(path, "w") as f:
+                json.dump(data, f, indent=4)
+            t1 = time.perf_counter()
+            loaded = load_sequence_file(path)
+            t2 = time.perf_counter()
+            engine = load_engine(path)
+            t3 = time.perf_counter()
+            save_ms.append((t1 - t0) * 1000); load_ms.append((t2 - t1) * 1000); engine_ms.append((t3 - t2) * 1000)
+        if len(loaded["steps"]) != count or len(engine.program) != count:
+            raise RuntimeError(f"round trip of {count} steps lost steps")
+        size = os.path.getsize(path)
+    return {"steps": count, "objects": len(data["objects"]), "file_kb": round(size / 1024, 1),
+            "save_ms": statistics.median(save_ms), "load_ms": statistics.median(load_ms),
+            "load_engine_ms": statistics.median(engine_ms), "runs": runs}
+
+
+def collect(counts, object_count, runs):
+    backend = fake_backend.install(synthetic_screen(1920, 1080))
+    from automation_maker2 import logs
+    logs.configure(level="ERROR", console=False)
+    try:
+        rows = [bench(count, object_count, backend.screen, runs) for count in counts]
+    finally:
+        logs.shutdown()
+    return {"benchmark": "sequence_io", "python": sys.version.split()[0], "sizes": rows}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", default="1000,10000,50000", help="Comma-separated sequence lengths.")
+    parser.add_argument("--objects", type=int, default=200, help="Image objects per sequence.")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--out", default=None, help="Write results as JSON to this path.")
+    args = parser.parse_args(argv)
+
+    results = collect([int(v) for v in args.steps.split(",")], args.objects, args.runs)
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Startup benchmark: time-to-first-window for the GUI.
+
+Launches ``python -m automation_maker2 --exit-after-startup`` several times
+and records the time the app reports from process start to the main window
+being mapped, plus the wall time of the whole process. Needs a display
+(use ``xvfb-run`` on headless Linux).
+
+    python benchmarks/bench_startup.py --runs 5 --out benchmarks/results/startup.json
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, "src")
+
+
+def _env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = SRC + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def measure_gui(runs):
+    first_window_ms, wall_ms = [], []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        out = subprocess.run([sys.executable, "-m", "automation_maker2", "--exit-after-startup"],
+                             capture_output=True, text=True, env=_env(), cwd=ROOT, timeout=60)
+        wall_ms.append((time.perf_counter() - t0) * 1000)
+        m = re.search(r"Time to first window: ([\d.]+) ms", out.stdout)
+        if not m:
+            raise RuntimeError(f"GUI did not report startup time:\n{out.stdout}\n{out.stderr}")
+        first_window_ms.append(float(m.group(1)))
+    return {"time_to_first_window_ms": _summary(first_window_ms), "process_wall_ms": _summary(wall_ms)}
+
+
+def _summary(values):
+    return {"median": statistics.median(values), "min": min(values), "max": max(values), "runs": len(values)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--out", default=None, help="Write results as JSON to this path.")
+    args = parser.parse_args(argv)
+
+    results = {"benchmark": "startup", "python": sys.version.split()[0], "gui": measure_gui(args.runs)}
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""Step Creator responsiveness: latency and widget counts of editing operations.
+
+Builds the real app (DesktopAutomationApp) with a StepCreatorFrame, then for
+each sequence length (100, 1,000 and 5,000 steps by default) times:
+
+- ``clear_and_rebuild_steps`` loading the whole sequence (what Load does);
+- ``add_step_row`` appending a step and inserting one in the middle;
+- scrolling to the middle of the list;
+- ``move_step_up`` / ``move_step_down`` on the middle row;
+- ``add_object``, ``rename_object`` of the object every seventh step clicks and
+  ``delete_object`` of an unused one (each an object event that touches only
+  the steps using the object), and a full ``refresh_object_dropdowns``;
+- ``Sequence.to_data`` (what Save writes; the editor's rows write through
+  to the model, so there is no collection pass before saving or running);
+- ``set_theme_mode`` to light and back to dark (ttk restyling plus the
+  registered Tk widgets, so it should not grow with the sequence);
+- ``add_delay_between_rows`` ("+ delay after every row", last as it grows
+  the list).
+
+Each operation reports ``call_ms`` (the call itself) and ``settled_ms``
+(until Tk has processed the resulting geometry and redraw work, i.e. until
+the user sees the result), plus the number of widgets under the step list
+after the rebuild. A size whose rebuild is projected to take longer than
+``--budget-s`` (from how the smaller sizes scaled) is reported as skipped.
+
+Needs an X display. On Linux without one, a private Xvfb is started for the
+run when the Xvfb binary is installed; otherwise use ``xvfb-run``.
+
+    python benchmarks/bench_step_creator.py --steps 100,1000,5000 --out benchmarks/results/step_creator.json
+"""
+import argparse
+import json
+import math
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+XVFB_SCREEN = "1920x1080x24"
+
+
+def start_xvfb():
+    """Start a private Xvfb and point DISPLAY at it when there is no display; returns the process or None."""
+    if os.environ.get("DISPLAY") or not sys.platform.startswith("linux"):
+        return None
+    xvfb = shutil.which("Xvfb")
+    if not xvfb:
+        sys.exit("No X display and no Xvfb binary; install Xvfb or run under xvfb-run.")
+    read_fd, write_fd = os.pipe()
+    # -displayfd makes the server pick a free display number and write it to the pipe once it is ready
+    process = subprocess.Popen([xvfb, "-displayfd", str(write_fd), "-screen", "0", XVFB_SCREEN, "-nolisten", "tcp"],
+                               pass_fds=(write_fd,), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as pipe:
+        number = pipe.readline().strip()
+    if not number:
+        process.kill()
+        sys.exit("Xvfb did not start.")
+    os.environ["DISPLAY"] = f":{number}"
+    return process
+
+
+OBJECTS = {
+    "button": {"type": "region", "coords": [100, 100, 80, 30]},
+    "status": {"type": "pointRGB", "coords": [300, 200], "rgb": [40, 200, 40]},
+    "logo": {"type": "image", "image_path": "images/logo.png", "confidence": 0.9},
+}
+
+
+def synthetic_steps(count):
+    """A realistic mix of step kinds, so rows carry their usual parameter widgets."""
+    kinds = [
+        {"object_name": None, "action": "Wait", "params": {"duration_s": 0.5}},
+        {"object_name": "button", "action": "Click", "params": {"button": "left", "clicks": 1}},
+        {"object_name": None, "action": "Keyboard Input", "params": {"text_to_type": "hello", "interval": 0.01}},
+        {"object_name": None, "action": "Press Key", "params": {"key_to_press": "enter"}},
+        {"object_name": "logo", "action": "Wait for Image", "params": {"timeout_s": 5, "confidence": 0.9}},
+        {"object_name": None, "action": "If Pixel Color", "params": {"condition_object_name": "status", "then_step": 1, "else_step": None}},
+        {"object_name": None, "action": "Goto Step", "params": {"target_step": 1}},
+    ]
+    return [dict(kinds[i % len(kinds)], params=dict(kinds[i % len(kinds)]["params"])) for i in range(count)]
+
+
+def count_widgets(widget):
+    stack, total = list(widget.winfo_children()), 0
+    while stack:
+        child = stack.pop()
+        total += 1
+        stack.extend(child.winfo_children())
+    return total
+
+
+def timed(root, fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    fn(*args, **kwargs)
+    t1 = time.perf_counter()
+    root.update()
+    t2 = time.perf_counter()
+    return {"call_ms": (t1 - t0) * 1000, "settled_ms": (t2 - t0) * 1000}
+
+
+def median_of(samples):
+    return {key: statistics.median(s[key] for s in samples) for key in samples[0]}
+
+
+def make_app():
+    import tkinter as tk
+    from tkinter import ttk
+    from automation_maker2.app import DesktopAutomationApp
+    root = tk.Tk()
+    style = ttk.Style(root)
+    if "clam" in style.theme_names():
+        style.theme_use("clam")  # as gui_main does
+    app = DesktopAutomationApp(root)
+    app.objects.update((name, dict(obj)) for name, obj in OBJECTS.items())
+    app.show_frame("StepCreatorFrame")
+    root.update()
+    return root, app, app.get_frame("StepCreatorFrame")
+
+
+def bench_size(root, app, frame, count, repeats):
+    steps = synthetic_steps(count)
+    row = {"steps": count, "clear_and_rebuild_steps": timed(root, frame.clear_and_rebuild_steps, steps)}
+    row["widgets"] = count_widgets(frame.canvas_steps)
+    row["widgets_per_step"] = row["widgets"] / max(1, len(frame.steps))
+    row["widgets_total"] = count_widgets(root)
+    wait = {"object_name": None, "action": "Wait", "params": {"duration_s": 1.0}}
+    row["add_step_row_end"] = median_of([timed(root, frame.add_step_row, dict(wait)) for _ in range(repeats)])
+    row["add_step_row_middle"] = median_of([timed(root, frame.add_step_row, dict(wait), len(frame.steps) // 2)
+                                            for _ in range(repeats)])
+    row["scroll_to_middle"] = timed(root, frame.canvas_steps.yview_moveto, 0.5)
+    middle = len(frame.steps) // 2
+    row["move_step_up"] = median_of([timed(root, frame.move_step_up, middle) for _ in range(repeats)])
+    row["move_step_down"] = median_of([timed(root, frame.move_step_down, middle) for _ in range(repeats)])
+    row["add_object"] = median_of([timed(root, app.add_object, f"bench_point_{count}_{i}",
+                                         {"type": "pointRGB", "coords": [10, 10 + i], "rgb": [0, 0, 0]})
+                                   for i in range(repeats)])
+    row["rename_object"] = timed(root, app.rename_object, "button", "button_renamed")
+    app.rename_object("button_renamed", "button")
+    row["delete_object"] = timed(root, app.delete_object, f"bench_point_{count}_0")
+    row["refresh_object_dropdowns"] = median_of([timed(root, frame.refresh_object_dropdowns) for _ in range(repeats)])
+    row["sequence_to_data"] = median_of([timed(root, app.sequence.to_data) for _ in range(repeats)])
+    if len(app.sequence.to_data()) != len(frame.steps):
+        raise RuntimeError("Sequence.to_data lost steps")
+    row["theme_toggle"] = median_of([timed(root, lambda: (app.set_theme_mode("light"), app.set_theme_mode("dark")))
+                                     for _ in range(repeats)])
+    row["add_delay_between_rows"] = timed(root, frame.add_delay_between_rows, 1.0)
+    return row
+
+
+def projected_rebuild_s(rows, count):
+    """Extrapolate the rebuild time from the measured sizes (power law; quadratic from a single point)."""
+    measured = [(r["steps"], r["clear_and_rebuild_steps"]["settled_ms"] / 1000) for r in rows if "widgets" in r]
+    if not measured:
+        return 0.0
+    (n1, t1), exponent = measured[-1], 2.0
+    if len(measured) > 1:
+        n0, t0 = measured[-2]
+        if t0 > 0 and n1 != n0:
+            exponent = max(1.0, math.log(t1 / t0) / math.log(n1 / n0))
+    return t1 * (count / n1) ** exponent
+
+
+def collect(counts, repeats, budget_s):
+    xvfb = start_xvfb()
+    try:
+        root, app, frame = make_app()
+        try:
+            rows = []
+            for count in counts:
+                estimate = projected_rebuild_s(rows, count)
+                if estimate > budget_s:
+                    rows.append({"steps": count, "skipped": True, "projected_rebuild_s": round(estimate, 1)})
+                    continue
+                rows.append(bench_size(root, app, frame, count, repeats))
+        finally:
+            root.destroy()
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+            xvfb.wait(timeout=10)
+    return {"benchmark": "step_creator", "python": sys.version.split()[0], "repeats": repeats, "sizes": rows}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", default="100,1000,5000", help="Comma-separated sequence lengths.")
+    parser.add_argument("--repeats", type=int, default=3, help="Repeats of each single-row operation.")
+    parser.add_argument("--budget-s", type=float, default=300.0,
+                        help="Skip sizes whose rebuild is projected to take longer than this.")
+    parser.add_argument("--out", default=None, help="Write results as JSON to this path.")
+    args = parser.parse_args(argv)
+
+    results = collect([int(v) for v in args.steps.split(",")], args.repeats, args.budget_s)
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""A stand-in pyautogui module so engine benchmarks run without a display.
+
+``install()`` puts a module named ``pyautogui`` into ``sys.modules`` before
+the engine imports the real one. Mouse and keyboard calls only count
+themselves; ``screenshot`` returns (a crop of) a fixed synthetic screen, so
+image and pixel checks do their real work on known pixels.
+
+    import fake_backend
+    backend = fake_backend.install(screen)
+    from automation_maker2.engine import SequenceEngine
+"""
+import sys
+import types
+from collections import Counter
+
+INPUT_CALLS = ("click", "typewrite", "write", "press", "hotkey", "scroll", "hscroll", "moveTo", "mouseDown", "mouseUp")
+
+
+class FailSafeException(Exception):
+    pass
+
+
+def install(screen=None):
+    """Register the fake module (replacing any earlier one) and return it.
+
+    ``screen`` is the PIL image screenshots are cut from; a plain 1920x1080
+    grey screen by default. ``backend.calls`` counts input calls by name.
+    """
+    if screen is None:
+        from PIL import Image
+        screen = Image.new("RGB", (1920, 1080), (40, 40, 40))
+    module = types.ModuleType("pyautogui")
+    module.FAILSAFE = True
+    module.FailSafeException = FailSafeException
+    module.calls = Counter()
+    module.screen = screen
+
+    def recorder(name):
+        def call(*args, **kwargs):
+            module.calls[name] += 1
+        return call
+
+    for name in INPUT_CALLS:
+        setattr(module, name, recorder(name))
+
+    def screenshot(region=None):
+        if region is None:
+            return module.screen
+        left, top, width, height = region
+        return module.screen.crop((left, top, left + width, top + height))
+
+    module.screenshot = screenshot
+    module.pixel = lambda x, y: module.screen.getpixel((x, y))[:3]
+    module.size = lambda: module.screen.size
+    module.position = lambda: (0, 0)
+    module.center = lambda box: (box[0] + box[2] / 2, box[1] + box[3] / 2)
+    sys.modules["pyautogui"] = module
+    engine = sys.modules.get("automation_maker2.engine")
+    if engine is not None:
+        engine.pyautogui = None  # the next SequenceEngine picks up this module
+    return module
@@ -0,0 +1,129 @@
+"""Run the headless benchmark suite and track regressions.
+
+Runs the matcher (1080p, 1440p and 4K synthetic screens, full and ROI
+search per backend), capture, engine dispatch and sequence file benchmarks
+in one process, none of which needs a display, and writes one JSON file
+with the environment (Python, platform, CPU count, git commit) and every
+suite's results to ``benchmarks/results/suite-<timestamp>.json``.
+bench_startup.py (needs a display) and bench_matchpool.py (worker
+processes) are left to be run on their own.
+
+``--baseline`` compares every timing (keys ending in ``_ms`` or ``_us``)
+with an earlier suite file and lists those that got slower by more than
+``--threshold``; the exit status is 1 when any did.
+
+    python benchmarks/run_all.py --quick
+    python benchmarks/run_all.py --baseline benchmarks/results/suite-20260101-120000.json --threshold 1.25
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, HERE)
+
+import bench_capture  # noqa: E402
+import bench_engine  # noqa: E402
+import bench_matcher  # noqa: E402
+import bench_sequence_io  # noqa: E402
+
+SUITES = ("matcher", "capture", "engine", "sequence_io")
+LABEL_KEYS = ("screen", "template", "program", "steps", "max_age_ms", "fps", "gap_ms")
+NOISE_FLOOR = 0.05  # timings below this (in their own unit) in both runs are not compared
+
+
+def run_suite(name, quick):
+    if name == "matcher":
+        screens = bench_matcher.parse_screens("1080p" if quick else "1080p,1440p,4k")
+        return bench_matcher.collect(screens, runs=1 if quick else 3, confidence=0.9)
+    if name == "capture":
+        return bench_capture.collect((1920, 1080), checks=20 if quick else 100, grab_ms=15.0, input_every=5)
+    if name == "engine":
+        return bench_engine.collect(1000 if quick else 10000, runs=1 if quick else 3)
+    return bench_sequence_io.collect([1000] if quick else [1000, 10000, 50000], 200, runs=1 if quick else 3)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def timings(node, path=""):
+    """Flatten every ``*_ms`` / ``*_us`` number to {"suite/1080p/8x8/numpy_full/median_ms": value}."""
+    found = {}
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if isinstance(value, (dict, list)):
+                found.update(timings(value, f"{path}/{key}"))
+            elif isinstance(value, (int, float)) and not isinstance(value, bool) and key.endswith(("_ms", "_us")):
+                found[f"{path}/{key}".lstrip("/")] = value
+    elif isinstance(node, list):
+        for i, item in enumerate(node):
+            label = i
+            if isinstance(item, dict):
+                label = ",".join(f"{item[k]}" for k in LABEL_KEYS if k in item) or i
+            found.update(timings(item, f"{path}/{label}"))
+    return found
+
+
+def compare(results, baseline, threshold):
+    """Timings slower than ``threshold`` times their baseline, slowest ratio first."""
+    before, after = timings(baseline["suites"]), timings(results["suites"])
+    slower = []
+    for key, old in before.items():
+        new = after.get(key)
+        if new is None or max(old, new) < NOISE_FLOOR or old <= 0:
+            continue
+        if new / old > threshold:
+            slower.append({"metric": key, "baseline": old, "current": new, "ratio": round(new / old, 3)})
+    return sorted(slower, key=lambda r: -r["ratio"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", default=",".join(SUITES), help=f"Comma-separated suites ({', '.join(SUITES)}).")
+    parser.add_argument("--quick", action="store_true", help="Smaller sizes and one run each, for a smoke check.")
+    parser.add_argument("--out-dir", default=os.path.join(HERE, "results"))
+    parser.add_argument("--baseline", default=None, help="Earlier suite JSON to compare against.")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Slow-down ratio reported as a regression.")
+    args = parser.parse_args(argv)
+
+    names = [n.strip() for n in args.only.split(",") if n.strip()]
+    unknown = [n for n in names if n not in SUITES]
+    if unknown:
+        parser.error(f"unknown suite(s): {', '.join(unknown)}")
+    results = {"benchmark": "suite", "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "quick": args.quick,
+               "environment": {"python": sys.version.split()[0], "platform": platform.platform(),
+                               "machine": platform.machine(), "cpus": os.cpu_count(), "commit": _git_commit()},
+               "suites": {}}
+    for name in names:
+        t0 = time.perf_counter()
+        print(f"Running {name}...", flush=True)
+        results["suites"][name] = run_suite(name, args.quick)
+        print(f"  {name} done in {time.perf_counter() - t0:.1f}s", flush=True)
+    os.makedirs(args.out_dir, exist_ok=True)
+    path = os.path.join(args.out_dir, f"suite-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {path}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            slower = compare(results, json.load(f), args.threshold)
+        for row in slower:
+            print(f"  SLOWER x{row['ratio']}: {row['metric']} ({row['baseline']:.3f} -> {row['current']:.3f})")
+        print(f"{len(slower)} timing(s) slower than x{args.threshold} of the baseline.")
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,18 @@
-import tkinter as tk
-from tkinter import ttk
+import time
 
-from .app import DesktopAutomationApp  # type: ignore
+_START = time.perf_counter()
 
+import argparse
+import os
+import sys
+
+
+def gui_main(exit_after_startup=False) -> None:
+    import tkinter as tk
+    from tkinter import ttk
+
+    from .app import DesktopAutomationApp  # type: ignore
 
-def main() -> None:
     root = tk.Tk()
     # Apply a reasonable ttk theme if present
     try:
@@ -18,15 +26,112 @@ def main() -> None:
         pass
 
     app = DesktopAutomationApp(root)
-    # Ensure steps are finalized if the frame provides that API
-    if hasattr(app.frames.get("StepCreatorFrame"), 'finalize_steps_for_controller'):
-        try:
-            app.frames["StepCreatorFrame"].finalize_steps_for_controller()
-        except Exception:
-            pass
+
+    def _on_first_map(event):
+        # Time-to-first-window: process start until the main window is mapped
+        if event.widget is not root:
+            return
+        root.unbind('<Map>')
+        elapsed_ms = (time.perf_counter() - _START) * 1000
+        if getattr(app, 'logger', None):
+            app.logger.info('Time to first window: %.1f ms', elapsed_ms)
+        if exit_after_startup:
+            print(f"Time to first window: {elapsed_ms:.1f} ms")
+            root.after_idle(root.destroy)
+    root.bind('<Map>', _on_first_map, add='+')
     root.mainloop()
 
 
-if __name__ == '__main__':
-    main()
+def run_main(args) -> int:
+    """Run a saved sequence headlessly; no tkinter is imported on this path."""
+    from . import logs
+    from .engine import SequenceCompileError, load_engine
+    from .templates import TemplateCache
+    from .tracing import RunTrace
+
+    log = logs.configure(level=args.log_level, log_file=args.log_file, json_lines=args.log_json)
+
+    try:
+        engine = load_engine(args.path, loops=args.loops, start_delay_s=args.delay,
+                             templates=TemplateCache(int(args.template_cache_mb * 1024 * 1024)),
+                             capture_max_age_s=args.capture_window_ms / 1000.0,
+                             capture_fps=args.capture_fps, match_processes=args.match_workers,
+                             trace=RunTrace(os.path.basename(args.path)) if args.trace else None)
+    except SequenceCompileError as e:
+        logs.shutdown()
+        print(f"Invalid sequence {args.path}:", file=sys.stderr)
+        for problem in e.problems:
+            print(f"  {problem}", file=sys.stderr)
+        return 2
+    except (OSError, ValueError) as e:
+        logs.shutdown()
+        print(f"Could not load sequence {args.path}: {e}", file=sys.stderr)
+        return 2
+    log.info("Startup: %.1f ms (import, load and compile)", (time.perf_counter() - _START) * 1000)
 
+    engine.start()
+    try:
+        while engine.is_running():
+            engine.join(0.2)
+    except KeyboardInterrupt:
+        log.warning("--- Execution Interrupted by User (Ctrl+C) ---")
+        engine.stop()
+        engine.join()
+    # Drain the log queue first, so the last step and summary lines are out before
+    # the files are written and any error message below
+    logs.shutdown()
+    if args.trace:
+        try:
+            engine.trace.save(args.trace)
+        except OSError as e:
+            print(f"Could not write trace to {args.trace}: {e}", file=sys.stderr)
+    if args.stats:
+        try:
+            engine.stats.export(args.stats)
+        except OSError as e:
+            print(f"Could not write statistics to {args.stats}: {e}", file=sys.stderr)
+    return {"completed": 0, "stopped": 130}.get(engine.finish_reason, 1)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="automation_maker2", description="Desktop sequence builder and runner.")
+    sub = parser.add_subparsers(dest="command")
+    run_parser = sub.add_parser("run", help="Run a saved sequence JSON without the UI.")
+    run_parser.add_argument("path", help="Path to the sequence .json file.")
+    run_parser.add_argument("--loops", type=int, default=None, help="Override the saved loop count (0 = infinite).")
+    run_parser.add_argument("--delay", type=float, default=0.0, help="Seconds to wait before the first step.")
+    run_parser.add_argument("--template-cache-mb", type=float, default=64,
+                            help="Memory cap for decoded image templates (default 64 MB).")
+    run_parser.add_argument("--capture-window-ms", type=float, default=30,
+                            help="Reuse a screen grab for checks made within this many ms (default 30).")
+    run_parser.add_argument("--capture-fps", type=float, default=None,
+                            help="Grab the screen on a background thread at this rate; checks read the newest frame.")
+    run_parser.add_argument("--match-workers", type=int, default=0,
+                            help="Run NumPy image matching in this many worker processes (default 0 = in-process).")
+    run_parser.add_argument("--log-level", default="INFO", choices=("DEBUG", "INFO", "WARNING", "ERROR"),
+                            help="INFO traces every step; WARNING keeps only problems (default INFO).")
+    run_parser.add_argument("--log-file", default=None, help="Also write the log to this (rotating) file.")
+    run_parser.add_argument("--log-json", action="store_true",
+                            help="Write JSON lines to the log file (or to the console without --log-file).")
+    run_parser.add_argument("--stats", default=None, metavar="PATH",
+                            help="Write per-step timing statistics to PATH (.csv, otherwise JSON).")
+    run_parser.add_argument("--trace", default=None, metavar="PATH",
+                            help="Write the run as Chrome/Perfetto trace-event JSON (open in ui.perfetto.dev).")
+    parser.add_argument("--exit-after-startup", action="store_true",
+                        help="Print the time to first window and exit (startup benchmark).")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        if args.loops is not None and args.loops < 0:
+            parser.error("--loops cannot be negative")
+        if args.capture_fps is not None and args.capture_fps <= 0:
+            parser.error("--capture-fps must be positive")
+        if args.match_workers < 0:
+            parser.error("--match-workers cannot be negative")
+        return run_main(args)
+    gui_main(exit_after_startup=args.exit_after_startup)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,84 +1,46 @@
 ﻿import tkinter as tk
 from tkinter import ttk, simpledialog, filedialog, colorchooser, scrolledtext
-import pyautogui
 import time
 import threading
 import json
 import os
-import random
-import shutil
-import subprocess
-from PIL import Image, ImageTk, ImageGrab # Pillow for pixel color and image ops
 import platform
 import logging
-from logging.handlers import RotatingFileHandler
 import uuid
 import queue
 import math
-
-# --- Global Variables & Constants ---
-DEFAULT_PROJECT_NAME = "UntitledSequence"
-
-# Special keys for PyAutoGUI keyboard actions
-PYAUTOGUI_SPECIAL_KEYS = sorted([
-    'accept', 'add', 'alt', 'altleft', 'altright', 'apps', 'backspace',
-    'browserback', 'browserfavorites', 'browserforward', 'browserhome',
-    'browserrefresh', 'browsersearch', 'browserstop', 'capslock', 'clear',
-    'convert', 'ctrl', 'ctrlleft', 'ctrlright', 'decimal', 'del', 'delete',
-    'divide', 'down', 'end', 'enter', 'esc', 'escape', 'execute', 'f1', 'f2',
-    'f3', 'f4', 'f5', 'f6', 'f7', 'f8', 'f9', 'f10', 'f11', 'f12', 'f13',
-    'f14', 'f15', 'f16', 'f17', 'f18', 'f19', 'f20', 'f21', 'f22', 'f23',
-    'f24', 'final', 'fn', 'hanguel', 'hanja', 'help', 'home', 'insert', 'junja',
-    'kana', 'kanji', 'launchapp1', 'launchapp2', 'launchmail',
-    'launchmediaselect', 'left', 'modechange', 'multiply', 'nexttrack',
-    'nonconvert', 'num0', 'num1', 'num2', 'num3', 'num4', 'num5', 'num6',
-    'num7', 'num8', 'num9', 'numlock', 'pagedown', 'pageup', 'pause', 'pgdn',
-    'pgup', 'playpause', 'prevtrack', 'print', 'printscreen', 'prntscrn',
-    'prtscr', 'return', 'right', 'scrolllock', 'select', 'separator', 'shift',
-    'shiftleft', 'shiftright', 'sleep', 'space', 'stop', 'subtract', 'tab',
-    'up', 'volumedown', 'volumemute', 'volumeup', 'win', 'winleft', 'winright', 'yen'
-])
-
-# Predefined hotkeys for the Hotkey Combo action
-PREDEFINED_HOTKEYS = {
-    # System & Navigation
-    "Switch Apps (Alt+Tab)": ['alt', 'tab'],
-    "Close Window (Alt+F4)": ['alt', 'f4'],
-    "Show Desktop (Win+D)": ['win', 'd'],
-    "Open File Explorer (Win+E)": ['win', 'e'],
-    "Open Run Dialog (Win+R)": ['win', 'r'],
-
-    # File & Window Management
-    "Copy (Ctrl+C)": ['ctrl', 'c'],
-    "Cut (Ctrl+X)": ['ctrl', 'x'],
-    "Paste (Ctrl+V)": ['ctrl', 'v'],
-    "Undo (Ctrl+Z)": ['ctrl', 'z'],
-    "Redo (Ctrl+Y)": ['ctrl', 'y'],
-    "Select All (Ctrl+A)": ['ctrl', 'a'],
-    "New Window (Ctrl+N)": ['ctrl', 'n'],
-    "New Folder (Ctrl+Shift+N)": ['ctrl', 'shift', 'n'],
-    "Properties (Alt+Enter)": ['alt', 'enter'],
-
-    # Browser Shortcuts
-    "New Tab (Ctrl+T)": ['ctrl', 't'],
-    "Close Tab (Ctrl+W)": ['ctrl', 'w'],
-    "Reopen Closed Tab (Ctrl+Shift+T)": ['ctrl', 'shift', 't'],
-    "Next Tab (Ctrl+Tab)": ['ctrl', 'tab'],
-    "Previous Tab (Ctrl+Shift+Tab)": ['ctrl', 'shift', 'tab'],
-    "Focus Address Bar (Ctrl+L)": ['ctrl', 'l'],
-
-    # Text Editing
-    "Move Cursor Word Left (Ctrl+Left)": ['ctrl', 'left'],
-    "Move Cursor Word Right (Ctrl+Right)": ['ctrl', 'right'],
-    "Delete Previous Word (Ctrl+Backspace)": ['ctrl', 'backspace'],
-    "Select Word Left (Ctrl+Shift+Left)": ['ctrl', 'shift', 'left'],
-    "Select Word Right (Ctrl+Shift+Right)": ['ctrl', 'shift', 'right'],
-    "Jump to Start of Doc (Ctrl+Home)": ['ctrl', 'home'],
-    "Jump to End of Doc (Ctrl+End)": ['ctrl', 'end'],
-}
-PREDEFINED_HOTKEY_NAMES = sorted(PREDEFINED_HOTKEYS.keys())
+import contextlib
+import weakref
+
+from .constants import (
+    DEFAULT_PROJECT_NAME, PYAUTOGUI_SPECIAL_KEYS, PREDEFINED_HOTKEY_NAMES,
+)
+# pyautogui and Pillow are imported on first use to keep startup fast
+from . import logs
+from .engine import SequenceEngine, SequenceCompileError, load_engine, load_sequence_file, load_pyautogui
+from .locator import DEFAULT_SEARCH_PADDING, DEFAULT_MATCH_BACKEND
+from .matcher import BACKENDS as MATCH_BACKENDS
+from .model import Sequence, Step
+from .runstats import COLUMNS as RUN_STATS_COLUMNS
+from .templates import TemplateCache
+from .tracing import RunTrace
+
+log = logging.getLogger(logs.LOGGER_NAME)
 
 # --- Helper Functions ---
+_SV_TTK = None  # sv_ttk module once probed, False if it is not installed
+
+def _get_sv_ttk():
+    # A failed import is not cached by Python, so remember the probe result
+    global _SV_TTK
+    if _SV_TTK is None:
+        try:
+            import sv_ttk  # type: ignore
+            _SV_TTK = sv_ttk
+        except Exception:
+            _SV_TTK = False
+    return _SV_TTK or None
+
 def get_screen_center_for_window(window_width, window_height, root):
     screen_width = root.winfo_screenwidth()
     screen_height = root.winfo_screenheight()
@@ -88,6 +50,8 @@ def get_screen_center_for_window(window_width, window_height, root):
 
 # --- Main Application Class ---
 class DesktopAutomationApp:
+    ENGINE_DRAIN_MS = 50
+
     def __init__(self, root):
         self.root = root
         self.root.title("Python Desktop Automation Tool")
@@ -96,12 +60,22 @@ class DesktopAutomationApp:
 
         # Theme state and menu
         self._theme_mode = 'dark'  # default preference
+        self._theme_dark = True
+        # Classic Tk widgets coloured from the theme palette (ttk widgets follow the style itself)
+        self._themed_widgets = weakref.WeakKeyDictionary()
+        self.theme_colors = {}
         self._setup_logging()
         self._apply_system_theme()
+        self.themed(self.root, bg="bg")
         self._setup_menubar()
 
         self.objects = {}
-        self.current_steps = []
+        # The steps being edited; every view binds to it, and save/run read it directly
+        self.sequence = Sequence()
+        self.sequence.subscribe(self._on_sequence_event)
+        # Views told about single-object changes: listener(kind, payload) with kind
+        # "added", "renamed" (payload "old_name"), "deleted" or "updated" and payload "name"
+        self._object_listeners = []
         self.current_project_path = None
         self.current_sequence_name = DEFAULT_PROJECT_NAME
         self.loop_count = tk.IntVar(value=1)
@@ -112,7 +86,8 @@ class DesktopAutomationApp:
         _sw, _sh = self.root.winfo_screenwidth(), self.root.winfo_screenheight()
         self.grid_rows_var = tk.IntVar(value=50)
         self.grid_cols_var = tk.IntVar(value=50)
-        self.selected_grid_cells = []
+        self.selected_grid_cells = set()  # (row, col) cells highlighted in grid mode
+        self._grid_drag = None  # rectangle being painted by a grid-mode drag
 
         self.drag_select_window = None
         self.drag_start_x = None
@@ -122,26 +97,60 @@ class DesktopAutomationApp:
         self.pixel_monitor_active = False
         self._pixel_listener = None
 
-        self.container = tk.Frame(root)
+        # Sequence execution runs on a worker thread; events are drained with root.after
+        self.engine = None
+        self.engine_events = queue.Queue()
+        # Decoded image templates survive across runs and looper cycles
+        self.template_cache = TemplateCache()
+        self._engine_drain_scheduled = False
+        self._looper_active = False
+        self.run_status_var = tk.StringVar(value="Idle")
+        self.run_log_level = tk.StringVar(value="INFO")  # engine log level for the next run
+        self.show_stats_after_run = tk.BooleanVar(value=True)
+        self.record_trace = tk.BooleanVar(value=False)  # save each run as a Chrome/Perfetto trace
+
+        self.container = self.themed(tk.Frame(root), bg="bg")
         self.container.pack(fill="both", expand=True)
         # Make the grid inside container expand with the window
         self.container.grid_rowconfigure(0, weight=1)
         self.container.grid_columnconfigure(0, weight=1)
 
+        # Frames are constructed on first show_frame; self.frames holds only built ones
         self.frames = {}
+        self._frame_classes = {F.__name__: F for F in (MainFrame, ObjectCreationFrame, StepCreatorFrame, InstructionsFrame)}
         # Track any extra ObjectCreationFrame instances opened in new windows
         self._aux_object_frames = []
         # Track whether we've already maximized Step Creator once
         self._step_creator_maximized_once = False
-        for F in (MainFrame, ObjectCreationFrame, StepCreatorFrame, InstructionsFrame):
-            page_name = F.__name__
-            frame = F(parent=self.container, controller=self)
-            self.frames[page_name] = frame
-            frame.grid(row=0, column=0, sticky="nsew")
 
         self.root.protocol("WM_DELETE_WINDOW", self._on_close)
         self.show_frame("MainFrame")
 
+    def get_frame(self, page_name):
+        """Return the named frame, constructing it on first use."""
+        frame = self.frames.get(page_name)
+        if frame is None:
+            frame = self._frame_classes[page_name](parent=self.container, controller=self)
+            self.frames[page_name] = frame
+            frame.grid(row=0, column=0, sticky="nsew")
+        return frame
+
+    def _on_sequence_event(self, kind, payload):
+        # A reset comes from new/load, which set the modified flag themselves
+        if kind != "reset" and not self.sequence_modified:
+            self.mark_sequence_modified()
+
+    def subscribe_objects(self, listener):
+        self._object_listeners.append(listener)
+
+    def unsubscribe_objects(self, listener):
+        if listener in self._object_listeners:
+            self._object_listeners.remove(listener)
+
+    def _notify_objects(self, kind, **payload):
+        for listener in list(self._object_listeners):
+            listener(kind, payload)
+
     def _refresh_all_object_views(self):
         try:
             oc = self.frames.get("ObjectCreationFrame")
@@ -163,13 +172,8 @@ class DesktopAutomationApp:
         try:
             logs_dir = os.path.join(os.getcwd(), 'logs')
             os.makedirs(logs_dir, exist_ok=True)
-            self.logger = logging.getLogger('automation_maker')
-            self.logger.setLevel(logging.INFO)
-            handler = RotatingFileHandler(os.path.join(logs_dir, 'automation.log'), maxBytes=1_000_000, backupCount=5)
-            fmt = logging.Formatter('%(asctime)s %(levelname)s %(message)s')
-            handler.setFormatter(fmt)
-            if not any(isinstance(h, RotatingFileHandler) for h in self.logger.handlers):
-                self.logger.addHandler(handler)
+            # Console and rotating file output are written by a listener thread (see logs.py)
+            self.logger = logs.configure(level=logging.INFO, log_file=os.path.join(logs_dir, 'automation.log'))
         except Exception as e:
             print('Logging setup failed:', e)
 
@@ -214,8 +218,10 @@ class DesktopAutomationApp:
             if platform.system() == "Windows":
                 os.startfile(path)
             elif platform.system() == "Darwin":
+                import subprocess
                 subprocess.Popen(["open", path])
             else:
+                import subprocess
                 subprocess.Popen(["xdg-open", path])
         except Exception as e:
             if hasattr(self, 'logger'):
@@ -259,10 +265,6 @@ class DesktopAutomationApp:
                     pass
             frame = StepCreatorFrame(parent=win, controller=self)
             frame.pack(fill="both", expand=True)
-            try:
-                frame.clear_and_rebuild_steps(self.current_steps)
-            except Exception:
-                pass
             def _close():
                 if self._check_unsaved_changes():
                     win.destroy()
@@ -314,89 +316,166 @@ class DesktopAutomationApp:
         loop_forever = tk.BooleanVar(value=True)
         cycles_var = tk.IntVar(value=1)
         ttk.Checkbutton(controls, text="Loop forever", variable=loop_forever).pack(side=tk.LEFT)
+        ttk.Checkbutton(controls, text="Record trace", variable=self.record_trace).pack(side=tk.LEFT, padx=(10,0))
         ttk.Label(controls, text="Cycles:").pack(side=tk.LEFT, padx=(10,2))
         cycles_spin = ttk.Spinbox(controls, from_=1, to=9999, textvariable=cycles_var, width=6)
         cycles_spin.pack(side=tk.LEFT)
         status_var = tk.StringVar(value="Idle")
         ttk.Label(controls, textvariable=status_var).pack(side=tk.RIGHT)
 
-        stop_flag = {"stop": False}
+        stop_evt = threading.Event()
+        latest = {'status': "Idle"}
+
+        def looper_worker(entries, total_cycles, log_level, trace):
+            cycle = 0
+            try:
+                while not stop_evt.is_set() and (total_cycles is None or cycle < total_cycles):
+                    cycle += 1
+                    # Each cycle is a parent slice of the runs inside it
+                    with (trace.span(f"Cycle {cycle}", "cycle") if trace else contextlib.nullcontext()):
+                        for name, path in entries:
+                            if stop_evt.is_set(): break
+                            latest['status'] = f"Running: {name}"
+                            try:
+                                self._run_sequence_file_once(path, log_level, trace)
+                            except Exception as e:
+                                log.error("Looper error for %s: %s", path, e)
+            finally:
+                latest['status'] = "Stopped" if stop_evt.is_set() else "Finished"
+                if trace is not None:
+                    saved = self._save_trace(trace, "looper")
+                    if saved: latest['status'] += f" (trace: {os.path.basename(saved)})"
+                self._looper_active = False
+
+        def ui_update():
+            if not win.winfo_exists():
+                return
+            status_var.set(latest['status'])
+            if self._looper_active or latest['status'].startswith("Running"):
+                win.after(100, ui_update)
+
         def start_loop():
             items = tree.get_children('')
-            if not items: return
-            stop_flag["stop"] = False
-            total_cycles = 999999999 if loop_forever.get() else max(1, int(cycles_var.get() or 1))
-            status_var.set("Running...")
-            for cycle in range(total_cycles):
-                if stop_flag["stop"]: break
-                for iid in tree.get_children(''):
-                    if stop_flag["stop"]: break
-                    name, path = tree.item(iid, 'values')
-                    status_var.set(f"Running: {name}")
-                    win.update_idletasks()
-                    try:
-                        self._run_sequence_file_once(path)
-                    except Exception as e:
-                        print(f"Looper error for {path}: {e}")
-            status_var.set("Stopped" if stop_flag["stop"] else "Finished")
+            if not items or self._looper_active: return
+            if self.engine and self.engine.is_running():
+                simpledialog.messagebox.showinfo("Sequence Looper", "A sequence is already running.", parent=win); return
+            stop_evt.clear()
+            entries = [tuple(tree.item(iid, 'values')) for iid in items]
+            total_cycles = None if loop_forever.get() else max(1, int(cycles_var.get() or 1))
+            latest['status'] = "Running..."
+            self._looper_active = True
+            # Tk variables are read here, on the Tk thread; the looper thread only gets their values
+            log_level = self.run_log_level.get()
+            trace = RunTrace("Sequence Looper") if self.record_trace.get() else None
+            threading.Thread(target=looper_worker, args=(entries, total_cycles, log_level, trace), daemon=True).start()
+            self._schedule_engine_drain()
+            ui_update()
 
         def stop_loop():
-            stop_flag["stop"] = True
+            stop_evt.set()
+            if self.engine: self.engine.stop()
 
         actions = ttk.Frame(frm); actions.pack(fill="x", pady=6)
         ttk.Button(actions, text="Start", command=start_loop).pack(side=tk.LEFT, padx=5)
         ttk.Button(actions, text="Stop", command=stop_loop).pack(side=tk.LEFT, padx=5)
 
-    def _run_sequence_file_once(self, filepath):
-        # Save current state
-        prev = {
-            'objects': self.objects.copy(),
-            'steps': list(self.current_steps),
-            'project_path': self.current_project_path,
-            'sequence_name': self.current_sequence_name,
-            'loop_count': self.loop_count.get(),
-        }
+    def _save_trace(self, trace, name):
+        """Write a RunTrace under logs/traces; returns the path, or None if it could not be written."""
+        safe = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in (name or "sequence"))
+        path = os.path.join(os.getcwd(), 'logs', 'traces', f"{safe}-{time.strftime('%Y%m%d-%H%M%S')}.json")
         try:
-            with open(filepath, 'r') as f:
-                data = json.load(f)
-            self.current_project_path = os.path.dirname(filepath)
-            self.current_sequence_name = data.get("sequence_name", os.path.splitext(os.path.basename(filepath))[0])
-            # Rebuild objects resolving image paths
-            new_objects = {}
-            for obj_name, obj in data.get("objects", {}).items():
-                o = obj.copy()
-                if o.get("type") == "image" and o.get("image_path"):
-                    rel = o["image_path"]
-                    abs_p = os.path.join(self.current_project_path, rel)
-                    if os.path.exists(abs_p): o["image_path"] = abs_p
-                new_objects[obj_name] = o
-            self.objects = new_objects
-            self.current_steps = data.get("steps", [])
-            self.loop_count.set(data.get("loop_count", 1))
-            # Refresh UI and run
-            self.frames["ObjectCreationFrame"].update_objects_display()
-            self.frames["StepCreatorFrame"].clear_and_rebuild_steps(self.current_steps)
-            self.run_sequence()
-        finally:
-            # Restore previous state
-            self.objects = prev['objects']
-            self.current_steps = prev['steps']
-            self.current_project_path = prev['project_path']
-            self.current_sequence_name = prev['sequence_name']
-            self.loop_count.set(prev['loop_count'])
-            self.frames["ObjectCreationFrame"].update_objects_display()
-            self.frames["StepCreatorFrame"].clear_and_rebuild_steps(self.current_steps)
+            trace.save(path)
+        except OSError as e:
+            log.error("Could not save trace %s: %s", path, e); return None
+        log.info("Trace saved to %s (open in ui.perfetto.dev or chrome://tracing)", path)
+        return path
+
+    def open_run_stats_window(self):
+        """Per-step and per-action timings of the last run, with CSV/JSON export."""
+        stats = self.engine.stats if self.engine else None
+        if stats is None or not stats.by_step:
+            simpledialog.messagebox.showinfo("Run Statistics", "No statistics yet. Run a sequence first.", parent=self.root); return
+        win = tk.Toplevel(self.root)
+        win.title(f"Run Statistics - {stats.name}" if stats.name else "Run Statistics")
+        frm = ttk.Frame(win); frm.pack(fill="both", expand=True, padx=10, pady=10)
+        notebook = ttk.Notebook(frm); notebook.pack(fill="both", expand=True)
+
+        def sort_by(tree, col):
+            # Slowest/largest first; click again to reverse
+            descending = not getattr(tree, "_sorted_desc", False) if getattr(tree, "_sorted_col", None) == col else True
+            def key(iid):
+                value = tree.set(iid, col)
+                try: return (0, float(value))
+                except ValueError: return (1, value)
+            for n, iid in enumerate(sorted(tree.get_children(''), key=key, reverse=descending)):
+                tree.move(iid, '', n)
+            tree._sorted_col, tree._sorted_desc = col, descending
+
+        for group, title in (("step", "By Step"), ("action", "By Action")):
+            tab = ttk.Frame(notebook); notebook.add(tab, text=title)
+            tree = ttk.Treeview(tab, columns=RUN_STATS_COLUMNS, show='headings', height=16)
+            for c in RUN_STATS_COLUMNS:
+                tree.heading(c, text=c, command=lambda t=tree, c=c: sort_by(t, c))
+                tree.column(c, width=140 if c in ("action", "object") else 72, anchor="w" if c in ("action", "object") else "e")
+            if group == "action":
+                tree["displaycolumns"] = [c for c in RUN_STATS_COLUMNS if c not in ("step", "object")]
+            sb = ttk.Scrollbar(tab, orient="vertical", command=tree.yview); tree.configure(yscrollcommand=sb.set)
+            tree.pack(side=tk.LEFT, fill="both", expand=True); sb.pack(side=tk.RIGHT, fill="y")
+            for row in stats.rows(group):
+                tree.insert('', 'end', values=["" if row[c] is None else row[c] for c in RUN_STATS_COLUMNS])
+
+        def export(ext, label):
+            path = filedialog.asksaveasfilename(title=f"Export Statistics as {label}", defaultextension=ext, filetypes=[(f"{label} files", f"*{ext}"), ("All files", "*.*")], parent=win)
+            if not path: return
+            try: (stats.to_csv if ext == ".csv" else stats.to_json)(path)
+            except OSError as e: simpledialog.messagebox.showerror("Export Error", f"Could not write {path}: {e}", parent=win)
+        btns = ttk.Frame(frm); btns.pack(fill="x", pady=(6, 0))
+        ttk.Label(btns, text="Times are ms per execution; phases are means.").pack(side=tk.LEFT)
+        ttk.Button(btns, text="Close", command=win.destroy).pack(side=tk.RIGHT, padx=3)
+        ttk.Button(btns, text="Export JSON...", command=lambda: export(".json", "JSON")).pack(side=tk.RIGHT, padx=3)
+        ttk.Button(btns, text="Export CSV...", command=lambda: export(".csv", "CSV")).pack(side=tk.RIGHT, padx=3)
+        win.lift()
+
+    def _run_sequence_file_once(self, filepath, log_level="INFO", trace=None):
+        """Run a saved sequence to completion on the calling (looper) thread.
+
+        The file is executed from its own loaded state, so the sequence being
+        edited in the UI is left untouched.
+        """
+        engine = load_engine(filepath, events=self.engine_events, templates=self.template_cache,
+                             log_level=log_level, trace=trace)
+        self.engine = engine
+        return engine.run()
 
     def set_theme_mode(self, mode):
+        # ttk widgets restyle themselves and registered Tk widgets are recoloured; nothing is rebuilt
         self._theme_mode = mode
         self._apply_system_theme()
-        # Update backgrounds that were hard-coded/derived
-        for f in self.frames.values():
-            try:
-                if hasattr(f, 'refresh_content'):
-                    f.refresh_content()
-            except Exception:
-                pass
+
+    def themed(self, widget, **roles):
+        """Colour a classic Tk widget from the theme palette ("bg", "fg", "field") now and on
+        every theme change, e.g. themed(canvas, background="bg"); returns the widget."""
+        self._themed_widgets[widget] = roles
+        self._apply_theme_colors(widget, roles)
+        return widget
+
+    def _apply_theme_colors(self, widget, roles):
+        try:
+            widget.configure(**{option: self.theme_colors[role] for option, role in roles.items()})
+        except (tk.TclError, KeyError):
+            pass
+
+    def _refresh_theme_palette(self):
+        """Read the palette back from the active ttk style and recolour the registered widgets."""
+        style = ttk.Style(self.root)
+        dark = self._theme_dark
+        self.theme_colors = {
+            "bg": style.lookup('TFrame', 'background') or ('#2b2b2b' if dark else '#F0F0F0'),
+            "fg": style.lookup('TLabel', 'foreground') or ('#e6e6e6' if dark else '#000000'),
+            "field": style.lookup('TEntry', 'fieldbackground') or ('#1f1f1f' if dark else '#FFFFFF'),
+        }
+        for widget, roles in list(self._themed_widgets.items()):
+            self._apply_theme_colors(widget, roles)
 
     def _apply_system_theme(self):
         """Apply theme based on preference: 'light', 'dark', or 'system'.
@@ -424,15 +503,17 @@ class DesktopAutomationApp:
                     except Exception:
                         prefers_dark = False
                 desired = 'dark' if prefers_dark else 'light'
+            self._theme_dark = desired == 'dark'
 
             # If sv_ttk is available, use it
-            try:
-                import sv_ttk  # type: ignore
-                if desired == 'dark': sv_ttk.set_theme('dark')
-                else: sv_ttk.set_theme('light')
-                return
-            except Exception:
-                pass
+            sv_ttk = _get_sv_ttk()
+            if sv_ttk is not None:
+                try:
+                    if desired == 'dark': sv_ttk.set_theme('dark')
+                    else: sv_ttk.set_theme('light')
+                    return
+                except Exception:
+                    pass
 
             # Fallback to builtin ttk themes
             if desired == 'dark':
@@ -452,6 +533,12 @@ class DesktopAutomationApp:
 
             # Light/dark tweaks for ttk widgets if no sv_ttk
             if desired == 'dark':
+                # Dark colours go on a theme derived from the base, so going back to light
+                # (theme_use of the base) drops them again
+                dark_theme = f"{style.theme_use()}-dark"
+                if dark_theme not in available:
+                    style.theme_create(dark_theme, parent=style.theme_use())
+                style.theme_use(dark_theme)
                 bg = '#2b2b2b'; fg = '#e6e6e6'; acc = '#3a3a3a'
                 style.configure('.', background=bg, foreground=fg)
                 style.configure('TFrame', background=bg)
@@ -482,14 +569,16 @@ class DesktopAutomationApp:
                 except Exception:
                     pass
             else:
-                # Default light colors are fine; ensure root matches
+                # Default light colors are fine; drop the dark defaults for classic tk widgets
                 try:
-                    self.root.configure(bg=style.lookup('TFrame', 'background') or '#F0F0F0')
+                    self.root.option_clear()
                 except Exception:
                     pass
         except Exception:
             # If anything goes wrong, stick with Tk's default theme
             pass
+        finally:
+            self._refresh_theme_palette()
 
     def mark_sequence_modified(self, modified=True):
         self.sequence_modified = modified
@@ -510,7 +599,7 @@ class DesktopAutomationApp:
             self.root.title(new_title_base)
 
     def show_frame(self, page_name):
-        frame = self.frames[page_name]
+        frame = self.get_frame(page_name)
         frame.tkraise()
         if hasattr(frame, 'refresh_content') and callable(getattr(frame, 'refresh_content')):
             frame.refresh_content()
@@ -546,12 +635,42 @@ class DesktopAutomationApp:
             simpledialog.messagebox.showwarning("Warning", "Object name cannot be empty.")
             return False
         self.objects[name] = obj_data
-        print(f"Added object: {name} - {obj_data}")
-        if self.frames["ObjectCreationFrame"].winfo_exists():
-            self.frames["ObjectCreationFrame"].update_objects_display()
-        self._refresh_all_object_views()
-        if self.frames["StepCreatorFrame"].winfo_exists():
-            self.frames["StepCreatorFrame"].refresh_object_dropdowns()
+        log.debug("Added object: %s (%s)", name, obj_data.get("type"))
+        self._notify_objects("added", name=name)
+        self.mark_sequence_modified()
+        return True
+
+    def rename_object(self, old_name, new_name):
+        if old_name not in self.objects or new_name == old_name:
+            return False
+        if new_name in self.objects:
+            simpledialog.messagebox.showwarning("Warning", f"Object with name '{new_name}' already exists. Please choose a unique name.")
+            return False
+        if not new_name:
+            simpledialog.messagebox.showwarning("Warning", "Object name cannot be empty.")
+            return False
+        # Rebuilt in place so the object keeps its position in the list
+        renamed = [(new_name if name == old_name else name, obj) for name, obj in self.objects.items()]
+        self.objects.clear(); self.objects.update(renamed)
+        for step in self.sequence.referencing(old_name):
+            step.rename_object(old_name, new_name)
+        log.debug("Renamed object: %s -> %s", old_name, new_name)
+        self._notify_objects("renamed", name=new_name, old_name=old_name)
+        self.mark_sequence_modified()
+        return True
+
+    def delete_object(self, name):
+        if self.objects.pop(name, None) is None:
+            return False
+        # Steps drop their references to it; those targeting it fall back to Global/Control, with a valid action
+        config = StepCreatorFrame.ACTION_CONFIG
+        actions = config["_global_"] + config["_control_"]
+        for step in self.sequence.referencing(name):
+            targeted = step.object_name == name
+            step.forget_object(name)
+            if targeted and step.action not in actions: step.action = actions[0]
+        log.debug("Deleted object: %s", name)
+        self._notify_objects("deleted", name=name)
         self.mark_sequence_modified()
         return True
 
@@ -602,6 +721,8 @@ class DesktopAutomationApp:
                 return 'black'
             return 'gray'
 
+        pyautogui = load_pyautogui()
+
         def poll_mouse():
             try:
                 while not stop_evt.is_set():
@@ -649,6 +770,7 @@ class DesktopAutomationApp:
     def _capture_pixel_under_mouse(self):
         if not self.pixel_monitor_active: return
         try:
+            pyautogui = load_pyautogui()
             x, y = pyautogui.position()
             rgb = pyautogui.pixel(x, y)
             obj_name = simpledialog.askstring("Name PointRGB Object", "Enter a name for this pixel object:", parent=self.root)
@@ -665,7 +787,7 @@ class DesktopAutomationApp:
 
     def create_region_grid_mode(self, creation_type=None):
         if creation_type is None:
-            creation_type = self.frames["ObjectCreationFrame"].current_creation_type
+            creation_type = self.get_frame("ObjectCreationFrame").current_creation_type
         if self.grid_window and self.grid_window.winfo_exists(): self.grid_window.destroy()
         self.grid_window = tk.Toplevel(self.root)
         self.grid_window.attributes('-fullscreen', True); self.grid_window.attributes('-alpha', 0.4); self.grid_window.attributes('-topmost', True)
@@ -680,8 +802,11 @@ class DesktopAutomationApp:
             rows = max(1, self.screen_height // 50); cols = max(1, self.screen_width // 50)
             self.grid_rows_var.set(rows); self.grid_cols_var.set(cols)
         self.cell_width = self.screen_width / cols; self.cell_height = self.screen_height / rows
-        self.selected_grid_cells = []; self._draw_grid_on_canvas()
+        self.selected_grid_cells = set(); self._grid_drag = None; self._draw_grid_on_canvas()
+        # Click toggles a cell; dragging paints the rectangle from the first cell (select or clear, per that cell)
         self.grid_canvas.bind("<Button-1>", self._on_grid_cell_click)
+        self.grid_canvas.bind("<B1-Motion>", self._on_grid_cell_drag)
+        self.grid_canvas.bind("<ButtonRelease-1>", self._on_grid_cell_release)
         # Scroll to change grid density: up => smaller boxes (more cells), down => bigger boxes
         self.grid_canvas.bind("<MouseWheel>", self._on_grid_scroll)
         # Linux X11 scroll events
@@ -734,6 +859,7 @@ class DesktopAutomationApp:
                 img_path = obj.get('image_path')
                 if coords and img_path and os.path.exists(img_path):
                     try:
+                        from PIL import Image, ImageTk
                         img = Image.open(img_path)
                         photo = ImageTk.PhotoImage(img)
                         x, y, w0, h0 = coords
@@ -778,6 +904,15 @@ class DesktopAutomationApp:
                         canvas.create_oval(cx - 2, cy - 2, cx + 2, cy + 2, outline='blue', fill='blue', width=1)
                 else:
                     self.show_toast('Region object missing coords')
+            elif t == 'pixelSignature':
+                points = obj.get('points') or []
+                for point in points:
+                    px, py = point['coords'][0], point['coords'][1]
+                    r = 6
+                    canvas.create_oval(px - r, py - r, px + r, py + r, outline='#00FF5F', width=2)
+                    canvas.create_oval(px - 2, py - 2, px + 2, py + 2, outline='red', fill='red', width=1)
+                if not points:
+                    self.show_toast('Pixel signature has no points')
             elif t == 'pointRGB':
                 coords = obj.get('coords')
                 if coords and len(coords) >= 2:
@@ -800,14 +935,32 @@ class DesktopAutomationApp:
             self.show_toast(f'Overlay failure (code {code})')
 
     def _draw_grid_on_canvas(self):
+        # One line per row and per column; selected cells are separate rectangles tagged by cell
         self.grid_canvas.delete("grid_line"); self.grid_canvas.delete("cell_highlight")
         rows = self.grid_rows_var.get(); cols = self.grid_cols_var.get()
-        for r in range(rows):
-            for c in range(cols):
-                x1, y1 = c * self.cell_width, r * self.cell_height; x2, y2 = x1 + self.cell_width, y1 + self.cell_height
-                if (r,c) in self.selected_grid_cells: self.grid_canvas.create_rectangle(x1, y1, x2, y2, fill="blue", outline="lightblue", stipple="gray50", tags="cell_highlight")
-                if r < rows: self.grid_canvas.create_line(0, y2, self.screen_width, y2, fill="white", tags="grid_line", width=0.5)
-                if c < cols: self.grid_canvas.create_line(x2, 0, x2, self.screen_height, fill="white", tags="grid_line", width=0.5)
+        self._grid_dims = (rows, cols)
+        for r in range(1, rows + 1):
+            y = r * self.cell_height; self.grid_canvas.create_line(0, y, self.screen_width, y, fill="white", tags="grid_line", width=0.5)
+        for c in range(1, cols + 1):
+            x = c * self.cell_width; self.grid_canvas.create_line(x, 0, x, self.screen_height, fill="white", tags="grid_line", width=0.5)
+        cells, self.selected_grid_cells = self.selected_grid_cells, set()
+        for cell in cells: self._set_grid_cell(cell, True)
+
+    def _set_grid_cell(self, cell, selected):
+        """Select or clear one cell, adding or deleting just its highlight."""
+        if selected == (cell in self.selected_grid_cells): return
+        tag = "cell_%d_%d" % cell
+        if selected:
+            self.selected_grid_cells.add(cell); r, c = cell
+            self.grid_canvas.create_rectangle(c * self.cell_width, r * self.cell_height, (c + 1) * self.cell_width, (r + 1) * self.cell_height,
+                                              fill="blue", outline="lightblue", stipple="gray50", tags=("cell_highlight", tag))
+            self.grid_canvas.tag_lower(tag, "grid_line")
+        else:
+            self.selected_grid_cells.discard(cell); self.grid_canvas.delete(tag)
+
+    def _grid_cell_at(self, event):
+        rows, cols = self._grid_dims
+        return (min(max(int(event.y // self.cell_height), 0), rows - 1), min(max(int(event.x // self.cell_width), 0), cols - 1))
 
     def _on_grid_scroll(self, event=None, delta=None):
         # Determine scroll direction
@@ -821,7 +974,7 @@ class DesktopAutomationApp:
             self.grid_rows_var.set(rows); self.grid_cols_var.set(cols)
             self.cell_width = self.screen_width / cols; self.cell_height = self.screen_height / rows
             # changing grid invalidates current cell selections
-            self.selected_grid_cells = []
+            self.selected_grid_cells = set(); self._grid_drag = None
             self._draw_grid_on_canvas()
             if getattr(self, 'grid_confirm_label', None):
                 self.grid_confirm_label.config(text=f"{rows}x{cols} Grid. Scroll to change. ESC to cancel.")
@@ -829,15 +982,35 @@ class DesktopAutomationApp:
             pass
 
     def _on_grid_cell_click(self, event):
-        col = int(event.x // self.cell_width); row = int(event.y // self.cell_height); cell = (row, col)
-        if cell in self.selected_grid_cells: self.selected_grid_cells.remove(cell)
-        else: self.selected_grid_cells.append(cell)
-        self._draw_grid_on_canvas()
+        cell = self._grid_cell_at(event)
+        # "base" remembers the state of each painted cell from before the drag, to restore it if the rectangle shrinks
+        self._grid_drag = {"anchor": cell, "cell": None, "select": cell not in self.selected_grid_cells, "rect": set(), "base": {}}
+        self._paint_grid_rect(cell)
+
+    def _on_grid_cell_drag(self, event):
+        if self._grid_drag is not None:
+            self._paint_grid_rect(self._grid_cell_at(event))
+
+    def _on_grid_cell_release(self, event=None):
+        self._grid_drag = None
+
+    def _paint_grid_rect(self, cell):
+        """Paint the rectangle from the drag's anchor to ``cell``, touching only cells that entered or left it."""
+        drag = self._grid_drag
+        if cell == drag["cell"]: return
+        (r0, c0), (r1, c1) = drag["anchor"], cell
+        rect = {(r, c) for r in range(min(r0, r1), max(r0, r1) + 1) for c in range(min(c0, c1), max(c0, c1) + 1)}
+        for old in drag["rect"] - rect:
+            self._set_grid_cell(old, drag["base"].pop(old))
+        for new in rect - drag["rect"]:
+            drag["base"][new] = new in self.selected_grid_cells
+            self._set_grid_cell(new, drag["select"])
+        drag["rect"], drag["cell"] = rect, cell
 
     def _confirm_grid_selection(self, cancelled=False, creation_type=None):
         if cancelled or not self.selected_grid_cells:
             if self.grid_window and self.grid_window.winfo_exists(): self.grid_window.destroy()
-            self.selected_grid_cells = []
+            self.selected_grid_cells = set()
             if not cancelled: simpledialog.messagebox.showinfo("Info", "No cells selected.", parent=self.root)
             return
         min_r,max_r = min(r for r,c in self.selected_grid_cells),max(r for r,c in self.selected_grid_cells)
@@ -846,15 +1019,15 @@ class DesktopAutomationApp:
         width,height = (max_c-min_c+1)*self.cell_width, (max_r-min_r+1)*self.cell_height
         coords = (int(x1),int(y1),int(width),int(height))
         if creation_type is None:
-            creation_type = self.frames["ObjectCreationFrame"].current_creation_type
+            creation_type = self.get_frame("ObjectCreationFrame").current_creation_type
         obj_name = simpledialog.askstring(f"Name {creation_type.capitalize()} Object", f"Enter name for selected {creation_type}:", parent=self.root)
         if obj_name:
             if creation_type == "region":
-                obj_data={"type":"region","mode":"grid","coords":coords,"cells":list(self.selected_grid_cells)}
+                obj_data={"type":"region","mode":"grid","coords":coords,"cells":sorted(self.selected_grid_cells)}
                 if self.add_object(obj_name, obj_data): simpledialog.messagebox.showinfo("Region Created", f"Region '{obj_name}' created.", parent=self.root)
             elif creation_type == "image":
                 try:
-                    self.root.withdraw(); time.sleep(0.2); img = pyautogui.screenshot(region=coords); self.root.deiconify()
+                    self.root.withdraw(); time.sleep(0.2); img = load_pyautogui().screenshot(region=coords); self.root.deiconify()
                     base_img_filename = f"{obj_name.replace(' ', '_').replace('.', '_')}.png"; final_abs_img_path = ""
                     if self.current_project_path:
                         images_dir = os.path.join(self.current_project_path, "images"); os.makedirs(images_dir, exist_ok=True)
@@ -866,11 +1039,11 @@ class DesktopAutomationApp:
                     obj_data={"type":"image","mode":"grid","image_path":final_abs_img_path,"capture_coords":coords,"confidence":0.8}
                     if self.add_object(obj_name,obj_data): simpledialog.messagebox.showinfo("Image Created",f"Image '{obj_name}' captured.",parent=self.root)
                 except Exception as e: self.root.deiconify(); simpledialog.messagebox.showerror("Error",f"Capture image error: {e}",parent=self.root)
-        if self.grid_window and self.grid_window.winfo_exists(): self.grid_window.destroy(); self.selected_grid_cells = []
+        if self.grid_window and self.grid_window.winfo_exists(): self.grid_window.destroy(); self.selected_grid_cells = set()
 
     def create_region_drag_mode(self, creation_type=None):
         if creation_type is None:
-            creation_type = self.frames["ObjectCreationFrame"].current_creation_type
+            creation_type = self.get_frame("ObjectCreationFrame").current_creation_type
         if self.drag_select_window and self.drag_select_window.winfo_exists(): return
         self.drag_select_window = tk.Toplevel(self.root)
         self.drag_select_window.attributes('-fullscreen',True); self.drag_select_window.attributes('-alpha',0.3); self.drag_select_window.attributes('-topmost',True)
@@ -892,7 +1065,7 @@ class DesktopAutomationApp:
                     if self.add_object(obj_name,obj_data): simpledialog.messagebox.showinfo("Region Created",f"Region '{obj_name}' created.",parent=self.root)
                 elif creation_type == "image":
                     try:
-                        self.root.withdraw(); time.sleep(0.2); img = pyautogui.screenshot(region=coords); self.root.deiconify()
+                        self.root.withdraw(); time.sleep(0.2); img = load_pyautogui().screenshot(region=coords); self.root.deiconify()
                         base_img_filename=f"{obj_name.replace(' ','_').replace('.','_')}.png"; final_abs_img_path=""
                         if self.current_project_path:
                             images_dir=os.path.join(self.current_project_path,"images"); os.makedirs(images_dir,exist_ok=True)
@@ -906,7 +1079,7 @@ class DesktopAutomationApp:
                     except Exception as e: self.root.deiconify(); simpledialog.messagebox.showerror("Error",f"Capture image error: {e}",parent=self.root)
         def on_escape_drag(event=None):
             if self.drag_select_window: self.drag_select_window.destroy(); self.drag_select_window=None
-            self.drag_start_x,self.drag_start_y,self.drag_rect_id=None,None,None; print("Drag selection cancelled.")
+            self.drag_start_x,self.drag_start_y,self.drag_rect_id=None,None,None; log.debug("Drag selection cancelled.")
         drag_canvas.bind("<ButtonPress-1>",on_b1_press); drag_canvas.bind("<B1-Motion>",on_b1_motion)
         drag_canvas.bind("<ButtonRelease-1>",on_b1_release); self.drag_select_window.bind("<Escape>",on_escape_drag)
         self.drag_select_window.focus_force()
@@ -925,46 +1098,44 @@ class DesktopAutomationApp:
 
     def new_sequence(self):
         if not self._check_unsaved_changes(): return
-        self.objects={}; self.current_steps=[]
-        self.frames["StepCreatorFrame"].clear_and_rebuild_steps([])
+        self.objects={}; self.sequence.replace([])
         self.loop_count.set(1); self.current_project_path=None; self.current_sequence_name=DEFAULT_PROJECT_NAME
+        self._refresh_sequence_views()
         self.mark_sequence_modified(False)
-        self.frames["ObjectCreationFrame"].update_objects_display(); self.frames["MainFrame"].refresh_content()
-        print("New sequence created.")
+        log.info("New sequence created.")
 
     def save_sequence(self):
         if not self.current_project_path: return self.save_sequence_as()
         else:
-            self.frames["StepCreatorFrame"].finalize_steps_for_controller()
             project_dir=self.current_project_path; sequence_filename=os.path.join(project_dir,f"{self.current_sequence_name}.json")
             project_images_dir=os.path.join(project_dir,"images"); os.makedirs(project_images_dir,exist_ok=True)
-            data_to_save={"sequence_name":self.current_sequence_name,"loop_count":self.loop_count.get(),"objects":{},"steps":self.current_steps}
+            data_to_save={"sequence_name":self.current_sequence_name,"loop_count":self.loop_count.get(),"objects":{},"steps":self.sequence.to_data()}
             for obj_name,obj_data_in_memory in self.objects.items():
                 obj_data_for_json=obj_data_in_memory.copy()
                 if obj_data_for_json.get("type")=="image":
                     current_abs_image_path=obj_data_in_memory.get("image_path")
                     if not current_abs_image_path or not os.path.isabs(current_abs_image_path):
-                        print(f"Warning: Img obj '{obj_name}' invalid path: {current_abs_image_path}. Skipping."); data_to_save["objects"][obj_name]=obj_data_for_json; continue
+                        log.warning("Warning: Img obj '%s' invalid path: %s. Skipping.", obj_name, current_abs_image_path); data_to_save["objects"][obj_name]=obj_data_for_json; continue
                     if not os.path.exists(current_abs_image_path):
-                        print(f"Warning: Img file for '{obj_name}' not found: {current_abs_image_path}. Storing as is."); data_to_save["objects"][obj_name]=obj_data_for_json; continue
+                        log.warning("Warning: Img file for '%s' not found: %s. Storing as is.", obj_name, current_abs_image_path); data_to_save["objects"][obj_name]=obj_data_for_json; continue
                     img_basename=os.path.basename(current_abs_image_path)
                     target_abs_path_in_project_images=os.path.join(project_images_dir,img_basename)
                     norm_current_path=os.path.normpath(current_abs_image_path); norm_target_path=os.path.normpath(target_abs_path_in_project_images)
                     if norm_current_path != norm_target_path:
                         try:
-                            shutil.copy2(current_abs_image_path,target_abs_path_in_project_images); print(f"Copied img for '{obj_name}' to: {target_abs_path_in_project_images}")
+                            import shutil
+                            shutil.copy2(current_abs_image_path,target_abs_path_in_project_images); log.info("Copied img for '%s' to: %s", obj_name, target_abs_path_in_project_images)
                             self.objects[obj_name]["image_path"]=target_abs_path_in_project_images
-                        except Exception as e: print(f"Error copying img {current_abs_image_path}: {e}"); simpledialog.messagebox.showerror("Save Error",f"Could not copy img asset {img_basename} for {obj_name}",parent=self.root)
+                        except Exception as e: log.error("Error copying img %s: %s", current_abs_image_path, e); simpledialog.messagebox.showerror("Save Error",f"Could not copy img asset {img_basename} for {obj_name}",parent=self.root)
                     obj_data_for_json["image_path"]=os.path.join("images",img_basename)
                 data_to_save["objects"][obj_name]=obj_data_for_json
             try:
                 with open(sequence_filename,'w') as f: json.dump(data_to_save,f,indent=4)
                 simpledialog.messagebox.showinfo("Save Sequence",f"Sequence '{self.current_sequence_name}' saved.",parent=self.root)
-                self.mark_sequence_modified(False); self.frames["MainFrame"].refresh_content(); return True
+                self.mark_sequence_modified(False); self.get_frame("MainFrame").refresh_content(); return True
             except Exception as e: simpledialog.messagebox.showerror("Save Error",f"Could not save seq: {e}",parent=self.root); return False
 
     def save_sequence_as(self):
-        self.frames["StepCreatorFrame"].finalize_steps_for_controller()
         project_dir = filedialog.askdirectory(title="Select Project Folder for Sequence", parent=self.root)
         if not project_dir: return False
         default_name=self.current_sequence_name if self.current_sequence_name!=DEFAULT_PROJECT_NAME else "MyNewSequence"
@@ -978,200 +1149,92 @@ class DesktopAutomationApp:
         filepath = filedialog.askopenfilename(title="Load Sequence File",defaultextension=".json",filetypes=[("JSON files","*.json"),("All files","*.*")],parent=self.root)
         if not filepath: return
         try:
-            with open(filepath,'r') as f: loaded_data=json.load(f)
-            self.current_project_path=os.path.dirname(filepath)
-            self.current_sequence_name=loaded_data.get("sequence_name",os.path.splitext(os.path.basename(filepath))[0])
-            temp_objects={};
-            for obj_name,obj_data in loaded_data.get("objects",{}).items():
-                obj_copy=obj_data.copy()
-                if obj_copy.get("type")=="image" and obj_copy.get("image_path"):
-                    relative_img_path=obj_copy["image_path"]
-                    abs_image_path=os.path.join(self.current_project_path,relative_img_path)
-                    if os.path.exists(abs_image_path): obj_copy["image_path"]=abs_image_path
-                    else: print(f"Warning: Img asset not found for '{obj_name}': {abs_image_path}")
-                temp_objects[obj_name]=obj_copy
-            self.objects=temp_objects
-            self.current_steps=loaded_data.get("steps",[]); self.loop_count.set(loaded_data.get("loop_count",1))
-            self.frames["ObjectCreationFrame"].update_objects_display()
-            self.frames["StepCreatorFrame"].clear_and_rebuild_steps(self.current_steps)
-            self.frames["MainFrame"].refresh_content(); self.mark_sequence_modified(False)
+            loaded = load_sequence_file(filepath)
+            self.current_project_path=loaded["project_path"]
+            self.current_sequence_name=loaded["sequence_name"]
+            self.objects=loaded["objects"]
+            self.sequence.replace(loaded["steps"]); self.loop_count.set(loaded["loop_count"])
+            self._refresh_sequence_views(); self.mark_sequence_modified(False)
             simpledialog.messagebox.showinfo("Load Sequence",f"Sequence '{self.current_sequence_name}' loaded.",parent=self.root)
         except Exception as e:
             simpledialog.messagebox.showerror("Load Error",f"Could not load sequence: {e}",parent=self.root)
             self.new_sequence()
 
+    def _refresh_sequence_views(self):
+        """Refresh built frames after the whole sequence was replaced (new/load)."""
+        self._refresh_all_object_views()
+        mf = self.frames.get("MainFrame")
+        if mf is not None: mf.refresh_content()
+
     def run_sequence(self):
-        self.frames["StepCreatorFrame"].finalize_steps_for_controller()
-        if not self.current_steps:
+        if self._looper_active or (self.engine and self.engine.is_running()):
+            simpledialog.messagebox.showinfo("Run Sequence", "A sequence is already running.", parent=self.root); return
+        steps = [step for step in self.sequence.steps if step.action]
+        if not steps:
             simpledialog.messagebox.showinfo("Run Sequence", "No steps to run.", parent=self.root); return
         try:
             loops_to_run = self.loop_count.get()
             if loops_to_run < 0: simpledialog.messagebox.showerror("Error","Loop count cannot be negative.",parent=self.root); return
         except tk.TclError: simpledialog.messagebox.showerror("Error","Invalid loop count.",parent=self.root); return
 
-        self.root.iconify(); time.sleep(0.5)
-        pyautogui.FAILSAFE = True
-
-        print(f"--- Running Sequence: {self.current_sequence_name} ---")
-        is_infinite_loop = (loops_to_run == 0)
-        if is_infinite_loop: print("Looping indefinitely. Ctrl+C or Failsafe to stop.")
-        else: print(f"Looping {loops_to_run} times.")
-
-        current_loop_iter = 0
         try:
-            while True: # Outer loop for sequence repetitions
-                current_loop_iter += 1
-                if not is_infinite_loop and current_loop_iter > loops_to_run:
-                    break # All specified loops are done
-
-                if is_infinite_loop:
-                    print(f"Executing Loop {current_loop_iter}")
-                else:
-                    print(f"Executing Loop {current_loop_iter}/{loops_to_run}")
-
-                program_counter = 0
-                while program_counter < len(self.current_steps): # Inner loop for steps
-                    step = self.current_steps[program_counter]
-                    print(f"  Step {program_counter + 1}/{len(self.current_steps)}: Action: {step['action']}, Object: {step.get('object_name', 'N/A')}, Params: {step.get('params', {})}")
-
-                    obj_name = step.get("object_name"); action = step.get("action"); params = step.get("params", {})
-                    target_object = self.objects.get(obj_name) if obj_name else None
-                    
-                    jump_to_pc = -1 # Use -1 to indicate no jump, otherwise set to target 0-based PC
-
-                    try:
-                        image_path_to_use = None
-                        if target_object and target_object.get("type") == "image":
-                            image_path_to_use = target_object.get("image_path")
-                            if image_path_to_use and not os.path.exists(image_path_to_use):
-                                print(f"    ERROR: Image file missing for object '{obj_name}' at path: {image_path_to_use}")
-
-                        # --- LOGIC ACTIONS ---
-                        if action == "Goto Step":
-                            target_step_num = params.get("target_step")
-                            if isinstance(target_step_num, int) and 1 <= target_step_num <= len(self.current_steps):
-                                jump_to_pc = target_step_num - 1 
-                            else: print(f"    WARN: Invalid target step for Goto: {target_step_num}.")
-                        
-                        elif action == "If Image Found":
-                            condition_obj_name = params.get("condition_object_name")
-                            condition_object = self.objects.get(condition_obj_name)
-                            then_step = params.get("then_step"); else_step = params.get("else_step")
-                            if condition_object and condition_object.get("type") == "image":
-                                cond_img_path = condition_object.get("image_path")
-                                confidence = params.get("confidence", condition_object.get("confidence", 0.8))
-                                if cond_img_path and os.path.exists(cond_img_path) and pyautogui.locateOnScreen(cond_img_path, confidence=confidence):
-                                    print(f"    IF: Image '{condition_obj_name}' FOUND.")
-                                    if isinstance(then_step, int) and 1 <= then_step <= len(self.current_steps):
-                                        jump_to_pc = then_step - 1
-                                    elif then_step is not None: print(f"    WARN: Invalid 'Then' step for If Image Found: {then_step}.")
-                                else: # Image NOT found
-                                    print(f"    IF: Image '{condition_obj_name}' NOT found.")
-                                    if isinstance(else_step, int) and 1 <= else_step <= len(self.current_steps):
-                                        jump_to_pc = else_step - 1
-                                    elif else_step is not None: print(f"    WARN: Invalid 'Else' step for If Image Found: {else_step}.")
-                            else: print(f"    WARN: Invalid condition object for 'If Image Found': {condition_obj_name}.")
-
-                        elif action == "If Pixel Color":
-                            condition_obj_name = params.get("condition_object_name")
-                            condition_object = self.objects.get(condition_obj_name)
-                            expected_rgb_param = params.get("expected_rgb")
-                            expected_rgb = tuple(expected_rgb_param) if isinstance(expected_rgb_param, list) else (expected_rgb_param if isinstance(expected_rgb_param, tuple) else (condition_object.get("rgb") if condition_object else None))
-                            then_step = params.get("then_step"); else_step = params.get("else_step")
-                            if condition_object and condition_object.get("type") == "pointRGB" and expected_rgb:
-                                px, py = condition_object["coords"]
-                                current_rgb = pyautogui.pixel(px,py)
-                                if current_rgb == expected_rgb:
-                                    print(f"    IF: Point '{condition_obj_name}' color MATCHED.")
-                                    if isinstance(then_step, int) and 1 <= then_step <= len(self.current_steps):
-                                        jump_to_pc = then_step - 1
-                                    elif then_step is not None: print(f"    WARN: Invalid 'Then' step for If Pixel Color: {then_step}.")
-                                else: # Pixel color NOT matched
-                                    print(f"    IF: Point '{condition_obj_name}' color ({current_rgb}) did NOT match {expected_rgb}.")
-                                    if isinstance(else_step, int) and 1 <= else_step <= len(self.current_steps):
-                                        jump_to_pc = else_step - 1
-                                    elif else_step is not None: print(f"    WARN: Invalid 'Else' step for If Pixel Color: {else_step}.")
-                            else: print(f"    WARN: Invalid condition object/RGB for 'If Pixel Color'. Expected RGB was {expected_rgb}")
-                        
-                        # --- STANDARD ACTIONS (Only if no logic jump will occur from this step) ---
-                        if jump_to_pc == -1 : # No jump determined by a logic action yet
-                            if target_object: # Object-based actions
-                                obj_type = target_object.get("type"); obj_coords = target_object.get("coords")
-                                if action == "Click":
-                                    button_type = params.get("button", "left"); num_clicks = params.get("clicks", 1)
-                                    interval_s = params.get("interval", 0.1 if num_clicks > 1 else 0.0)
-                                    click_x, click_y = None, None
-                                    if obj_type == "region" and obj_coords: click_x, click_y = obj_coords[0]+obj_coords[2]/2, obj_coords[1]+obj_coords[3]/2
-                                    elif obj_type == "pointRGB" and obj_coords: click_x, click_y = obj_coords[0], obj_coords[1]
-                                    elif obj_type == "image" and image_path_to_use:
-                                        loc = pyautogui.locateCenterOnScreen(image_path_to_use, confidence=params.get("confidence", target_object.get("confidence",0.8)))
-                                        if loc: click_x, click_y = loc
-                                        else: print(f"    WARN: Image '{obj_name}' not found for click.") 
-                                    else: print(f"    WARN: Cannot Click obj '{obj_name}' type '{obj_type}'.")
-                                    if click_x is not None: pyautogui.click(x=click_x,y=click_y,clicks=num_clicks,interval=interval_s,button=button_type); print(f"    Clicked {button_type} {num_clicks}x at ({click_x:.0f},{click_y:.0f})")
-                                    else: print(f"    WARN: Click coords not determined for {obj_name}.")
-                                elif action == "Wait for Image" and obj_type == "image" and image_path_to_use:
-                                    start_time = time.time(); timeout = params.get("timeout_s", 10); found = False
-                                    while time.time() - start_time < timeout:
-                                        if pyautogui.locateOnScreen(image_path_to_use, confidence=params.get("confidence", target_object.get("confidence",0.8))):
-                                            print(f"    Image '{obj_name}' found."); found = True; break
-                                        time.sleep(0.25) 
-                                    if not found: print(f"    TIMEOUT: Image '{obj_name}' not found after {timeout}s.")
-                                elif action == "Wait for Pixel Color" and obj_type == "pointRGB":
-                                    expected_rgb_wfp = params.get("expected_rgb")
-                                    expected_rgb_wfp = tuple(expected_rgb_wfp) if isinstance(expected_rgb_wfp, list) else (expected_rgb_wfp if isinstance(expected_rgb_wfp, tuple) else target_object.get("rgb"))
-                                    if not expected_rgb_wfp: print(f"    ERROR: No RGB for point '{obj_name}'.")
-                                    else:
-                                        timeout = params.get("timeout_s",10); start_time=time.time(); found_color=False
-                                        while time.time()-start_time < timeout:
-                                            current_rgb = pyautogui.pixel(obj_coords[0],obj_coords[1])
-                                            if current_rgb == expected_rgb_wfp: print(f"    Point color matched."); found_color=True; break
-                                            time.sleep(0.25)
-                                        if not found_color: print(f"    TIMEOUT: Point color not matched. Last: {current_rgb}")
-                            # Global actions
-                            if action == "Wait":
-                                duration = params.get("duration_s", 1.0); min_dur = params.get("min_s"); max_dur = params.get("max_s")
-                                if min_dur is not None and max_dur is not None: wait_time=random.uniform(min_dur,max_dur); print(f"    Random Wait: {wait_time:.2f}s"); time.sleep(wait_time)
-                                else: print(f"    Static Wait: {duration}s"); time.sleep(duration)
-                            elif action == "Keyboard Input": 
-                                text_to_type = params.get("text_to_type", "")
-                                if text_to_type: pyautogui.typewrite(text_to_type, interval=params.get("interval", 0.01)); print(f"    Typed: '{text_to_type}'")
-                                else: print(f"    WARN: No text specified for Keyboard Input.")
-                            elif action == "Press Key": 
-                                key_to_press = params.get("key_to_press")
-                                if key_to_press: pyautogui.press(key_to_press); print(f"    Pressed Key: '{key_to_press}'")
-                                else: print(f"    WARN: No key specified for Press Key.")
-                            elif action == "Hotkey Combo": 
-                                selected_hotkey_name = params.get("selected_hotkey_name")
-                                if selected_hotkey_name and selected_hotkey_name in PREDEFINED_HOTKEYS:
-                                    keys_to_press = PREDEFINED_HOTKEYS[selected_hotkey_name]
-                                    pyautogui.hotkey(*keys_to_press); print(f"    Executed Hotkey Combo: {selected_hotkey_name} ({keys_to_press})")
-                                else: print(f"    WARN: Invalid or no hotkey selected: '{selected_hotkey_name}'")
-                            elif action == "Scroll": 
-                                direction=params.get("direction","down"); amount=params.get("amount",10)
-                                scroll_x=params.get("x"); scroll_y=params.get("y")
-                                scroll_val = -amount if direction in ["down","left"] else amount
-                                if direction in ["up","down"]: pyautogui.scroll(scroll_val,x=scroll_x,y=scroll_y)
-                                elif direction in ["left","right"]: pyautogui.hscroll(scroll_val,x=scroll_x,y=scroll_y)
-                                print(f"    Scrolled {direction} by {abs(amount)}" + (f" at ({scroll_x},{scroll_y})" if scroll_x is not None else ""))
-                    
-                    except pyautogui.FailSafeException: print("!!! FAILSAFE TRIGGERED !!!"); self.root.deiconify(); return
-                    except Exception as e:
-                        import traceback
-                        print(f"    ERROR executing step {program_counter + 1} ({action} on {obj_name}): {e}")
-                        traceback.print_exc()
-
-                    if jump_to_pc != -1:
-                        program_counter = jump_to_pc
-                    else:
-                        program_counter += 1
-                # End of inner while (steps loop)
-            # End of outer while (sequence repetitions loop)
-        except KeyboardInterrupt: print("\n--- Execution Interrupted by User (Ctrl+C) ---")
-        finally:
-            self.root.deiconify()
-            print(f"--- Sequence Finished: {self.current_sequence_name} ---")
-
+            engine = SequenceEngine(steps, self.objects, loops_to_run, self.current_sequence_name,
+                                    events=self.engine_events, start_delay_s=0.5, templates=self.template_cache,
+                                    log_level=self.run_log_level.get(),
+                                    trace=RunTrace(self.current_sequence_name) if self.record_trace.get() else None)
+        except SequenceCompileError as e:
+            shown = "\n".join(e.problems[:15]) + (f"\n... and {len(e.problems) - 15} more" if len(e.problems) > 15 else "")
+            simpledialog.messagebox.showerror("Invalid Sequence", f"Fix these steps before running:\n\n{shown}", parent=self.root); return
+
+        self.root.iconify()
+        # The worker waits out the iconify animation instead of the UI thread
+        self.engine = engine
+        self.engine.start()
+        self._schedule_engine_drain()
+
+    def stop_sequence(self):
+        if self.engine and self.engine.is_running():
+            self.engine.stop()
+            self.run_status_var.set("Stopping...")
+
+    def _schedule_engine_drain(self):
+        if not self._engine_drain_scheduled:
+            self._engine_drain_scheduled = True
+            self.root.after(self.ENGINE_DRAIN_MS, self._drain_engine_events)
+
+    def _drain_engine_events(self):
+        """Apply queued engine events on the Tk thread; only the latest status is drawn."""
+        self._engine_drain_scheduled = False
+        status = None; finished = None
+        try:
+            while True:
+                kind, payload = self.engine_events.get_nowait()
+                if kind == "step":
+                    status = f"Step {payload['index'] + 1}/{payload['count']}: {payload['action']}"
+                elif kind == "loop":
+                    total = payload['total']
+                    status = f"Loop {payload['iteration']}" + (f"/{total}" if total else "")
+                elif kind == "started":
+                    status = f"Running: {payload['name']}"
+                elif kind == "finished":
+                    finished = payload
+        except queue.Empty:
+            pass
+        if finished is not None:
+            self.run_status_var.set(f"Finished ({finished['reason']})")
+            if not self._looper_active:
+                self.root.deiconify()
+                trace = self.engine.trace if self.engine else None
+                if trace is not None:
+                    saved = self._save_trace(trace, self.engine.name)
+                    if saved: self.show_toast(f"Trace saved: {os.path.basename(saved)}")
+                if self.show_stats_after_run.get():
+                    self.root.after_idle(self.open_run_stats_window)
+        elif status is not None:
+            self.run_status_var.set(status)
+        # Keep draining while a run or the looper is going, or events are still queued
+        if self._looper_active or (self.engine and self.engine.is_running()) or not self.engine_events.empty():
+            self._schedule_engine_drain()
 
 # --- UI Frame Classes ---
 class BaseFrame(tk.Frame):
@@ -1179,10 +1242,7 @@ class BaseFrame(tk.Frame):
         super().__init__(parent)
         self.controller = controller
         # Use a neutral background that doesn't fight the system theme
-        try:
-            self.configure(bg=self.master.cget("bg"))
-        except Exception:
-            self.configure(bg="#F5F6F8")
+        controller.themed(self, bg="bg")
 
 class MainFrame(BaseFrame):
     def __init__(self, parent, controller):
@@ -1219,8 +1279,19 @@ class MainFrame(BaseFrame):
         loop_frame = ttk.Frame(self); loop_frame.pack(pady=8,padx=20,fill="x")
         ttk.Label(loop_frame,text="Loops (0=inf):").pack(side=tk.LEFT)
         ttk.Entry(loop_frame,textvariable=controller.loop_count,width=6,justify="center").pack(side=tk.LEFT,padx=5)
-
-        ttk.Button(self,text="Run Sequence",width=24,command=controller.run_sequence).pack(pady=15,padx=20,fill="x")
+        ttk.Combobox(loop_frame,textvariable=controller.run_log_level,values=list(logs.LEVELS),state="readonly",width=9).pack(side=tk.RIGHT)
+        ttk.Label(loop_frame,text="Log:").pack(side=tk.RIGHT,padx=(0,5))
+
+        run_frame = ttk.Frame(self); run_frame.pack(pady=(15,4),padx=20,fill="x")
+        ttk.Button(run_frame,text="Run Sequence",width=24,command=controller.run_sequence).pack(side=tk.LEFT,expand=True,fill="x",padx=(0,3))
+        ttk.Button(run_frame,text="Stop",width=8,command=controller.stop_sequence).pack(side=tk.LEFT,padx=(3,0))
+        status_frame = ttk.Frame(self); status_frame.pack(pady=(0,10),padx=20,fill="x")
+        ttk.Label(status_frame,text="Status:").pack(side=tk.LEFT)
+        ttk.Label(status_frame,textvariable=controller.run_status_var,anchor="w").pack(side=tk.LEFT,expand=True,fill="x",padx=5)
+        stats_frame = ttk.Frame(self); stats_frame.pack(pady=(0,10),padx=20,fill="x")
+        ttk.Button(stats_frame,text="Run Statistics...",command=controller.open_run_stats_window).pack(side=tk.LEFT)
+        ttk.Checkbutton(stats_frame,text="Show after each run",variable=controller.show_stats_after_run).pack(side=tk.LEFT,padx=8)
+        ttk.Checkbutton(stats_frame,text="Record trace",variable=controller.record_trace).pack(side=tk.LEFT)
 
     def refresh_content(self):
         if self.controller.current_sequence_name == DEFAULT_PROJECT_NAME and not self.controller.current_project_path:
@@ -1233,6 +1304,8 @@ class ObjectCreationFrame(BaseFrame):
     def __init__(self, parent, controller):
         super().__init__(parent, controller)
         self.current_creation_type = "region"
+        controller.subscribe_objects(self._on_object_event)
+        self.bind("<Destroy>", lambda e: e.widget is self and controller.unsubscribe_objects(self._on_object_event), add="+")
 
         header = ttk.Frame(self)
         header.pack(fill="x")
@@ -1276,6 +1349,7 @@ class ObjectCreationFrame(BaseFrame):
         btn_bar = ttk.Frame(self.objects_list_frame)
         btn_bar.pack(fill='x', pady=4)
         ttk.Button(btn_bar, text='Delete Selected', command=self._delete_selected_object).pack(side=tk.RIGHT)
+        ttk.Button(btn_bar, text='Pixel Signature from Selected', command=self._create_pixel_signature).pack(side=tk.RIGHT, padx=4)
     def set_creation_type_and_run(self, c_type, func_to_run):
         self.current_creation_type = c_type
         try:
@@ -1297,6 +1371,7 @@ class ObjectCreationFrame(BaseFrame):
         lab.pack(padx=10, pady=(0,10))
         stop_evt = threading.Event()
         latest = {'x': 0, 'y': 0}
+        pyautogui = load_pyautogui()
 
         def poll():
             while not stop_evt.is_set():
@@ -1330,26 +1405,55 @@ class ObjectCreationFrame(BaseFrame):
         ui_update()
         pop.bind('<Return>', confirm)
         pop.bind('<Escape>', cancel)
+    def _object_row_values(self, name, data):
+        obj_type=data.get("type","N/A"); details=""
+        display_type = obj_type
+        if obj_type in ("region","image") and data.get('coords'):
+            details=f"Coords: {data.get('coords')}"
+        if obj_type=="image" and data.get('image_path'):
+            details+=f", Path: {os.path.basename(data['image_path'])}"
+        if obj_type=="image":
+            padding = data.get('search_padding', DEFAULT_SEARCH_PADDING)
+            details+=", Search: full screen" if padding < 0 else f", Search: ±{padding}px"
+            backend = data.get('match_backend', DEFAULT_MATCH_BACKEND)
+            if backend != DEFAULT_MATCH_BACKEND or data.get('grayscale') or data.get('pyramid'):
+                details+=f", Match: {backend}{' gray' if data.get('grayscale') else ''}{' pyramid' if data.get('pyramid') else ''}"
+        elif obj_type=="pointRGB":
+            details=f"Coords: {data.get('coords')}, RGB: {data.get('rgb')}"
+            display_type = "pointRGB"
+        elif obj_type=="pixelSignature":
+            details=f"{len(data.get('points') or [])} points, Tolerance: ±{data.get('tolerance', 0)}"
+        if data.get('mode') == 'point' and obj_type == 'region':
+            display_type = "point"
+        return (name, display_type, details)
     def update_objects_display(self):
+        # Rows are keyed by object name, so single-object events touch only their row
         try:
-            for i in self.objects_tree.get_children(''):
-                self.objects_tree.delete(i)
+            self.objects_tree.delete(*self.objects_tree.get_children(''))
             for name,data in self.controller.objects.items():
-                obj_type=data.get("type","N/A"); details=""
-                display_type = obj_type
-                if obj_type in ("region","image") and data.get('coords'):
-                    details=f"Coords: {data.get('coords')}"
-                if obj_type=="image" and data.get('image_path'):
-                    details+=f", Path: {os.path.basename(data['image_path'])}"
-                elif obj_type=="pointRGB":
-                    details=f"Coords: {data.get('coords')}, RGB: {data.get('rgb')}"
-                    display_type = "pointRGB"
-                if data.get('mode') == 'point' and obj_type == 'region':
-                    display_type = "point"
-                self.objects_tree.insert('', 'end', values=(name, display_type, details))
+                self.objects_tree.insert('', 'end', iid=name, values=self._object_row_values(name, data))
         except Exception as e:
             if hasattr(self.controller,'logger'):
                 self.controller.logger.exception('update_objects_display failed')
+    def _on_object_event(self, kind, payload):
+        tree, name = self.objects_tree, payload["name"]
+        try:
+            if kind == "added":
+                tree.insert('', 'end', iid=name, values=self._object_row_values(name, self.controller.objects[name]))
+            elif kind == "deleted":
+                if tree.exists(name): tree.delete(name)
+            elif kind == "renamed":
+                old_name = payload["old_name"]; index = 'end'; selected = False
+                if tree.exists(old_name):
+                    index = tree.index(old_name); selected = old_name in tree.selection()
+                    tree.delete(old_name)
+                tree.insert('', index, iid=name, values=self._object_row_values(name, self.controller.objects[name]))
+                if selected: tree.selection_add(name)
+            elif kind == "updated" and tree.exists(name):
+                tree.item(name, values=self._object_row_values(name, self.controller.objects[name]))
+        except Exception:
+            if hasattr(self.controller,'logger'):
+                self.controller.logger.exception('Object list update failed')
     def refresh_content(self): self.update_objects_display()
 
     def _delete_selected_object(self):
@@ -1362,18 +1466,63 @@ class ObjectCreationFrame(BaseFrame):
                 return
             name = vals[0]
             if simpledialog.messagebox.askyesno('Delete Object', f"Delete object '{name}'? This cannot be undone.", parent=self.controller.root):
-                if name in self.controller.objects:
-                    del self.controller.objects[name]
-                    self.update_objects_display()
-                    try:
-                        self.controller.frames["StepCreatorFrame"].refresh_object_dropdowns()
-                    except Exception:
-                        pass
+                if self.controller.delete_object(name):
                     self.controller.show_toast(f"Deleted object: {name}")
-                    self.controller.mark_sequence_modified()
         except Exception as e:
             if hasattr(self.controller, 'logger'):
                 self.controller.logger.exception('Delete object failed')
+    def _create_pixel_signature(self):
+        names = [self.objects_tree.item(i, 'values')[0] for i in self.objects_tree.selection()]
+        points = [self.controller.objects[n] for n in names if self.controller.objects.get(n, {}).get('type') == 'pointRGB']
+        if not points:
+            simpledialog.messagebox.showinfo('Pixel Signature', 'Select one or more pointRGB objects (Ctrl/Shift+click) to combine into a pixel signature.', parent=self.controller.root)
+            return
+        tolerance = simpledialog.askinteger('Pixel Signature', f"Per-channel colour tolerance for the {len(points)} points (0 = exact):",
+                                            initialvalue=10, minvalue=0, maxvalue=255, parent=self.controller.root)
+        if tolerance is None:
+            return
+        obj_name = simpledialog.askstring('Name Pixel Signature', 'Enter name:', parent=self.controller.root)
+        if not obj_name:
+            return
+        obj_data = {"type": "pixelSignature", "tolerance": tolerance,
+                    "points": [{"coords": list(p['coords'][:2]), "rgb": list(p['rgb'])} for p in points]}
+        if self.controller.add_object(obj_name, obj_data):
+            self.controller.show_toast(f"Pixel signature '{obj_name}' saved ({len(points)} points)")
+
+    def _edit_search_padding(self, name):
+        obj = self.controller.objects.get(name)
+        if not obj:
+            return
+        current = obj.get('search_padding', DEFAULT_SEARCH_PADDING)
+        value = simpledialog.askinteger(
+            'Search Padding',
+            f"Pixels to search around the capture location of '{name}'\n"
+            "before falling back to a full-screen search (-1 = full screen only):",
+            initialvalue=current, minvalue=-1, parent=self.controller.root)
+        if value is None or value == current:
+            return
+        obj['search_padding'] = value
+        self.controller._notify_objects("updated", name=name)
+        self.controller.mark_sequence_modified()
+    def _edit_match_options(self, name):
+        obj = self.controller.objects.get(name)
+        if not obj:
+            return
+        dialog = ImageMatchOptionsDialog(self.controller.root, f"Matching Options: {name}", obj)
+        if dialog.result is None:
+            return
+        for key, value in dialog.result.items():
+            if key == 'match_backend' and value == DEFAULT_MATCH_BACKEND: obj.pop(key, None)
+            elif value is False: obj.pop(key, None)
+            else: obj[key] = value
+        self.controller._notify_objects("updated", name=name)
+        self.controller.mark_sequence_modified()
+
+    def _rename_object(self, name):
+        new_name = simpledialog.askstring('Rename Object', f"New name for '{name}':", initialvalue=name, parent=self.controller.root)
+        if new_name and self.controller.rename_object(name, new_name.strip()):
+            self.controller.show_toast(f"Renamed object: {name} -> {new_name.strip()}")
+
     def _on_object_double_click(self, event=None):
         try:
             sel = self.objects_tree.selection()
@@ -1397,11 +1546,14 @@ class ObjectCreationFrame(BaseFrame):
                 obj_name = None
             menu = tk.Menu(self, tearoff=0)
             if obj_name:
+                menu.add_command(label='Rename...', command=lambda n=obj_name: self._rename_object(n))
                 obj = self.controller.objects.get(obj_name)
                 if obj and obj.get('type') == 'image':
                     img_path = obj.get('image_path')
                     if img_path and os.path.exists(img_path):
                         menu.add_command(label='Open Image Location', command=lambda p=img_path: self.controller.open_path_in_explorer(os.path.dirname(p)))
+                    menu.add_command(label='Set Search Padding...', command=lambda n=obj_name: self._edit_search_padding(n))
+                    menu.add_command(label='Matching Options...', command=lambda n=obj_name: self._edit_match_options(n))
             if self.controller.current_project_path:
                 images_dir = os.path.join(self.controller.current_project_path, 'images')
                 if os.path.exists(images_dir):
@@ -1424,6 +1576,8 @@ class StepCreatorFrame(BaseFrame):
             return "img"
         if t == "pointRGB":
             return "pRGB"
+        if t == "pixelSignature":
+            return "pSig"
         if obj.get("mode") == "point":
             return "point"
         if t == "region":
@@ -1440,9 +1594,12 @@ class StepCreatorFrame(BaseFrame):
         return f"{name} [ {ab} ]"
 
     def _get_object_display_names(self):
-        names = [self._display_name_for_object(n) for n in self.controller.get_object_names()]
-        names.append("(Global/Control)")
-        return names
+        # Shared by every row's dropdown; refresh_object_dropdowns resets it
+        if self._object_display_names is None:
+            names = [self._display_name_for_object(n) for n in self.controller.get_object_names()]
+            names.append("(Global/Control)")
+            self._object_display_names = names
+        return self._object_display_names
 
     def _name_from_display(self, display):
         if display == "(Global/Control)":
@@ -1453,14 +1610,24 @@ class StepCreatorFrame(BaseFrame):
     ACTION_CONFIG = {
         "region": ["Click", "Type into Region (Future)"],
         "pointRGB": ["Click", "Wait for Pixel Color"],
+        "pixelSignature": ["Wait for Pixel Color"],
         "image": ["Click", "Wait for Image"],
         "_global_": ["Wait", "Keyboard Input", "Press Key", "Hotkey Combo", "Scroll"],
-        "_control_": ["If Image Found", "If Pixel Color", "Goto Step"]
+        "_control_": ["If Image Found", "If Pixel Color", "Wait for Any Image", "Goto Step"]
     }
 
+    ROW_BUFFER = 6  # rows rendered beyond each edge of the viewport
+    ROW_PAD = 4
+
     def __init__(self, parent, controller):
         super().__init__(parent, controller)
-        self.step_widgets = []
+        # The controller's Sequence is the model; only the rows inside the viewport have widgets.
+        # Each row in the pool shows one step ("step"/"index") or is parked off-canvas.
+        self._rows = []
+        self._row_height = None
+        self._binding = False  # set while a row is loaded from its step, so var traces stay quiet
+        self._writing = False  # set while a row writes an edit to its step, so the echo is ignored
+        self._object_display_names = None  # dropdown values shared by every row
 
         ttk.Label(self, text="Step Creator", font=("Segoe UI", 14, "bold")).pack(pady=(6,2))
 
@@ -1481,26 +1648,29 @@ class StepCreatorFrame(BaseFrame):
         ttk.Label(header_frame, text="Parameters", font=_hf).pack(side=tk.LEFT, padx=2, fill="x", expand=True)
         ttk.Separator(self, orient="horizontal").pack(fill="x", padx=12)
 
-        _style = ttk.Style(); _bg = _style.lookup('TFrame', 'background') or self["bg"]
-        self.canvas_steps = tk.Canvas(self, borderwidth=0, background=_bg, highlightthickness=0)
-        self.steps_area_frame = tk.Frame(self.canvas_steps, background=_bg)
+        self.canvas_steps = controller.themed(tk.Canvas(self, borderwidth=0, highlightthickness=0), background="bg")
         self.scrollbar_steps = tk.Scrollbar(self, orient="vertical", command=self.canvas_steps.yview)
-        self.canvas_steps.configure(yscrollcommand=self.scrollbar_steps.set)
+        # Every view change (wheel, scrollbar, yview_moveto) passes through here and re-renders rows
+        self.canvas_steps.configure(yscrollcommand=self._on_steps_yview)
         self.scrollbar_steps.pack(side="right", fill="y", padx=(0,6), pady=6)
         self.canvas_steps.pack(side="left", fill="both", expand=True, padx=(6,0), pady=6)
-        self.canvas_steps_window = self.canvas_steps.create_window((0,0), window=self.steps_area_frame, anchor="nw", tags="self.steps_area_frame")
-        self.steps_area_frame.bind("<Configure>", lambda e: self.canvas_steps.configure(scrollregion=self.canvas_steps.bbox("all")))
-        self.canvas_steps.bind("<Configure>", lambda e: self.canvas_steps.itemconfig(self.canvas_steps_window, width=e.width))
-        
+        self.canvas_steps.bind("<Configure>", self._on_steps_canvas_configure)
+
         self.canvas_steps.bind("<MouseWheel>", self._on_mousewheel)
-        self.steps_area_frame.bind("<MouseWheel>", self._on_mousewheel)
         # Always scroll even when focus is on child widgets (Windows)
         self.bind_all("<MouseWheel>", self._on_mousewheel)
         # Linux scroll
         self.bind_all("<Button-4>", lambda e: self._on_mousewheel(type('evt', (), {'delta': 120})) )
         self.bind_all("<Button-5>", lambda e: self._on_mousewheel(type('evt', (), {'delta': -120})) )
 
-        self.add_step_row(mark_modified=False)
+        # Rows follow the model through its change events, whoever made the change
+        self.sequence.subscribe(self._on_sequence_event)
+        controller.subscribe_objects(self._on_object_event)
+        self.bind("<Destroy>", self._on_destroy, add="+")
+        if not self.steps:
+            self.sequence.replace([self._blank_step()])
+        else:
+            self._steps_changed()
 
         # Back/Close is now on the toolbar
 
@@ -1511,30 +1681,157 @@ class StepCreatorFrame(BaseFrame):
         if self.controller._check_unsaved_changes():
             self.controller.show_frame("MainFrame")
 
+    def _on_destroy(self, event):
+        if event.widget is self:
+            self.sequence.unsubscribe(self._on_sequence_event)
+            self.controller.unsubscribe_objects(self._on_object_event)
+
+    # --- Step model ---
+    @property
+    def sequence(self):
+        return self.controller.sequence
+
+    @property
+    def steps(self):
+        return self.controller.sequence.steps
+
+    def _blank_step(self):
+        return Step(action=self.ACTION_CONFIG["_global_"][0])
+
+    def _actions_for(self, obj_name):
+        """Actions offered for an object (None: global and control actions), default first; None if it is missing."""
+        if obj_name is None:
+            return self.ACTION_CONFIG["_global_"] + self.ACTION_CONFIG["_control_"]
+        obj_data = self.controller.objects.get(obj_name)
+        if not obj_data:
+            return None
+        obj_specific_actions = self.ACTION_CONFIG.get(obj_data.get("type"), [])
+        return obj_specific_actions + [ga for ga in self.ACTION_CONFIG["_global_"] if ga not in obj_specific_actions]
+
+    @staticmethod
+    def _parse_param(param_key, value):
+        """Inline parameter text to the type the engine expects; unparsable text is kept as typed."""
+        if param_key in ["duration_s", "timeout_s", "confidence", "interval"]:
+            try: return float(value)
+            except ValueError: return value
+        if param_key in ["target_step", "then_step", "else_step", "amount"]:
+            try:
+                if value.lower() == "next" and param_key in ["then_step", "else_step"]: return None
+                if value == "": return None if param_key in ["then_step", "else_step"] else value
+                return int(value)
+            except ValueError: return value
+        return value
+
+    def _object_confidence(self, obj_name):
+        """The confidence an image step on the object runs with when the step sets none."""
+        confidence = self.controller.objects.get(obj_name, {}).get("confidence")
+        return 0.8 if confidence is None else confidence
+
+    def _write(self, fn, *args):
+        """Apply an edit made in one of this frame's rows to the model without reloading that row."""
+        self._writing = True
+        try:
+            fn(*args)
+        finally:
+            self._writing = False
+
+    def _on_sequence_event(self, kind, payload):
+        if kind == "step":
+            if not self._writing:
+                for row in self._rows:
+                    if row["step"] is payload["step"]:
+                        self._load_row(row, row["step"])
+            return
+        if kind == "reset":
+            self._reload_object_choices()
+            if not self.steps:
+                self.sequence.replace([self._blank_step()])
+                return
+            self.canvas_steps.yview_moveto(0)
+        self._steps_changed()
+
+    def _on_object_event(self, kind, payload):
+        """One object was added, renamed, deleted or edited: refresh the shared choices and only
+        the steps that use it (renames and deletions have already reached the steps through the sequence)."""
+        name = payload["name"]
+        self._reload_object_choices()
+        for row in self._rows:
+            if row["step"] is None:
+                continue
+            if kind == "updated" and row["step"].references(name):
+                self._load_row(row, row["step"])
+            elif row.get("condition_combo"):
+                self._refresh_condition_choices(row)
+
     def add_delay_between_rows(self, seconds=1.0):
         # Insert a delay after each non-delay row
-        inserts = []
-        for idx, entry in enumerate(list(self.step_widgets)):
-            if entry["action_var"].get() != "Wait":
-                inserts.append(idx + 1)
-        offset = 0
-        for pos in inserts:
-            self.add_step_row(step_data={"object_name": None, "action": "Wait", "params": {"duration_s": float(seconds)}}, insert_at_index=pos + offset)
-            offset += 1
+        delay = {"object_name": None, "action": "Wait", "params": {"duration_s": float(seconds)}}
+        inserts = [(idx + 1, delay) for idx, step in enumerate(self.steps) if step.action != "Wait"]
         if inserts:
-            self.controller.mark_sequence_modified()
+            self.insert_steps(inserts)
+
+    # --- Batch edits ---
+    # Each applies the whole change to the sequence in one pass and re-renders once;
+    # wrap several in batch_edit() to re-render once for all of them.
+    def batch_edit(self):
+        return self.sequence.batch()
+
+    def insert_steps(self, inserts):
+        """Insert ``[(index, step_data), ...]`` (None: a blank step); indexes refer to the list
+        before the insert, and steps given the same index keep their order."""
+        self.sequence.insert([(index, self._blank_step() if step_data is None else step_data)
+                              for index, step_data in inserts])
+
+    def delete_steps(self, indexes):
+        self.sequence.delete(indexes)
+
+    def move_steps(self, indexes, to_index):
+        self.sequence.move(indexes, to_index)
+
+    def copy_steps(self, indexes):
+        """Step data for ``indexes``, for paste_steps."""
+        return [self.steps[i].to_data() for i in sorted(set(indexes)) if 0 <= i < len(self.steps)]
+
+    def paste_steps(self, steps_data, index):
+        self.insert_steps([(index, step_data) for step_data in steps_data])
+
+    def add_step_row(self, step_data=None, insert_at_index=None):
+        index = len(self.steps) if insert_at_index is None else insert_at_index
+        self.insert_steps([(index, step_data)])
+        if not step_data:
+            self._scroll_to(index)
+
+    def insert_delay_after(self, index, seconds=1.0):
+        if index is None:
+            index = len(self.steps) - 1
+        step_data = {"object_name": None, "action": "Wait", "params": {"duration_s": float(seconds)}}
+        # insert at index+1 (after current row)
+        insert_at = min(index + 1, len(self.steps))
+        self.add_step_row(step_data=step_data, insert_at_index=insert_at)
+
+    def delete_step(self, index):
+        self.delete_steps([index])
 
-    def add_step_row(self, step_data=None, insert_at_index=None, mark_modified=True):
-        _style = ttk.Style(); _bg = _style.lookup('TFrame', 'background') or self.steps_area_frame.cget('bg')
-        row_frame = ttk.Frame(self.steps_area_frame)
-        row_frame.pack(fill="x", expand=True, pady=4, padx=6)
+    def move_step_up(self, index):
+        if index > 0:
+            self.sequence.swap(index - 1, index)
+
+    def move_step_down(self, index):
+        if index < len(self.steps) - 1:
+            self.sequence.swap(index, index + 1)
+
+    # --- Virtualized rows ---
+    def _make_row(self):
+        row_frame = ttk.Frame(self.canvas_steps)
+        row = {"frame": row_frame, "step": None, "index": None,
+               "dynamic_param_widgets": {}, "note_widget": None, "condition_combo": None}
 
         order_btn_frame = ttk.Frame(row_frame)
         order_btn_frame.pack(side=tk.LEFT, padx=(2,0), fill="y")
-        ttk.Button(order_btn_frame, text="▲", width=2, command=lambda idx=len(self.step_widgets): self.move_step_up(idx)).pack(pady=0)
-        ttk.Button(order_btn_frame, text="▼", width=2, command=lambda idx=len(self.step_widgets): self.move_step_down(idx)).pack(pady=0)
+        ttk.Button(order_btn_frame, text="▲", width=2, command=lambda: self.move_step_up(row["index"])).pack(pady=0)
+        ttk.Button(order_btn_frame, text="▼", width=2, command=lambda: self.move_step_down(row["index"])).pack(pady=0)
 
-        step_num_label = ttk.Label(row_frame, text="", width=4)
+        step_num_label = ttk.Label(row_frame, text="", width=4, font=("Segoe UI", 10, "bold"))
         step_num_label.pack(side=tk.LEFT, padx=2)
 
         obj_var = tk.StringVar(); action_var = tk.StringVar()
@@ -1548,125 +1845,162 @@ class StepCreatorFrame(BaseFrame):
         params_display_frame = ttk.Frame(row_frame)
         params_display_frame.pack(side=tk.LEFT, padx=3, fill="x", expand=True)
 
-        params_edit_button = ttk.Button(row_frame, text="Edit")
+        params_edit_button = ttk.Button(row_frame, text="Edit", command=lambda: self.edit_step_params_dialog(row))
         params_edit_button.pack(side=tk.LEFT, padx=3)
         # Quick add-delay (1.0s) after this row
-        ttk.Button(row_frame, text="+1s", width=6, command=lambda rf=row_frame: self.insert_delay_after(self._index_of_row_frame(rf), 1.0)).pack(side=tk.LEFT, padx=2)
-        del_button = ttk.Button(row_frame, text="✖", width=2, command=lambda rf=row_frame: self.delete_step_row_by_frame(rf))
+        ttk.Button(row_frame, text="+1s", width=6, command=lambda: self.insert_delay_after(row["index"], 1.0)).pack(side=tk.LEFT, padx=2)
+        del_button = ttk.Button(row_frame, text="✖", width=2, command=lambda: self.delete_step(row["index"]))
         del_button.pack(side=tk.LEFT, padx=(3,2))
 
-        current_step_entry = {
-            "frame": row_frame, "obj_var": obj_var, "obj_dropdown": obj_dropdown,
-            "action_var": action_var, "action_dropdown": action_dropdown,
-            "params": {}, "params_button": params_edit_button, "delete_button": del_button,
-            "step_num_label": step_num_label, "order_buttons": order_btn_frame,
-            "params_display_frame": params_display_frame, "dynamic_param_widgets": {}
-        }
-
-        params_edit_button.config(command=lambda entry=current_step_entry: self.edit_step_params_dialog(entry))
-
-        if insert_at_index is None:
-            self.step_widgets.append(current_step_entry)
-        else:
-            self.step_widgets.insert(insert_at_index, current_step_entry)
-
-        obj_var.trace_add("write", lambda *args, entry=current_step_entry: self.update_action_dropdown_and_params_ui(entry))
-        action_var.trace_add("write", lambda *args, entry=current_step_entry: self.update_params_ui_for_action(entry))
-
-        if step_data:
-            current_step_entry["params"] = step_data.get("params", {}).copy()
-            obj_val = step_data.get("object_name")
-            obj_var.set(obj_val if obj_val else "(Global/Control)")
-            action_var.set(step_data.get("action", ""))
-        else:
-            obj_var.set("(Global/Control)")
-            if mark_modified and insert_at_index is None:
-                self.controller.mark_sequence_modified()
-
-        self._renumber_and_reorder_visuals()
-
-    def _index_of_row_frame(self, rf):
-        for i, entry in enumerate(self.step_widgets):
-            if entry.get("frame") is rf:
-                return i
-        return len(self.step_widgets) - 1
-
-    def insert_delay_after(self, index, seconds=1.0):
-        if index is None:
-            index = len(self.step_widgets) - 1
-        step_data = {"object_name": None, "action": "Wait", "params": {"duration_s": float(seconds)}}
-        # insert at index+1 (after current row)
-        insert_at = min(index + 1, len(self.step_widgets))
-        self.add_step_row(step_data=step_data, insert_at_index=insert_at)
-        self.controller.mark_sequence_modified()
-
-    def delete_step_row_by_frame(self, row_frame_to_delete):
-        index_to_delete = -1
-        for i, entry in enumerate(self.step_widgets):
-            if entry["frame"] == row_frame_to_delete:
-                index_to_delete = i
-                break
-        
-        if index_to_delete != -1:
-            self.step_widgets.pop(index_to_delete)["frame"].destroy()
-            self.controller.mark_sequence_modified()
-            self._renumber_and_reorder_visuals()
-        self.steps_area_frame.update_idletasks()
-        self.canvas_steps.config(scrollregion=self.canvas_steps.bbox("all"))
-
-    def _renumber_and_reorder_visuals(self):
-        for i, entry in enumerate(self.step_widgets):
-            entry["step_num_label"].config(text=f"{i+1}.", font=("Segoe UI", 10, "bold"))
-            up_button, down_button = entry["order_buttons"].winfo_children()
-            try:
-                up_button.config(text="▲", width=2, relief=tk.FLAT)
-                down_button.config(text="▼", width=2, relief=tk.FLAT)
-            except Exception:
-                pass
-            up_button.config(command=lambda current_idx=i: self.move_step_up(current_idx))
-            down_button.config(command=lambda current_idx=i: self.move_step_down(current_idx))
-            
-            entry["frame"].pack_forget()
-            entry["frame"].pack(fill="x", expand=True, pady=4, padx=6)
-
-        self.steps_area_frame.update_idletasks()
-        self.canvas_steps.config(scrollregion=self.canvas_steps.bbox("all"))
-
-    def move_step_up(self, index):
-        if index > 0:
-            step = self.step_widgets.pop(index)
-            self.step_widgets.insert(index - 1, step)
-            self.controller.mark_sequence_modified()
-            self._renumber_and_reorder_visuals()
+        row.update({"obj_var": obj_var, "obj_dropdown": obj_dropdown, "obj_type_label": obj_type_label,
+                    "action_var": action_var, "action_dropdown": action_dropdown, "params_button": params_edit_button,
+                    "delete_button": del_button, "step_num_label": step_num_label, "order_buttons": order_btn_frame,
+                    "params_display_frame": params_display_frame})
+        obj_var.trace_add("write", lambda *args: self._on_row_object_changed(row))
+        action_var.trace_add("write", lambda *args: self._on_row_action_changed(row))
+
+        row["window"] = self.canvas_steps.create_window(0, -2 * (self._row_height or 100), window=row_frame, anchor="nw",
+                                                        width=max(1, self.canvas_steps.winfo_width()),
+                                                        height=(self._row_height - 2 * self.ROW_PAD) if self._row_height else 1)
+        self._rows.append(row)
+        return row
+
+    def _measure_row_height(self):
+        """Height of one row slot, measured once from a row showing a default step."""
+        if self._row_height is None:
+            row = self._make_row()
+            self._load_row(row, self._blank_step())
+            row["frame"].update_idletasks()
+            self._row_height = max(row["frame"].winfo_reqheight(), 24) + 2 * self.ROW_PAD
+            self._unbind_row(row)
+            for r in self._rows:
+                self.canvas_steps.itemconfigure(r["window"], height=self._row_height - 2 * self.ROW_PAD)
+            self.canvas_steps.configure(yscrollincrement=self._row_height)
+        return self._row_height
+
+    def _bind_row(self, row, step, index):
+        self._load_row(row, step)
+        self._place_row(row, index)
+
+    def _load_row(self, row, step):
+        row["step"] = step
+        self._binding = True
+        try:
+            row["obj_var"].set(self._display_name_for_object(step.object_name))
+            row["action_var"].set(step.action)
+        finally:
+            self._binding = False
+        self._update_action_choices(row)
+        self.update_params_ui_for_action(row)
+
+    def _place_row(self, row, index):
+        row["index"] = index
+        self.canvas_steps.coords(row["window"], 0, index * self._row_height + self.ROW_PAD)
+        row["step_num_label"].config(text=f"{index+1}.")
+
+    def _unbind_row(self, row):
+        """Write the row's pending note back to its step and park it above the scroll region."""
+        if row["step"] is not None:
+            self._store_note(row)
+        row["step"] = row["index"] = None
+        self.canvas_steps.coords(row["window"], 0, -2 * (self._row_height or 100))
+
+    def _store_note(self, row):
+        nw = row.get("note_widget")
+        if row["step"] is not None and nw is not None and nw.winfo_exists():
+            self._write(setattr, row["step"], "note", nw.get('1.0', tk.END).strip())
+
+    def _watch_param(self, row, param_key, var):
+        """Write edits of an inline parameter widget through to the step.
+
+        A parameter the step does not set shows the engine's default, which is
+        only displayed: rendering a row never changes its step.
+        """
+        step = row["step"]
+        def write(*args):
+            if not self._binding:
+                self._write(step.set_param, param_key, self._parse_param(param_key, var.get()))
+        var.trace_add("write", write)
+        row["dynamic_param_widgets"][param_key] = var
+
+    def _visible_range(self):
+        rh = self._measure_row_height()
+        top = self.canvas_steps.canvasy(0)
+        height = max(self.canvas_steps.winfo_height(), rh)
+        first = max(0, int(top // rh) - self.ROW_BUFFER)
+        return first, min(len(self.steps), int((top + height) // rh) + 1 + self.ROW_BUFFER)
+
+    def _render_rows(self):
+        """Show the steps in the viewport: rows keep their step if it is still in view (only moving
+        and renumbering), rows whose step left the view are rebound to the newly visible steps."""
+        first, last = self._visible_range()
+        steps = self.steps
+        wanted = {id(steps[i]): i for i in range(first, last)}
+        placed, spare = set(), []
+        for row in self._rows:
+            index = wanted.get(id(row["step"])) if row["step"] is not None else None
+            if index is None:
+                if row["step"] is not None: self._unbind_row(row)
+                spare.append(row)
+            else:
+                placed.add(index)
+                if row["index"] != index: self._place_row(row, index)
+        for index in range(first, last):
+            if index not in placed:
+                self._bind_row(spare.pop() if spare else self._make_row(), steps[index], index)
+
+    def _steps_changed(self):
+        """After the step list changed: resize the scroll region and re-render the rows in view."""
+        rh = self._measure_row_height()
+        self.canvas_steps.configure(scrollregion=(0, 0, self.canvas_steps.winfo_width(), len(self.steps) * rh + self.ROW_PAD))
+        self._render_rows()
+
+    def _release_rows(self):
+        for row in self._rows:
+            if row["step"] is not None: self._unbind_row(row)
+
+    def _scroll_to(self, index):
+        """Scroll just far enough to show step ``index``."""
+        rh = self._measure_row_height()
+        top = self.canvas_steps.canvasy(0); height = self.canvas_steps.winfo_height()
+        total = len(self.steps) * rh + self.ROW_PAD
+        if index * rh < top:
+            self.canvas_steps.yview_moveto(index * rh / total)
+        elif (index + 1) * rh > top + height:
+            self.canvas_steps.yview_moveto(max(0, (index + 1) * rh + self.ROW_PAD - height) / total)
+
+    def _on_steps_yview(self, first, last):
+        self.scrollbar_steps.set(first, last)
+        self._render_rows()
+
+    def _on_steps_canvas_configure(self, event):
+        for row in self._rows:
+            self.canvas_steps.itemconfigure(row["window"], width=event.width)
+        self._steps_changed()
+
+    def _on_row_object_changed(self, row):
+        if self._binding or row["step"] is None:
+            return
+        self._write(setattr, row["step"], "object_name", self._name_from_display(row["obj_var"].get()))
+        self.update_action_dropdown_and_params_ui(row)
 
-    def move_step_down(self, index):
-        if index < len(self.step_widgets) - 1:
-            step = self.step_widgets.pop(index)
-            self.step_widgets.insert(index + 1, step)
-            self.controller.mark_sequence_modified()
-            self._renumber_and_reorder_visuals()
+    def _on_row_action_changed(self, row):
+        if self._binding or row["step"] is None:
+            return
+        self._store_note(row)
+        self._write(setattr, row["step"], "action", row["action_var"].get())
+        self.update_params_ui_for_action(row)
+
+    def _update_action_choices(self, step_entry):
+        """Set the action dropdown and type label for the row's object; returns the actions offered."""
+        obj_name = self._name_from_display(step_entry["obj_var"].get())
+        current_actions = self._actions_for(obj_name) or []
+        step_entry["obj_type_label"].config(text=self._type_abbrev(self.controller.objects.get(obj_name)) if obj_name else "-")
+        step_entry["action_dropdown"]['values'] = sorted(set(current_actions))
+        return current_actions
 
     def update_action_dropdown_and_params_ui(self, step_entry):
-        obj_var = step_entry["obj_var"]; action_dropdown = step_entry["action_dropdown"]
-        selected_display = obj_var.get()
-        selected_obj_name = self._name_from_display(selected_display)
-        
-        current_actions = []
-        if selected_obj_name is None:
-            current_actions.extend(self.ACTION_CONFIG["_global_"]); current_actions.extend(self.ACTION_CONFIG["_control_"])
-            if step_entry.get("obj_type_label") is not None:
-                step_entry["obj_type_label"].config(text="-")
-        else:
-            obj_data = self.controller.objects.get(selected_obj_name)
-            if obj_data:
-                obj_type = obj_data.get("type")
-                obj_specific_actions = self.ACTION_CONFIG.get(obj_type, [])
-                current_actions = obj_specific_actions + [ga for ga in self.ACTION_CONFIG["_global_"] if ga not in obj_specific_actions]
-                if step_entry.get("obj_type_label") is not None:
-                    step_entry["obj_type_label"].config(text=self._type_abbrev(obj_data))
-        
-        action_dropdown['values'] = sorted(list(set(current_actions)))
-        
+        current_actions = self._update_action_choices(step_entry)
         current_action_val = step_entry["action_var"].get()
         if current_actions:
             if current_action_val not in current_actions:
@@ -1678,8 +2012,8 @@ class StepCreatorFrame(BaseFrame):
 
     def update_params_ui_for_action(self, step_entry):
         for widget in step_entry["params_display_frame"].winfo_children(): widget.destroy()
-        step_entry["dynamic_param_widgets"] = {}
-        action = step_entry["action_var"].get(); params = step_entry["params"]
+        step_entry["dynamic_param_widgets"] = {}; step_entry["condition_combo"] = None
+        action = step_entry["action_var"].get(); params = step_entry["step"].params
         frame = step_entry["params_display_frame"]
         step_entry["params_button"].pack_forget()
 
@@ -1689,8 +2023,8 @@ class StepCreatorFrame(BaseFrame):
             if value is None:
                 value = default_value
             var = tk.StringVar(value=str(value))
-            entry = tk.Entry(parent, textvariable=var, width=width)
-            entry.pack(side=tk.LEFT, padx=(0,3)); step_entry["dynamic_param_widgets"][param_key] = var
+            entry = ttk.Entry(parent, textvariable=var, width=width)
+            entry.pack(side=tk.LEFT, padx=(0,3)); self._watch_param(step_entry, param_key, var)
             return var
 
         def create_labeled_combobox(parent, label_text, param_key, values_list, default_value="", width=10):
@@ -1703,7 +2037,7 @@ class StepCreatorFrame(BaseFrame):
                 vals.append(val)
             var = tk.StringVar(value=str(val) if vals else "")
             combo = ttk.Combobox(parent, textvariable=var, values=vals, width=width, state="readonly")
-            combo.pack(side=tk.LEFT, padx=(0,3)); step_entry["dynamic_param_widgets"][param_key] = var
+            combo.pack(side=tk.LEFT, padx=(0,3)); self._watch_param(step_entry, param_key, var)
             return var
 
         if action == "Wait":
@@ -1712,9 +2046,9 @@ class StepCreatorFrame(BaseFrame):
             create_labeled_entry(frame, "Text to Type:", "text_to_type", params.get("text_to_type",""), width=20)
             create_labeled_entry(frame, "Interval:", "interval", params.get("interval",0.01), width=4)
         elif action == "Press Key":
-            create_labeled_combobox(frame, "Key:", "key_to_press", PYAUTOGUI_SPECIAL_KEYS, params.get("key_to_press", "enter"), width=12)
+            create_labeled_combobox(frame, "Key:", "key_to_press", PYAUTOGUI_SPECIAL_KEYS, width=12)
         elif action == "Hotkey Combo":
-            create_labeled_combobox(frame, "Hotkey:", "selected_hotkey_name", PREDEFINED_HOTKEY_NAMES, params.get("selected_hotkey_name", PREDEFINED_HOTKEY_NAMES[0] if PREDEFINED_HOTKEY_NAMES else ""), width=30)
+            create_labeled_combobox(frame, "Hotkey:", "selected_hotkey_name", PREDEFINED_HOTKEY_NAMES, width=30)
         elif action == "Click":
             step_entry["params_button"].pack(side=tk.LEFT, padx=3)
             if params: ttk.Label(frame, text=f"Btn:{params.get('button','L')}, Clicks:{params.get('clicks',1)}" ).pack(side=tk.LEFT)
@@ -1723,135 +2057,120 @@ class StepCreatorFrame(BaseFrame):
             if params: ttk.Label(frame, text=f"Dir:{params.get('direction','Down')}, Amt:{params.get('amount',10)}" ).pack(side=tk.LEFT)
         elif action == "Wait for Image":
             create_labeled_entry(frame, "Timeout:", "timeout_s", 10, width=4)
-            create_labeled_entry(frame, "Conf:", "confidence", params.get("confidence", self.controller.objects.get(self._name_from_display(step_entry["obj_var"].get()), {}).get("confidence",0.8)), width=4)
+            create_labeled_entry(frame, "Conf:", "confidence", self._object_confidence(self._name_from_display(step_entry["obj_var"].get())), width=4)
         elif action == "Wait for Pixel Color":
             create_labeled_entry(frame, "Timeout:", "timeout_s", 10, width=4); step_entry["params_button"].pack(side=tk.LEFT, padx=3)
         elif action == "Goto Step":
-            create_labeled_entry(frame, "Target Step#:", "target_step", 1, width=4)
+            create_labeled_entry(frame, "Target Step#:", "target_step", "", width=4)
         elif action == "If Image Found":
             ttk.Label(frame, text="If Obj:").pack(side=tk.LEFT, padx=(0,1))
-            cond_names = self.controller.get_object_names(object_type="image")
             default_cond = params.get("condition_object_name", "")
-            if default_cond and default_cond not in cond_names:
-                cond_names.append(default_cond)
             cond_obj_var = tk.StringVar(value=default_cond)
-            cond_obj_combo = ttk.Combobox(frame, textvariable=cond_obj_var, values=cond_names, width=10, state="readonly")
-            cond_obj_combo.pack(side=tk.LEFT, padx=(0,2)); step_entry["dynamic_param_widgets"]["condition_object_name"] = cond_obj_var
-            create_labeled_entry(frame, "Then#:", "then_step", 1, width=3)
+            cond_obj_combo = ttk.Combobox(frame, textvariable=cond_obj_var, width=10, state="readonly")
+            step_entry["condition_combo"] = (cond_obj_combo, ("image",)); self._refresh_condition_choices(step_entry)
+            cond_obj_combo.pack(side=tk.LEFT, padx=(0,2)); self._watch_param(step_entry, "condition_object_name", cond_obj_var)
+            create_labeled_entry(frame, "Then#:", "then_step", "Next", width=3)
             create_labeled_entry(frame, "Else#:", "else_step", "Next", width=4)
-            create_labeled_entry(frame, "Conf:", "confidence", params.get("confidence",0.8), width=3)
+            conf_var = create_labeled_entry(frame, "Conf:", "confidence", self._object_confidence(cond_obj_var.get()), width=3)
+            def show_condition_confidence(*args):
+                # Until a confidence is typed, show the one the engine uses: the condition object's
+                if "confidence" not in step_entry["step"].params:
+                    self._binding = True
+                    try: conf_var.set(str(self._object_confidence(cond_obj_var.get())))
+                    finally: self._binding = False
+            cond_obj_var.trace_add("write", show_condition_confidence)
         elif action == "If Pixel Color":
             ttk.Label(frame, text="If Obj:").pack(side=tk.LEFT, padx=(0,1))
-            cond_names = self.controller.get_object_names(object_type="pointRGB")
             default_cond = params.get("condition_object_name", "")
-            if default_cond and default_cond not in cond_names:
-                cond_names.append(default_cond)
             cond_obj_var = tk.StringVar(value=default_cond)
-            cond_obj_combo = ttk.Combobox(frame, textvariable=cond_obj_var, values=cond_names, width=10, state="readonly")
-            cond_obj_combo.pack(side=tk.LEFT, padx=(0,2)); step_entry["dynamic_param_widgets"]["condition_object_name"] = cond_obj_var
-            create_labeled_entry(frame, "Then#:", "then_step", 1, width=3)
+            cond_obj_combo = ttk.Combobox(frame, textvariable=cond_obj_var, width=10, state="readonly")
+            step_entry["condition_combo"] = (cond_obj_combo, ("pointRGB", "pixelSignature")); self._refresh_condition_choices(step_entry)
+            cond_obj_combo.pack(side=tk.LEFT, padx=(0,2)); self._watch_param(step_entry, "condition_object_name", cond_obj_var)
+            create_labeled_entry(frame, "Then#:", "then_step", "Next", width=3)
             create_labeled_entry(frame, "Else#:", "else_step", "Next", width=4)
             step_entry["params_button"].pack(side=tk.LEFT, padx=3)
+        elif action == "Wait for Any Image":
+            step_entry["params_button"].pack(side=tk.LEFT, padx=3)
+            branches = params.get("branches") or []
+            summary = ", ".join(f"{b.get('object_name')}→{b.get('target_step')}" for b in branches[:3]) + (" ..." if len(branches) > 3 else "")
+            ttk.Label(frame, text=f"{summary or 'No images'} ({params.get('mode','best')})").pack(side=tk.LEFT, padx=(0,3))
+            create_labeled_entry(frame, "Timeout:", "timeout_s", 10, width=4)
+            create_labeled_entry(frame, "Else#:", "else_step", "Next", width=4)
 
         # Always show a small note field at the end
         try:
             ttk.Label(frame, text="Note:").pack(side=tk.LEFT, padx=(6,2))
             from tkinter import scrolledtext as _st
-            existing = step_entry.get("note_widget")
-            if existing and existing.winfo_exists():
-                existing.destroy()
             note_widget = _st.ScrolledText(frame, width=30, height=2, wrap=tk.WORD)
-            note_text = step_entry.get("note_var").get() if isinstance(step_entry.get("note_var"), tk.StringVar) else str(step_entry.get("params", {}).get("note", ""))
-            note_widget.insert(tk.INSERT, note_text)
+            self.controller.themed(note_widget, background="field", foreground="fg", insertbackground="fg")
+            note_widget.insert(tk.INSERT, str(step_entry["step"].note or ""))
+            note_widget.bind("<KeyRelease>", lambda e: self._store_note(step_entry))
+            note_widget.bind("<FocusOut>", lambda e: self._store_note(step_entry))
             step_entry["note_widget"] = note_widget
             note_widget.pack(side=tk.LEFT, padx=(0,3))
         except Exception:
             pass
 
+    def _refresh_condition_choices(self, step_entry):
+        """Objects offered by the row's If ... condition dropdown (its current choice kept even if gone)."""
+        combo, types = step_entry["condition_combo"]
+        cond_names = [n for t in types for n in self.controller.get_object_names(object_type=t)]
+        current = step_entry["step"].params.get("condition_object_name", "")
+        if current and current not in cond_names:
+            cond_names.append(current)
+        combo["values"] = cond_names
+
     def edit_step_params_dialog(self, step_entry):
         action = step_entry["action_var"].get(); obj_name = self._name_from_display(step_entry["obj_var"].get())
-        current_params = step_entry["params"]; dialog_made_change = False; dialog = None
+        current_params = step_entry["step"].params; dialog_made_change = False; dialog = None
         if action == "Click": dialog = ClickParamsDialog(self, "Click Action Parameters", current_params.copy())
         elif action == "Wait": dialog = WaitParamsDialog(self, "Wait Action Parameters", current_params.copy())
         elif action == "Scroll": dialog = ScrollParamsDialog(self, "Scroll Action Parameters", current_params.copy())
         elif action == "Wait for Pixel Color":
             target_pixel_obj = self.controller.objects.get(obj_name)
-            dialog = PixelColorWaitParamsDialog(self, "Pixel Color Wait Parameters", current_params.copy(), target_pixel_obj)
+            if (target_pixel_obj or {}).get("type") == "pixelSignature":
+                dialog = PixelSignatureParamsDialog(self, "Pixel Signature Wait Parameters", current_params.copy(), target_pixel_obj)
+            else:
+                dialog = PixelColorWaitParamsDialog(self, "Pixel Color Wait Parameters", current_params.copy(), target_pixel_obj)
+        elif action == "Wait for Any Image":
+            dialog = WaitForAnyImageParamsDialog(self, "Wait for Any Image", current_params.copy(), self.controller.get_object_names(object_type="image"))
         elif action == "Wait for Image": simpledialog.messagebox.showinfo("Info","Parameters for 'Wait for Image' are set inline.", parent=self); return
         elif action == "If Pixel Color":
             target_pixel_obj = self.controller.objects.get(step_entry["dynamic_param_widgets"]["condition_object_name"].get())
-            dialog = PixelColorWaitParamsDialog(self, "Set Expected RGB for If Pixel Color", current_params.copy(), target_pixel_obj, for_if_condition=True)
+            if (target_pixel_obj or {}).get("type") == "pixelSignature":
+                dialog = PixelSignatureParamsDialog(self, "Tolerance for If Pixel Color", current_params.copy(), target_pixel_obj, for_if_condition=True)
+            else:
+                dialog = PixelColorWaitParamsDialog(self, "Set Expected RGB for If Pixel Color", current_params.copy(), target_pixel_obj, for_if_condition=True)
         if dialog:
             if dialog.result is not None:
                 if dialog.result != current_params:
-                    step_entry["params"] = dialog.result; dialog_made_change = True
-                    self.controller.mark_sequence_modified()
-                print(f"Params for step (action: {action}): {step_entry['params']}")
+                    self._write(setattr, step_entry["step"], "params", dialog.result); dialog_made_change = True
+                if log.isEnabledFor(logging.DEBUG): log.debug("Params for step (action: %s): %s", action, dict(step_entry["step"].params))
         if dialog_made_change: self.update_params_ui_for_action(step_entry)
 
-    def refresh_content(self): self.clear_and_rebuild_steps(self.controller.current_steps)
-    def refresh_object_dropdowns(self):
+    def refresh_content(self): self._steps_changed()
+
+    def _reload_object_choices(self):
+        self._object_display_names = None
         all_display = self._get_object_display_names()
-        for step_entry in self.step_widgets:
-            current_display = step_entry["obj_var"].get()
-            base_name = self._name_from_display(current_display)
-            step_entry["obj_dropdown"]["values"] = all_display
-            # Rebuild a correct display string if base exists
-            if base_name is None:
-                step_entry["obj_var"].set("(Global/Control)")
-            elif base_name in self.controller.objects:
-                step_entry["obj_var"].set(self._display_name_for_object(base_name))
-            else:
-                step_entry["obj_var"].set("(Global/Control)")
-            self.update_action_dropdown_and_params_ui(step_entry)
-
-    def finalize_steps_for_controller(self):
-        self.controller.current_steps = []
-        for _, sw_entry in enumerate(self.step_widgets):
-            obj_display = sw_entry["obj_var"].get(); action = sw_entry["action_var"].get()
-            obj_name = self._name_from_display(obj_display)
-            final_params = sw_entry["params"].copy()
-            for param_key, str_var_widget in sw_entry.get("dynamic_param_widgets", {}).items():
-                value = str_var_widget.get()
-                if param_key in ["duration_s", "timeout_s", "confidence", "interval"]:
-                    try: final_params[param_key] = float(value)
-                    except ValueError: final_params[param_key] = value
-                elif param_key in ["target_step", "then_step", "else_step", "amount"]:
-                    try:
-                        if value.lower() == "next" and param_key == "else_step": final_params[param_key] = None
-                        elif value == "":
-                            if param_key in ["then_step", "else_step"]: final_params[param_key] = None
-                            else: final_params[param_key] = value
-                        else: final_params[param_key] = int(value)
-                    except ValueError: final_params[param_key] = value
-                else: final_params[param_key] = value
-            if action:
-                note_text = ""
-                try:
-                    nw = sw_entry.get("note_widget")
-                    if nw is not None and nw.winfo_exists():
-                        note_text = nw.get('1.0', tk.END).strip()
-                    else:
-                        note_text = sw_entry.get("note_var", tk.StringVar(value="")).get()
-                except Exception:
-                    note_text = sw_entry.get("note_var", tk.StringVar(value="")).get()
-                self.controller.current_steps.append({
-                    "object_name": obj_name if obj_name is not None else None,
-                    "action": action,
-                    "params": final_params,
-                    "note": note_text
-                })
-        print("Finalized steps for controller:", self.controller.current_steps)
+        for row in self._rows:
+            row["obj_dropdown"]["values"] = all_display
+
+    def refresh_object_dropdowns(self):
+        # Steps whose object is gone fall back to Global/Control, with a valid action
+        self._release_rows()
+        for step in self.steps:
+            if step.object_name is not None and step.object_name not in self.controller.objects:
+                step.object_name = None
+            actions = self._actions_for(step.object_name)
+            if step.action not in actions:
+                step.action = actions[0]
+        self._reload_object_choices()
+        self._render_rows()
 
     def clear_and_rebuild_steps(self, steps_data_list_from_file):
-        for widget_entry in self.step_widgets:
-            if widget_entry["frame"].winfo_exists(): widget_entry["frame"].destroy()
-        self.step_widgets = []
-        self.controller.current_steps = list(steps_data_list_from_file) if steps_data_list_from_file else []
-        for step_data in self.controller.current_steps:
-            self.add_step_row(step_data)
-        if not self.step_widgets: self.add_step_row()
-        self._renumber_and_reorder_visuals()
+        """Replace the whole sequence, as Load does; the rows follow through the reset event."""
+        self.sequence.replace(steps_data_list_from_file or [])
         self.controller.mark_sequence_modified(False)
 
 
@@ -1860,7 +2179,7 @@ class InstructionsFrame(BaseFrame):
         super().__init__(parent, controller)
         header = ttk.Frame(self)
         header.pack(fill="x")
-        tk.Label(header, text="Instructions", font=("Arial", 16, "bold"), bg=self["bg"], fg="white").pack(side=tk.LEFT, pady=10, padx=5)
+        controller.themed(tk.Label(header, text="Instructions", font=("Arial", 16, "bold")), bg="bg", fg="fg").pack(side=tk.LEFT, pady=10, padx=5)
         tk.Button(header, text="Back to Main Menu", command=lambda: controller.show_frame("MainFrame"), bg="#444444", fg="white").pack(side=tk.RIGHT, pady=10, padx=5)
         instructions_text = """
 Welcome to the Python Desktop Automation Tool!
@@ -1883,6 +2202,7 @@ Welcome to the Python Desktop Automation Tool!
    - Unique names for all objects.
    - **Region/Image Creation** via grid or drag capture.
    - **Pixel Monitor** captures RGB at a point (pointRGB).
+   - **Pixel Signature from Selected** combines several pointRGB objects into one object checked in a single capture, with a colour tolerance.
    - All created objects are listed for quick review.
 
 **4. Step Creator Menu**
@@ -1890,6 +2210,7 @@ Welcome to the Python Desktop Automation Tool!
    - **Quick +1s** button inserts delay after a step.
    - Each step supports optional **notes**.
    - Actions include **Click**, **Scroll**, **Keyboard Input**, **Press Key**, **Hotkey Combo**, and logic like **Goto**, **If Image Found**, or **If Pixel Color**.
+   - **Wait for Any Image** watches several images at once and jumps to the step of whichever appears (best or first match, one timeout).
    - Use the arrows to reorder steps.
 
 **5. Running & Saving**
@@ -2073,6 +2394,33 @@ class PixelColorWaitParamsDialog(BaseParamsDialog):
         self.result["expected_rgb"] = tuple(rgb_parts)
         if not self.for_if_condition: self.result["timeout_s"] = float(self.timeout_var.get())
 
+class PixelSignatureParamsDialog(BaseParamsDialog):
+    def __init__(self, parent, title, existing_params=None, signature_obj=None, for_if_condition=False):
+        self.signature_obj = signature_obj or {}
+        self.for_if_condition = for_if_condition
+        super().__init__(parent, title, existing_params)
+    def body(self, master):
+        tolerance=self.existing_params.get("tolerance", self.signature_obj.get("tolerance", 0))
+        tk.Label(master,text=f"Points: {len(self.signature_obj.get('points') or [])}").grid(row=0,column=0,columnspan=2,sticky="w")
+        tk.Label(master,text="Tolerance (per channel):").grid(row=1,column=0,sticky="w")
+        self.tolerance_var=tk.StringVar(value=str(tolerance))
+        self.tolerance_entry=tk.Entry(master,textvariable=self.tolerance_var,width=10); self.tolerance_entry.grid(row=1,column=1)
+        if not self.for_if_condition:
+            tk.Label(master,text="Timeout (s):").grid(row=2,column=0,sticky="w")
+            self.timeout_var=tk.StringVar(value=str(self.existing_params.get("timeout_s",10.0)))
+            tk.Entry(master,textvariable=self.timeout_var,width=10).grid(row=2,column=1)
+        return self.tolerance_entry
+    def validate(self):
+        try:
+            if not 0<=int(self.tolerance_var.get())<=255: raise ValueError("Tolerance 0-255.")
+            if not self.for_if_condition and float(self.timeout_var.get())<0: raise ValueError("Timeout non-negative.")
+            return 1
+        except (ValueError,tk.TclError) as e: simpledialog.messagebox.showerror("Invalid Input",str(e),parent=self); return 0
+    def apply(self):
+        self.result = self.existing_params.copy()
+        self.result["tolerance"] = int(self.tolerance_var.get())
+        if not self.for_if_condition: self.result["timeout_s"] = float(self.timeout_var.get())
+
 class ImageWaitParamsDialog(BaseParamsDialog):
     def __init__(self, parent, title, existing_params=None, image_obj=None):
         self.image_obj = image_obj
@@ -2097,14 +2445,67 @@ class ImageWaitParamsDialog(BaseParamsDialog):
         except (ValueError,tk.TclError) as e: simpledialog.messagebox.showerror("Invalid Input",str(e),parent=self); return 0
     def apply(self): self.result={"confidence":float(self.confidence_var.get()),"timeout_s":float(self.timeout_var.get())}
 
+class WaitForAnyImageParamsDialog(BaseParamsDialog):
+    def __init__(self, parent, title, existing_params=None, image_names=None):
+        self.image_names = list(image_names or [])
+        self.branch_rows = []
+        super().__init__(parent, title, existing_params)
+    def body(self, master):
+        tk.Label(master,text="Wait until any of these images appears, then go to its step:").grid(row=0,column=0,columnspan=3,sticky="w",padx=5,pady=2)
+        self.rows_frame=tk.Frame(master); self.rows_frame.grid(row=1,column=0,columnspan=3,sticky="w")
+        for branch in self.existing_params.get("branches") or []:
+            self.add_branch_row(branch.get("object_name",""), branch.get("target_step",""))
+        self.add_branch_row()
+        tk.Button(master,text="+ Add Image",command=self.add_branch_row).grid(row=2,column=0,sticky="w",padx=5,pady=2)
+        tk.Label(master,text="When several match:").grid(row=3,column=0,sticky="w",padx=5,pady=2)
+        self.mode_var=tk.StringVar(value=self.existing_params.get("mode","best"))
+        ttk.Combobox(master,textvariable=self.mode_var,values=["best","first"],state="readonly",width=8).grid(row=3,column=1,sticky="w",padx=5,pady=2)
+        tk.Label(master,text="(best = highest score, first = fastest match)").grid(row=4,column=0,columnspan=3,sticky="w",padx=5,pady=2)
+        return self.branch_rows[0][0] if self.branch_rows else None
+    def add_branch_row(self, object_name="", target_step=""):
+        row=len(self.branch_rows)
+        obj_var=tk.StringVar(value=object_name); step_var=tk.StringVar(value=str(target_step) if target_step not in (None,"") else "")
+        combo=ttk.Combobox(self.rows_frame,textvariable=obj_var,values=self.image_names,state="readonly",width=18); combo.grid(row=row,column=0,padx=5,pady=1)
+        tk.Label(self.rows_frame,text="→ Step#:").grid(row=row,column=1,sticky="w")
+        tk.Entry(self.rows_frame,textvariable=step_var,width=5).grid(row=row,column=2,sticky="w",padx=5,pady=1)
+        self.branch_rows.append((combo,obj_var,step_var))
+    def validate(self):
+        try:
+            self.branches=[]
+            for _,obj_var,step_var in self.branch_rows:
+                name,step=obj_var.get(),step_var.get().strip()
+                if not name and not step: continue
+                if not name: raise ValueError("Pick an image for every row with a step number.")
+                if not step.isdigit() or int(step)<1: raise ValueError(f"Step number for '{name}' must be a positive integer.")
+                self.branches.append({"object_name":name,"target_step":int(step)})
+            if not self.branches: raise ValueError("Add at least one image.")
+            return 1
+        except ValueError as e: simpledialog.messagebox.showerror("Invalid Input",str(e),parent=self); return 0
+    def apply(self):
+        self.result=dict(self.existing_params); self.result.update(branches=self.branches,mode=self.mode_var.get())
+
+class ImageMatchOptionsDialog(BaseParamsDialog):
+    def body(self, master):
+        tk.Label(master,text="Matcher:").grid(row=0,column=0,sticky="w",padx=5,pady=2)
+        self.backend_var=tk.StringVar(value=self.existing_params.get("match_backend",DEFAULT_MATCH_BACKEND))
+        self.backend_menu=ttk.Combobox(master,textvariable=self.backend_var,values=list(MATCH_BACKENDS),state="readonly",width=12)
+        self.backend_menu.grid(row=0,column=1,sticky="w",padx=5,pady=2)
+        tk.Label(master,text="(auto = built-in NumPy matcher when available)").grid(row=1,column=0,columnspan=2,sticky="w",padx=5,pady=2)
+        self.grayscale_var=tk.BooleanVar(value=self.existing_params.get("grayscale",False))
+        tk.Checkbutton(master,text="Match in grayscale (faster, ignores colour)",variable=self.grayscale_var).grid(row=2,column=0,columnspan=2,sticky="w",padx=5,pady=2)
+        self.prefilter_var=tk.BooleanVar(value=self.existing_params.get("prefilter",False))
+        tk.Checkbutton(master,text="Histogram pre-filter (skip areas that cannot match; NumPy only)",variable=self.prefilter_var).grid(row=3,column=0,columnspan=2,sticky="w",padx=5,pady=2)
+        self.pyramid_var=tk.BooleanVar(value=self.existing_params.get("pyramid",False))
+        tk.Checkbutton(master,text="Coarse-to-fine search (faster on large screens; NumPy only)",variable=self.pyramid_var).grid(row=4,column=0,columnspan=2,sticky="w",padx=5,pady=2)
+        return self.backend_menu
+    def apply(self): self.result={"match_backend":self.backend_var.get(),"grayscale":self.grayscale_var.get(),"prefilter":self.prefilter_var.get(),"pyramid":self.pyramid_var.get()}
+
 
 # --- Main Execution ---
 if __name__ == "__main__":
     try:
         app_root = tk.Tk()
         app_instance = DesktopAutomationApp(app_root)
-        if hasattr(app_instance.frames["StepCreatorFrame"], 'finalize_steps_for_controller'):
-            app_instance.frames["StepCreatorFrame"].finalize_steps_for_controller()
         app_root.mainloop()
     except Exception as e:
         # Best-effort startup logging
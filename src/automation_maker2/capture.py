@@ -0,0 +1,307 @@
+"""Screen capture shared between condition checks.
+
+Every image search or pixel read used to take its own screenshot. The
+FrameCapture layer keeps the most recent full-screen grab and hands the same
+frame to every check made within a short freshness window, so an
+``If Image Found`` followed by a ``Click`` on an image, or several pixel
+checks in a row, cost one grab instead of several.
+
+Pixel reads (``sample``) do not need the whole screen: they grab only the
+bounding box of the points asked for, unless a fresh full frame or a fresh
+box grab covering them is already at hand.
+
+``BackgroundCapture`` is the optional alternative: a daemon thread grabs
+frames at a fixed rate into a ring of preallocated arrays, and checks read
+the newest frame instead of blocking on a grab of their own.
+"""
+import logging
+import threading
+import time
+import weakref
+from collections import deque
+
+from .logs import LOGGER_NAME
+
+DEFAULT_MAX_AGE_S = 0.03
+DEFAULT_CAPTURE_FPS = 20
+DEFAULT_RING_SLOTS = 4
+FRESH_FRAME_TIMEOUT_S = 1.0
+
+log = logging.getLogger(LOGGER_NAME + ".capture")
+
+
+def _pyautogui_grab(region=None):
+    from .engine import load_pyautogui
+    return load_pyautogui().screenshot(region=region)
+
+
+class FrameCapture:
+    """Full-screen frames reused while younger than ``max_age_s``.
+
+    Call ``invalidate()`` after anything that changes the screen (clicks,
+    typing, scrolling) so the next check sees a fresh frame.
+    """
+
+    def __init__(self, max_age_s=DEFAULT_MAX_AGE_S, grab=None):
+        self.max_age_s = max_age_s
+        self._grab = grab or _pyautogui_grab
+        self._lock = threading.Lock()
+        self._frame = None
+        self._taken_at = 0.0
+        self._box = None  # (left, top, right, bottom, image, taken_at) of the last partial grab
+        self.invalidated_at = float("-inf")  # perf_counter of the last input action
+        self.grabs = 0
+        self.box_grabs = 0
+        self.reuses = 0
+
+    def frame(self):
+        """Return a frame no older than the freshness window."""
+        with self._lock:
+            if self._frame is not None and time.perf_counter() - self._taken_at <= self.max_age_s:
+                self.reuses += 1
+                return self._frame
+            frame = self._grab()
+            self._frame = frame
+            self._taken_at = time.perf_counter()
+            self.grabs += 1
+            return frame
+
+    def pixel(self, x, y):
+        return self.sample([(x, y)])[0]
+
+    def sample(self, points):
+        """Colours at ``points`` [(x, y), ...] as (r, g, b) tuples, read from one grab."""
+        xs = [int(p[0]) for p in points]; ys = [int(p[1]) for p in points]
+        left, top, right, bottom = min(xs), min(ys), max(xs) + 1, max(ys) + 1
+        with self._lock:
+            now = time.perf_counter()
+            box = self._box
+            if self._frame is not None and now - self._taken_at <= self.max_age_s:
+                image = self._frame.crop((left, top, right, bottom))  # only the box gets converted
+                self.reuses += 1
+            elif (box is not None and now - box[5] <= self.max_age_s and box[0] <= left and box[1] <= top
+                  and right <= box[2] and bottom <= box[3]):
+                image, left, top = box[4], box[0], box[1]
+                self.reuses += 1
+            else:
+                image = self._grab(region=(left, top, right - left, bottom - top))
+                self._box = (left, top, right, bottom, image, time.perf_counter())
+                self.box_grabs += 1
+        return _read_colors(image, xs, ys, left, top)
+
+    def invalidate(self):
+        with self._lock:
+            self._frame = None
+            self._box = None
+            self.invalidated_at = time.perf_counter()
+
+    def stats(self):
+        return {"grabs": self.grabs, "box_grabs": self.box_grabs, "grabs_saved": self.reuses,
+                "max_age_s": self.max_age_s}
+
+    def summary(self):
+        return f"{self.grabs} full grabs, {self.box_grabs} pixel-box grabs, {self.reuses} saved by frame reuse"
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+class BackgroundCapture:
+    """Frames grabbed continuously into a ring buffer; a drop-in for FrameCapture.
+
+    The ring holds ``slots`` preallocated RGB arrays that frames are copied
+    into, so steady-state capture allocates no pixel buffers beyond the
+    grabber's own screenshot. Readers get a zero-copy PIL view of the slot
+    (a new small wrapper per frame, so per-frame caches keyed on the frame
+    object stay correct). Each slot counts its pins: the live view of its
+    frame holds one until it is garbage collected, and ``sample`` holds one
+    while it reads. The writer only fills unpinned slots other than the
+    newest, so no reader ever sees its frame change under it; if every
+    other slot is pinned the grabbed frame is dropped.
+
+    After ``invalidate()`` (an input action), ``frame()`` waits for a frame
+    whose grab started after the input, so checks never see the screen as
+    it was before a click.
+    """
+
+    def __init__(self, fps=DEFAULT_CAPTURE_FPS, slots=DEFAULT_RING_SLOTS, grab=None):
+        if slots < 3:
+            raise ValueError("the ring needs at least 3 slots")
+        self.fps = float(fps)
+        self.slots = int(slots)
+        self._grab = grab or _pyautogui_grab
+        self._cond = threading.Condition()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._arrays = []  # preallocated HxWx3 uint8 arrays
+        self._views = []  # weak reference to the PIL view handed out for each slot's frame, or None
+        self._pins = []  # readers using each slot: a live view plus any sample() in progress
+        self._started = []  # perf_counter when each slot's grab began
+        self._generation = 0  # bumped when the ring is reallocated, so stale pins are not released twice
+        self._newest = -1
+        self.invalidated_at = float("-inf")
+        self.frames = 0
+        self.dropped = 0
+        self.reads = 0
+        self.fresh_waits = 0
+        self.errors = 0
+        self.last_error = None
+        self._latencies = deque(maxlen=512)  # grab + copy seconds per frame
+        self._first_at = None
+        self._last_at = None
+
+    # --- Capture thread ---
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="BackgroundCapture", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        with self._cond:
+            self._cond.notify_all()  # readers waiting for a frame give up
+        if self._thread:
+            self._thread.join(timeout=2.0)
+
+    def _run(self):
+        interval = 1.0 / self.fps
+        while not self._stop_event.is_set():
+            started = time.perf_counter()
+            try:
+                self._store(self._grab(), started)
+            except Exception as e:
+                self.errors += 1
+                self.last_error = e
+                log.warning("Background capture error: %s", e)
+            self._stop_event.wait(max(0.0, interval - (time.perf_counter() - started)))
+
+    def _store(self, image, started):
+        import numpy as np
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        with self._cond:
+            if not self._arrays or self._arrays[0].shape[:2] != (image.height, image.width):
+                self._allocate(image.width, image.height)
+            slot = next((i for i in range(self.slots) if i != self._newest and not self._pins[i]), None)
+            if slot is None:
+                self.dropped += 1  # readers still hold every other slot
+                return
+            self._started[slot] = float("-inf")  # not readable until the copy is done
+            self._views[slot] = None
+            array = self._arrays[slot]
+        np.copyto(array, np.asarray(image))
+        finished = time.perf_counter()
+        with self._cond:
+            self._started[slot] = started
+            self._newest = slot
+            self.frames += 1
+            self._latencies.append(finished - started)
+            if self._first_at is None: self._first_at = finished
+            self._last_at = finished
+            self._cond.notify_all()
+
+    def _allocate(self, width, height):
+        import numpy as np
+        self._arrays = [np.empty((height, width, 3), dtype=np.uint8) for _ in range(self.slots)]
+        self._views = [None] * self.slots
+        self._pins = [0] * self.slots
+        self._started = [float("-inf")] * self.slots
+        self._generation += 1
+        self._newest = -1
+
+    # --- Readers ---
+    def _newest_slot(self):
+        """Wait for a frame grabbed after the last input (or any frame at start-up) and pin its slot.
+
+        Call with ``_cond`` held; the caller releases the pin with ``_unpin``.
+        """
+        deadline = time.perf_counter() + FRESH_FRAME_TIMEOUT_S
+        waited = False
+        while self._newest < 0 or self._started[self._newest] < self.invalidated_at:
+            if self._thread is None or not self._thread.is_alive() or self._stop_event.is_set():
+                raise RuntimeError("Background capture is not running.")
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                if self._newest >= 0:
+                    break  # capture is slower than expected; settle for the newest frame
+                error = f": {self.last_error}" if self.last_error is not None else ""
+                raise RuntimeError(f"Background capture has no frame after {FRESH_FRAME_TIMEOUT_S:g}s{error}")
+            waited = True
+            self._cond.wait(max(0.01, remaining))
+        if waited: self.fresh_waits += 1
+        self._pins[self._newest] += 1
+        self.reads += 1
+        return self._newest
+
+    def _unpin(self, slot, generation):
+        with self._cond:
+            if generation == self._generation:
+                self._pins[slot] -= 1
+
+    def frame(self):
+        """The newest frame as a zero-copy view; its slot stays pinned for as long as the view is alive."""
+        from PIL import Image
+        with self._cond:
+            slot = self._newest_slot()  # may wait for the first frame, which allocates the ring
+            view = self._views[slot]() if self._views[slot] else None
+            if view is not None:
+                self._pins[slot] -= 1  # the live view already holds the slot
+                return view
+            array = self._arrays[slot]
+            view = Image.frombuffer("RGB", (array.shape[1], array.shape[0]), array, "raw", "RGB", 0, 1)
+            self._views[slot] = weakref.ref(view)
+            weakref.finalize(view, self._unpin, slot, self._generation)
+            return view
+
+    def pixel(self, x, y):
+        return self.sample([(x, y)])[0]
+
+    def sample(self, points):
+        """Colours at ``points`` read straight from the newest frame's array."""
+        with self._cond:
+            slot = self._newest_slot()
+            array, generation = self._arrays[slot], self._generation
+        try:
+            xs = [int(p[0]) for p in points]; ys = [int(p[1]) for p in points]
+            return tuple(map(tuple, array[ys, xs].tolist()))
+        finally:
+            self._unpin(slot, generation)
+
+    def invalidate(self):
+        with self._cond:
+            self.invalidated_at = time.perf_counter()
+
+    def stats(self):
+        with self._cond:
+            latencies = sorted(self._latencies)
+            span = (self._last_at - self._first_at) if self.frames > 1 else 0.0
+            return {
+                "frames": self.frames, "reads": self.reads, "fresh_waits": self.fresh_waits,
+                "dropped": self.dropped, "errors": self.errors, "target_fps": self.fps,
+                "capture_fps": (self.frames - 1) / span if span > 0 else 0.0,
+                "latency_ms_mean": 1000 * sum(latencies) / len(latencies) if latencies else 0.0,
+                "latency_ms_p95": 1000 * latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0,
+                "latency_ms_max": 1000 * latencies[-1] if latencies else 0.0,
+            }
+
+    def summary(self):
+        s = self.stats()
+        return (f"{s['frames']} background frames at {s['capture_fps']:.1f} fps (target {s['target_fps']:g}), "
+                f"grab latency mean {s['latency_ms_mean']:.1f} ms / p95 {s['latency_ms_p95']:.1f} ms, "
+                f"{s['reads']} reads, {s['fresh_waits']} waited for a post-input frame")
+
+
+def _read_colors(image, xs, ys, left, top):
+    """Vectorized colour lookup of absolute points in an image whose origin is (left, top)."""
+    try:
+        import numpy as np
+    except ImportError:
+        return tuple(tuple(image.getpixel((x - left, y - top))[:3]) for x, y in zip(xs, ys))
+    pixels = np.asarray(image if image.mode == "RGB" else image.convert("RGB"))
+    colors = pixels[np.asarray(ys) - top, np.asarray(xs) - left]
+    return tuple(map(tuple, colors.tolist()))
@@ -0,0 +1,62 @@
+"""Shared constants for the UI and the execution engine."""
+
+DEFAULT_PROJECT_NAME = "UntitledSequence"
+
+# Special keys for PyAutoGUI keyboard actions
+PYAUTOGUI_SPECIAL_KEYS = sorted([
+    'accept', 'add', 'alt', 'altleft', 'altright', 'apps', 'backspace',
+    'browserback', 'browserfavorites', 'browserforward', 'browserhome',
+    'browserrefresh', 'browsersearch', 'browserstop', 'capslock', 'clear',
+    'convert', 'ctrl', 'ctrlleft', 'ctrlright', 'decimal', 'del', 'delete',
+    'divide', 'down', 'end', 'enter', 'esc', 'escape', 'execute', 'f1', 'f2',
+    'f3', 'f4', 'f5', 'f6', 'f7', 'f8', 'f9', 'f10', 'f11', 'f12', 'f13',
+    'f14', 'f15', 'f16', 'f17', 'f18', 'f19', 'f20', 'f21', 'f22', 'f23',
+    'f24', 'final', 'fn', 'hanguel', 'hanja', 'help', 'home', 'insert', 'junja',
+    'kana', 'kanji', 'launchapp1', 'launchapp2', 'launchmail',
+    'launchmediaselect', 'left', 'modechange', 'multiply', 'nexttrack',
+    'nonconvert', 'num0', 'num1', 'num2', 'num3', 'num4', 'num5', 'num6',
+    'num7', 'num8', 'num9', 'numlock', 'pagedown', 'pageup', 'pause', 'pgdn',
+    'pgup', 'playpause', 'prevtrack', 'print', 'printscreen', 'prntscrn',
+    'prtscr', 'return', 'right', 'scrolllock', 'select', 'separator', 'shift',
+    'shiftleft', 'shiftright', 'sleep', 'space', 'stop', 'subtract', 'tab',
+    'up', 'volumedown', 'volumemute', 'volumeup', 'win', 'winleft', 'winright', 'yen'
+])
+
+# Predefined hotkeys for the Hotkey Combo action
+PREDEFINED_HOTKEYS = {
+    # System & Navigation
+    "Switch Apps (Alt+Tab)": ['alt', 'tab'],
+    "Close Window (Alt+F4)": ['alt', 'f4'],
+    "Show Desktop (Win+D)": ['win', 'd'],
+    "Open File Explorer (Win+E)": ['win', 'e'],
+    "Open Run Dialog (Win+R)": ['win', 'r'],
+
+    # File & Window Management
+    "Copy (Ctrl+C)": ['ctrl', 'c'],
+    "Cut (Ctrl+X)": ['ctrl', 'x'],
+    "Paste (Ctrl+V)": ['ctrl', 'v'],
+    "Undo (Ctrl+Z)": ['ctrl', 'z'],
+    "Redo (Ctrl+Y)": ['ctrl', 'y'],
+    "Select All (Ctrl+A)": ['ctrl', 'a'],
+    "New Window (Ctrl+N)": ['ctrl', 'n'],
+    "New Folder (Ctrl+Shift+N)": ['ctrl', 'shift', 'n'],
+    "Properties (Alt+Enter)": ['alt', 'enter'],
+
+    # Browser Shortcuts
+    "New Tab (Ctrl+T)": ['ctrl', 't'],
+    "Close Tab (Ctrl+W)": ['ctrl', 'w'],
+    "Reopen Closed Tab (Ctrl+Shift+T)": ['ctrl', 'shift', 't'],
+    "Next Tab (Ctrl+Tab)": ['ctrl', 'tab'],
+    "Previous Tab (Ctrl+Shift+Tab)": ['ctrl', 'shift', 'tab'],
+    "Focus Address Bar (Ctrl+L)": ['ctrl', 'l'],
+
+    # Text Editing
+    "Move Cursor Word Left (Ctrl+Left)": ['ctrl', 'left'],
+    "Move Cursor Word Right (Ctrl+Right)": ['ctrl', 'right'],
+    "Delete Previous Word (Ctrl+Backspace)": ['ctrl', 'backspace'],
+    "Select Word Left (Ctrl+Shift+Left)": ['ctrl', 'shift', 'left'],
+    "Select Word Right (Ctrl+Shift+Right)": ['ctrl', 'shift', 'right'],
+    "Jump to Start of Doc (Ctrl+Home)": ['ctrl', 'home'],
+    "Jump to End of Doc (Ctrl+End)": ['ctrl', 'end'],
+}
+PREDEFINED_HOTKEY_NAMES = sorted(PREDEFINED_HOTKEYS.keys())
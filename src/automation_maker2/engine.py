@@ -0,0 +1,750 @@
+"""Sequence execution engine.
+
+The engine runs a step list on its own worker thread so the Tk main loop
+stays responsive while a sequence executes. Progress is published as
+``(kind, payload)`` tuples on a thread-safe queue; the UI drains that queue
+with ``root.after`` and never blocks on the run itself.
+
+Event kinds:
+    ``started``   {"name", "loops"}
+    ``loop``      {"iteration", "total"}   (total is 0 for infinite runs)
+    ``step``      {"index", "count", "action", "object_name"}
+    ``finished``  {"name", "reason"}       reason: completed | stopped | failsafe | error
+
+Progress and per-step tracing go to the ``automation_maker.engine`` logger
+(see logs.py); ``log_level`` sets its level for one run.
+
+Headless use (no tkinter is imported)::
+
+    from automation_maker2 import engine
+    engine.run("path/to/seq.json", loops=3)
+"""
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+
+from .constants import PREDEFINED_HOTKEYS
+from .capture import DEFAULT_MAX_AGE_S, BackgroundCapture, FrameCapture
+from .locator import ImageLocator, ImageTarget
+from .logs import LOGGER_NAME, ensure_configured
+from .pixels import PixelCheck
+from .polling import AdaptivePoll, frame_digest
+from .runstats import RunStats
+from .templates import TemplateCache
+
+pyautogui = None  # imported on first engine construction, see load_pyautogui
+
+PIXEL_TYPES = ("pointRGB", "pixelSignature")
+SLOWEST_STEPS_LOGGED = 3
+
+log = logging.getLogger(LOGGER_NAME + ".engine")
+
+
+def load_pyautogui():
+    """Import pyautogui, keeping headless runs free of tkinter.
+
+    PyAutoGUI's only tkinter users are its optional pymsgbox (alert boxes)
+    and mouseinfo (MouseInfo window) helpers, which it tolerates being
+    absent. When tkinter is not already loaded they are masked for the
+    duration of the import, then unmasked so later imports work normally.
+    """
+    global pyautogui
+    if pyautogui is None:
+        masked = [] if 'tkinter' in sys.modules else [m for m in ('pymsgbox', 'mouseinfo') if m not in sys.modules]
+        for m in masked: sys.modules[m] = None
+        try:
+            import pyautogui as _pyautogui
+        finally:
+            for m in masked: sys.modules.pop(m, None)
+        pyautogui = _pyautogui
+    return pyautogui
+
+
+def load_sequence_file(filepath):
+    """Load a saved sequence JSON and resolve image paths relative to it.
+
+    Returns a dict with ``sequence_name``, ``loop_count``, ``objects``,
+    ``steps`` and ``project_path``.
+    """
+    with open(filepath, 'r') as f:
+        data = json.load(f)
+    project_path = os.path.dirname(filepath)
+    objects = {}
+    for obj_name, obj in data.get("objects", {}).items():
+        o = obj.copy()
+        if o.get("type") == "image" and o.get("image_path"):
+            abs_p = os.path.join(project_path, o["image_path"])
+            if os.path.exists(abs_p): o["image_path"] = abs_p
+            else: log.warning("Warning: Img asset not found for '%s': %s", obj_name, abs_p)
+        objects[obj_name] = o
+    return {
+        "sequence_name": data.get("sequence_name", os.path.splitext(os.path.basename(filepath))[0]),
+        "loop_count": data.get("loop_count", 1),
+        "objects": objects,
+        "steps": data.get("steps", []),
+        "project_path": project_path,
+    }
+
+
+def load_engine(filepath, loops=None, **engine_kwargs):
+    """Load and compile a saved sequence; ``loops`` overrides its loop count.
+
+    Extra keyword arguments are passed to SequenceEngine.
+    """
+    data = load_sequence_file(filepath)
+    loop_count = data["loop_count"] if loops is None else loops
+    return SequenceEngine(data["steps"], data["objects"], loop_count, data["sequence_name"], **engine_kwargs)
+
+
+def run(filepath, loops=None):
+    """Run a saved sequence to completion on the calling thread.
+
+    Returns the finish reason (completed, stopped, failsafe or error). Raises
+    SequenceCompileError if the sequence is invalid.
+    """
+    return load_engine(filepath, loops).run()
+
+
+class SequenceEngine:
+    """Executes a sequence of steps, optionally on a dedicated worker thread.
+
+    ``steps`` and ``objects`` are copied on construction so edits made in the
+    UI while a run is in progress never race with the worker. The steps are
+    compiled up front (see ``compile``); an invalid sequence raises
+    SequenceCompileError from the constructor.
+    """
+
+    def __init__(self, steps, objects, loop_count=1, name="", events=None, start_delay_s=0.0, templates=None,
+                 capture_max_age_s=DEFAULT_MAX_AGE_S, capture_fps=None, match_processes=0, log_level=None,
+                 trace=None):
+        load_pyautogui()
+        self.steps = [dict(s) for s in steps]
+        self.objects = {k: dict(v) for k, v in objects.items()}
+        self.loop_count = loop_count
+        self.name = name
+        self.events = events
+        self.start_delay_s = start_delay_s
+        self.log_level = log_level  # e.g. "WARNING" to silence per-step tracing for this run only
+        # Pass a shared TemplateCache to keep decoded templates across runs
+        self.templates = templates if templates is not None else TemplateCache()
+        # Conditions evaluated within the freshness window share one screen grab
+        # With capture_fps set, a background thread grabs frames and checks read the newest one
+        self.capture = (BackgroundCapture(fps=capture_fps) if capture_fps
+                        else FrameCapture(max_age_s=capture_max_age_s))
+        # With match_processes set, NumPy image matching runs in worker processes over shared-memory frames
+        self.locator = ImageLocator(self.capture, self.templates, processes=match_processes)
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._running = False
+        self.finish_reason = None
+        self.poll_stats = {}  # step index -> {"polls", "matches"} summed over the run's waits
+        self.stats = RunStats(name)  # per-step timings, split into capture/match/input/sleep phases
+        # A RunTrace (see tracing.py) records the run as trace events; the caller saves it
+        self.trace = self.stats.trace = trace
+        self.program = []
+        self.compile()
+
+    # --- Thread control ---
+    def start(self):
+        """Run the sequence on a daemon worker thread and return immediately."""
+        if self.is_running():
+            raise RuntimeError("Sequence engine is already running.")
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self.run, name=f"SequenceEngine-{self.name}", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        """Request the run to stop at the next step boundary or sleep tick."""
+        self._stop_event.set()
+
+    def join(self, timeout=None):
+        if self._thread:
+            self._thread.join(timeout)
+
+    def is_running(self):
+        return self._running or bool(self._thread and self._thread.is_alive())
+
+    @property
+    def stopped(self):
+        return self._stop_event.is_set()
+
+    def _emit(self, kind, **payload):
+        if self.events is not None:
+            self.events.put((kind, payload))
+
+    def _sleep(self, seconds):
+        """Interruptible sleep; returns False if a stop was requested."""
+        with self.stats.sleep:
+            return not self._stop_event.wait(max(0.0, seconds))
+
+    # --- Execution ---
+    def run(self):
+        """Execute the sequence on the calling thread. Returns the finish reason."""
+        reason = "completed"
+        self._running = True
+        ensure_configured()
+        previous_level = log.level
+        if self.log_level is not None:
+            log.setLevel(self.log_level)
+        self._emit("started", name=self.name, loops=self.loop_count)
+        run_started = time.perf_counter()
+        try:
+            if self.start_delay_s and not self._sleep(self.start_delay_s):
+                reason = "stopped"
+                return reason
+            pyautogui.FAILSAFE = True
+            self.capture.start()
+            self.locator.start()
+            reason = self._run_loops()
+        except pyautogui.FailSafeException:
+            log.warning("!!! FAILSAFE TRIGGERED !!!")
+            reason = "failsafe"
+        except Exception as e:
+            log.exception("Sequence engine error: %s", e)
+            reason = "error"
+        finally:
+            self.capture.stop()
+            self.locator.close()
+            self.finish_reason = reason
+            self._running = False
+            log.info("--- Sequence Finished: %s (%s) ---", self.name, reason)
+            cache = self.templates.stats()
+            log.info("Template cache: %s hits, %s misses, %s evictions", cache['hits'], cache['misses'], cache['evictions'])
+            log.info("Screen capture: %s", self.capture.summary())
+            search = self.locator.stats()
+            log.info("Image search: %s region hits, %s last-location hits, %s full-screen searches, %s histogram rejections", search['roi_hits'], search['last_location_hits'], search['full_searches'], search['prefilter_rejections'])
+            if self.locator.processes:
+                log.info("Match pool: %s searches in %s worker processes", search['process_searches'], self.locator.processes)
+            if self.poll_stats:
+                polls = sum(v["polls"] for v in self.poll_stats.values())
+                matches = sum(v["matches"] for v in self.poll_stats.values())
+                log.info("Waits: %s polls, %s matches (%s skipped on unchanged frames)", polls, matches, polls - matches)
+            if self.stats.by_step and log.isEnabledFor(logging.INFO):
+                slowest = sorted(self.stats.rows("step"), key=lambda r: -r["mean_ms"])[:SLOWEST_STEPS_LOGGED]
+                log.info("Slowest steps: %s", ", ".join(f"{r['step']} {r['action']} ({r['mean_ms']:.1f} ms mean, {r['count']}x)" for r in slowest))
+            log.setLevel(previous_level)
+            if self.trace is not None:
+                self.trace.slice(self.name or "Sequence", run_started, time.perf_counter(), "run", {"reason": reason})
+            self._emit("finished", name=self.name, reason=reason)
+        return reason
+
+
+    def _run_loops(self):
+        loops_to_run = self.loop_count
+        is_infinite_loop = (loops_to_run == 0)
+        log.info("--- Running Sequence: %s ---", self.name)
+        if is_infinite_loop: log.info("Looping indefinitely. Use Stop or Failsafe to stop.")
+        else: log.info("Looping %s times.", loops_to_run)
+
+        program = self.program
+        step_count = len(program)
+        stop_event = self._stop_event
+        emit = self._emit
+        stats, trace = self.stats, self.trace
+        current_loop_iter = 0
+        while True:
+            current_loop_iter += 1
+            if not is_infinite_loop and current_loop_iter > loops_to_run:
+                return "completed"
+            if stop_event.is_set():
+                return "stopped"
+            if is_infinite_loop: log.info("Executing Loop %s", current_loop_iter)
+            else: log.info("Executing Loop %s/%s", current_loop_iter, loops_to_run)
+            emit("loop", iteration=current_loop_iter, total=loops_to_run)
+
+            loop_started = time.perf_counter()
+            try:
+                program_counter = 0
+                while program_counter < step_count:
+                    if stop_event.is_set():
+                        return "stopped"
+                    step = program[program_counter]
+                    emit("step", index=program_counter, count=step_count,
+                         action=step.action, object_name=step.object_name)
+                    log.info("  Step %s/%s: %s", program_counter + 1, step_count, step.label)
+                    stats.step_started(program_counter, step.action, step.object_name)
+                    try:
+                        jump_to_pc = step.run()
+                    except pyautogui.FailSafeException:
+                        raise
+                    except Exception as e:
+                        log.exception("    ERROR executing step %s (%s on %s): %s", program_counter + 1, step.action, step.object_name, e)
+                        jump_to_pc = -1
+                    stats.step_finished(jump_to_pc)
+                    program_counter = jump_to_pc if jump_to_pc != -1 else program_counter + 1
+            finally:
+                # Loop iterations are parent slices of their steps in a trace
+                if trace is not None:
+                    trace.slice(f"Loop {current_loop_iter}", loop_started, time.perf_counter(), "loop")
+
+    # --- Step handlers ---
+    # Each handler is bound to its resolved operands at compile time and
+    # returns the 0-based jump target, or -1 to fall through to the next step.
+    def _find_image(self, target, confidence, frame=None):
+        stats = self.stats
+        if frame is None:
+            with stats.capture:
+                frame = self.capture.frame()
+        with stats.match:
+            box = self.locator.locate(target, confidence, frame)
+        stats.note_score(self.locator.last_score)
+        return box
+
+    def _find_image_center(self, target, confidence):
+        box = self._find_image(target, confidence)
+        return pyautogui.center(box) if box else None
+
+    def _branch(self, then_pc, else_pc):
+        def jump(condition):
+            return then_pc if condition else else_pc
+        return jump
+
+    def _compile_goto(self, c):
+        target_pc = c.target("target_step", required=True)
+        return lambda: target_pc
+
+    def _compile_if_image_found(self, c):
+        cond_name, cond_obj = c.condition_object("image")
+        target = c.image_target(cond_obj, cond_name)
+        confidence = c.confidence(cond_obj)
+        branch = self._branch(c.target("then_step"), c.target("else_step"))
+        find = self._find_image
+        def run():
+            found = bool(find(target, confidence))
+            log.info("    IF: Image '%s' %s.", cond_name, 'FOUND' if found else 'NOT found')
+            return branch(found)
+        return run
+
+    def _compile_if_pixel_color(self, c):
+        cond_name, cond_obj = c.condition_object(PIXEL_TYPES)
+        check = c.pixel_check(cond_obj, cond_name)
+        branch = self._branch(c.target("then_step"), c.target("else_step"))
+        capture, stats = self.capture, self.stats
+        def run():
+            with stats.capture:
+                colors = check.sample(capture)
+            with stats.match:
+                matched = check.matches(colors)
+            if matched: log.info("    IF: Point '%s' color MATCHED.", cond_name)
+            elif log.isEnabledFor(logging.INFO):
+                log.info("    IF: Point '%s' color (%s) did NOT match %s.", cond_name, _colors_text(colors), _colors_text(check.expected))
+            return branch(matched)
+        return run
+
+    def _compile_click(self, c):
+        invalidate, stats = self.capture.invalidate, self.stats
+        obj_name = c.object_name; obj = c.require_object()
+        button_type = c.param("button", "left", str)
+        num_clicks = c.param("clicks", 1, int)
+        interval_s = c.param("interval", 0.1 if num_clicks > 1 else 0.0, float)
+        obj_type = obj.get("type")
+        if obj_type == "image":
+            target = c.image_target(obj, obj_name)
+            confidence = c.confidence(obj)
+            find_center = self._find_image_center
+            def locate():
+                loc = find_center(target, confidence)
+                if not loc: log.warning("    WARN: Image '%s' not found for click.", obj_name)
+                return loc
+        elif obj_type in ("region", "pointRGB"):
+            coords = c.coords(obj, obj_name, 4 if obj_type == "region" else 2)
+            fixed = (coords[0]+coords[2]/2, coords[1]+coords[3]/2) if obj_type == "region" else (coords[0], coords[1])
+            locate = lambda: fixed
+        else:
+            c.error(f"Cannot Click object '{obj_name}' of type '{obj_type}'.")
+            return None
+        def run():
+            loc = locate()
+            if loc:
+                click_x, click_y = loc
+                with stats.input:
+                    pyautogui.click(x=click_x, y=click_y, clicks=num_clicks, interval=interval_s, button=button_type)
+                invalidate()
+                log.info("    Clicked %s %sx at (%.0f,%.0f)", button_type, num_clicks, click_x, click_y)
+            return -1
+        return run
+
+    def _record_polls(self, index, poll):
+        counts = self.poll_stats.setdefault(index, {"polls": 0, "matches": 0})
+        counts["polls"] += poll.polls; counts["matches"] += poll.matches
+        self.stats.note_polls(poll.polls, poll.matches)
+        log.info("    (%d polls, %d matches)", poll.polls, poll.matches)
+
+    def _compile_wait_for_image(self, c):
+        obj_name = c.object_name; obj = c.require_object("image")
+        target = c.image_target(obj, obj_name)
+        confidence = c.confidence(obj)
+        timeout = c.param("timeout_s", 10.0, float)
+        index, capture, find, sleep, stats = c.index, self.capture, self._find_image, self._sleep, self.stats
+        watch_region = self.locator.watch_region
+        def run():
+            deadline = time.time() + timeout
+            poll = AdaptivePoll(capture)
+            try:
+                while True:
+                    with stats.capture:
+                        frame = capture.frame()
+                    with stats.match:
+                        # Fingerprint only where the image is searched for first (the full frame if padding is -1)
+                        changed = poll.changed(frame_digest(frame, watch_region((target,), frame.size)))
+                    stats.poll_tick(poll)
+                    # An unchanged frame would give the same answer as last tick
+                    if changed and find(target, confidence, frame):
+                        log.info("    Image '%s' found.", obj_name); return -1
+                    if time.time() >= deadline:
+                        break
+                    if not sleep(min(poll.interval, deadline - time.time())): return -1
+                log.info("    TIMEOUT: Image '%s' not found after %ss.", obj_name, timeout)
+                return -1
+            finally:
+                self._record_polls(index, poll)
+        return run
+
+    def _compile_wait_for_any_image(self, c):
+        branches = c.params.get("branches")
+        if not isinstance(branches, list) or not branches:
+            c.fail("Add at least one image to wait for.")
+        requests, names, jumps = [], [], []
+        for n, branch in enumerate(branches, 1):
+            name = branch.get("object_name") if isinstance(branch, dict) else None
+            obj = self.objects.get(name) if name else None
+            if obj is None or obj.get("type") != "image":
+                c.fail(f"Image {n}: invalid object '{name}'; expected an 'image' object.")
+            requests.append((c.image_target(obj, name), c.confidence(obj)))
+            names.append(name)
+            jumps.append(c.resolve_target(branch.get("target_step"), f"target_step of image {n}", required=True))
+        timeout = c.param("timeout_s", 10.0, float)
+        mode = c.param("mode", "best", str)
+        if mode not in ("best", "first"):
+            c.fail(f"Invalid mode '{mode}'; must be 'best' or 'first'.")
+        first = mode == "first"
+        else_pc = c.target("else_step")
+        index, capture, locate_any, sleep, stats = c.index, self.capture, self.locator.locate_any, self._sleep, self.stats
+        watch_region, targets = self.locator.watch_region, [target for target, _ in requests]
+        def run():
+            deadline = time.time() + timeout
+            poll = AdaptivePoll(capture)
+            try:
+                while True:
+                    with stats.capture:
+                        frame = capture.frame()
+                    with stats.match:
+                        changed = poll.changed(frame_digest(frame, watch_region(targets, frame.size)))
+                        hit = locate_any(requests, first, frame) if changed else None
+                    stats.poll_tick(poll)
+                    if hit:
+                        i = hit[0]
+                        stats.note_score(hit[2])
+                        log.info("    Image '%s' found; going to step %s.", names[i], jumps[i] + 1)
+                        return jumps[i]
+                    if time.time() >= deadline:
+                        break
+                    if not sleep(min(poll.interval, deadline - time.time())): return -1
+                log.info("    TIMEOUT: None of %s images found after %ss.", len(names), timeout)
+                return else_pc
+            finally:
+                self._record_polls(index, poll)
+        return run
+
+    def _compile_wait_for_pixel_color(self, c):
+        obj_name = c.object_name; obj = c.require_object(PIXEL_TYPES)
+        check = c.pixel_check(obj, obj_name)
+        timeout = c.param("timeout_s", 10.0, float)
+        index, capture, sleep, stats = c.index, self.capture, self._sleep, self.stats
+        def run():
+            deadline = time.time() + timeout; colors = None
+            poll = AdaptivePoll(capture)
+            try:
+                while True:
+                    with stats.capture:
+                        colors = check.sample(capture)
+                    # The colours are their own fingerprint; only changed values are compared
+                    with stats.match:
+                        matched = poll.changed(colors) and check.matches(colors)
+                    stats.poll_tick(poll)
+                    if matched:
+                        log.info("    Point color matched."); return -1
+                    if time.time() >= deadline:
+                        break
+                    if not sleep(min(poll.interval, deadline - time.time())): return -1
+                if log.isEnabledFor(logging.INFO):
+                    log.info("    TIMEOUT: Point color not matched. Last: %s", _colors_text(colors))
+                return -1
+            finally:
+                self._record_polls(index, poll)
+        return run
+
+    def _compile_wait(self, c):
+        sleep = self._sleep
+        min_dur = c.param("min_s", None, float); max_dur = c.param("max_s", None, float)
+        if min_dur is not None and max_dur is not None:
+            if min_dur > max_dur: c.error(f"Random wait min {min_dur}s exceeds max {max_dur}s.")
+            def run():
+                wait_time = random.uniform(min_dur, max_dur)
+                log.info("    Random Wait: %.2fs", wait_time); sleep(wait_time)
+                return -1
+            return run
+        duration = c.param("duration_s", 1.0, float)
+        def run():
+            log.info("    Static Wait: %ss", duration); sleep(duration)
+            return -1
+        return run
+
+    def _compile_keyboard_input(self, c):
+        invalidate, stats = self.capture.invalidate, self.stats
+        text_to_type = c.param("text_to_type", "", str)
+        interval = c.param("interval", 0.01, float)
+        if not text_to_type:
+            c.warn("No text specified for Keyboard Input.")
+            return None
+        def run():
+            with stats.input: pyautogui.typewrite(text_to_type, interval=interval)
+            invalidate(); log.info("    Typed: '%s'", text_to_type)
+            return -1
+        return run
+
+    def _compile_press_key(self, c):
+        invalidate, stats = self.capture.invalidate, self.stats
+        key_to_press = c.param("key_to_press", None, str)
+        if not key_to_press:
+            c.warn("No key specified for Press Key.")
+            return None
+        def run():
+            with stats.input: pyautogui.press(key_to_press)
+            invalidate(); log.info("    Pressed Key: '%s'", key_to_press)
+            return -1
+        return run
+
+    def _compile_hotkey_combo(self, c):
+        invalidate, stats = self.capture.invalidate, self.stats
+        selected_hotkey_name = c.param("selected_hotkey_name", None, str)
+        keys_to_press = PREDEFINED_HOTKEYS.get(selected_hotkey_name)
+        if not keys_to_press:
+            c.error(f"Invalid or no hotkey selected: '{selected_hotkey_name}'.")
+            return None
+        keys_to_press = tuple(keys_to_press)
+        def run():
+            with stats.input: pyautogui.hotkey(*keys_to_press)
+            invalidate(); log.info("    Executed Hotkey Combo: %s (%s)", selected_hotkey_name, list(keys_to_press))
+            return -1
+        return run
+
+    def _compile_scroll(self, c):
+        invalidate, stats = self.capture.invalidate, self.stats
+        direction = c.param("direction", "down", str); amount = c.param("amount", 10, int)
+        scroll_x = c.param("x", None, int); scroll_y = c.param("y", None, int)
+        if direction not in ("up", "down", "left", "right"):
+            c.error(f"Invalid scroll direction '{direction}'.")
+            return None
+        scroll_val = -amount if direction in ("down", "left") else amount
+        scroll_fn = pyautogui.scroll if direction in ("up", "down") else pyautogui.hscroll
+        where = f" at ({scroll_x},{scroll_y})" if scroll_x is not None else ""
+        def run():
+            with stats.input:
+                scroll_fn(scroll_val, x=scroll_x, y=scroll_y)
+            invalidate()
+            log.info("    Scrolled %s by %s%s", direction, abs(amount), where)
+            return -1
+        return run
+
+    STEP_COMPILERS = {
+        "Goto Step": _compile_goto,
+        "If Image Found": _compile_if_image_found,
+        "If Pixel Color": _compile_if_pixel_color,
+        "Click": _compile_click,
+        "Wait for Image": _compile_wait_for_image,
+        "Wait for Any Image": _compile_wait_for_any_image,
+        "Wait for Pixel Color": _compile_wait_for_pixel_color,
+        "Wait": _compile_wait,
+        "Keyboard Input": _compile_keyboard_input,
+        "Press Key": _compile_press_key,
+        "Hotkey Combo": _compile_hotkey_combo,
+        "Scroll": _compile_scroll,
+    }
+
+    def compile(self):
+        """Resolve and validate every step once, producing ``self.program``.
+
+        Raises SequenceCompileError listing every problem found, so an invalid
+        sequence is rejected before it starts instead of failing mid-run.
+        """
+        program = []; errors = []; warnings = []
+        step_count = len(self.steps)
+        for index, step in enumerate(self.steps):
+            c = _StepCompiler(index, step, self.objects, step_count)
+            builder = self.STEP_COMPILERS.get(c.action)
+            run = None
+            if builder is None:
+                c.warn(f"Unsupported action '{c.action}' is skipped.")
+            else:
+                try:
+                    run = builder(self, c)
+                except _InvalidStep:
+                    run = None
+            errors.extend(c.errors); warnings.extend(c.warnings)
+            program.append(CompiledStep(index, c.action, c.object_name, run or _noop, c.label()))
+        for w in warnings:
+            log.warning("    WARN: %s", w)
+        if errors:
+            raise SequenceCompileError(errors)
+        self.program = program
+        return program
+
+
+def _noop():
+    return -1
+
+
+def _as_types(obj_type):
+    return obj_type if isinstance(obj_type, tuple) else (obj_type,)
+
+
+def _types_text(obj_type):
+    return " or ".join(f"'{t}'" for t in _as_types(obj_type))
+
+
+def _colors_text(colors):
+    return str(colors[0]) if len(colors) == 1 else ", ".join(map(str, colors))
+
+
+class CompiledStep:
+    """A step with its handler pre-bound to resolved objects and parameters."""
+    __slots__ = ("index", "action", "object_name", "run", "label")
+
+    def __init__(self, index, action, object_name, run, label):
+        self.index = index
+        self.action = action
+        self.object_name = object_name
+        self.run = run
+        self.label = label
+
+
+class SequenceCompileError(ValueError):
+    """Raised when a sequence references missing objects, files or step targets."""
+
+    def __init__(self, problems):
+        self.problems = list(problems)
+        super().__init__("\n".join(self.problems))
+
+
+class _InvalidStep(Exception):
+    pass
+
+
+class _StepCompiler:
+    """Resolves one step's operands and collects validation problems."""
+
+    def __init__(self, index, step, objects, step_count):
+        self.index = index
+        self.step = step
+        self.objects = objects
+        self.step_count = step_count
+        self.action = step.get("action")
+        self.object_name = step.get("object_name")
+        self.params = step.get("params") or {}
+        self.errors = []
+        self.warnings = []
+
+    def label(self):
+        return f"Action: {self.action}, Object: {self.object_name or 'N/A'}, Params: {self.params}"
+
+    def _prefix(self, msg):
+        return f"Step {self.index + 1} ({self.action}): {msg}"
+
+    def error(self, msg):
+        self.errors.append(self._prefix(msg))
+
+    def fail(self, msg):
+        self.error(msg)
+        raise _InvalidStep()
+
+    def warn(self, msg):
+        self.warnings.append(self._prefix(msg))
+
+    def param(self, key, default, cast):
+        value = self.params.get(key, default)
+        if value is None or value == "":
+            return default
+        try:
+            return cast(value)
+        except (TypeError, ValueError):
+            self.fail(f"Invalid value for '{key}': {value!r}.")
+
+    def target(self, key, required=False):
+        """Return the 0-based step index for a 1-based step parameter, or -1."""
+        return self.resolve_target(self.params.get(key), key, required)
+
+    def resolve_target(self, value, what, required=False):
+        if value is None or (isinstance(value, str) and value.strip().lower() in ("", "next")):
+            if required: self.fail(f"Missing '{what}'.")
+            return -1
+        if isinstance(value, int) and not isinstance(value, bool) and 1 <= value <= self.step_count:
+            return value - 1
+        self.fail(f"Invalid '{what}' {value!r}; must be a step number between 1 and {self.step_count}.")
+
+    def require_object(self, obj_type=None):
+        """``obj_type`` is one type name or a tuple of accepted ones."""
+        obj = self.objects.get(self.object_name) if self.object_name else None
+        if obj is None:
+            self.fail(f"Object '{self.object_name}' does not exist.")
+        if obj_type and obj.get("type") not in _as_types(obj_type):
+            self.fail(f"Object '{self.object_name}' must be of type {_types_text(obj_type)}.")
+        return obj
+
+    def condition_object(self, obj_type):
+        name = self.params.get("condition_object_name")
+        obj = self.objects.get(name) if name else None
+        if obj is None or obj.get("type") not in _as_types(obj_type):
+            self.fail(f"Invalid condition object '{name}'; expected a {_types_text(obj_type)} object.")
+        return name, obj
+
+    def pixel_check(self, obj, obj_name):
+        """PixelCheck for a pointRGB (exact unless a tolerance is set) or pixel signature object."""
+        tolerance = self.params.get("tolerance")
+        try:
+            if obj.get("type") == "pixelSignature":
+                return PixelCheck.from_signature(obj, tolerance)
+            return PixelCheck([self.point(obj, obj_name)], [self.rgb(obj)],
+                              obj.get("tolerance", 0) if tolerance is None else tolerance)
+        except (KeyError, TypeError, ValueError) as e:
+            self.fail(f"Invalid pixel settings for object '{obj_name}': {e}")
+
+    def image_target(self, obj, obj_name):
+        path = obj.get("image_path")
+        if not path or not os.path.exists(path):
+            self.fail(f"Image file missing for object '{obj_name}' at path: {path}")
+        try:
+            return ImageTarget.from_object(obj_name, obj)
+        except (TypeError, ValueError) as e:
+            self.fail(f"Invalid search settings for object '{obj_name}': {e}")
+
+    def confidence(self, obj):
+        confidence = self.param("confidence", obj.get("confidence", 0.8), float)
+        if not 0.0 <= confidence <= 1.0:
+            self.fail(f"Confidence {confidence} must be between 0.0 and 1.0.")
+        return confidence
+
+    def coords(self, obj, obj_name, length):
+        coords = obj.get("coords")
+        if not coords or len(coords) < length:
+            self.fail(f"Object '{obj_name}' has no coordinates.")
+        return tuple(coords)
+
+    def point(self, obj, obj_name):
+        coords = self.coords(obj, obj_name, 2)
+        return int(coords[0]), int(coords[1])
+
+    def rgb(self, obj):
+        rgb = self.params.get("expected_rgb") or obj.get("rgb")
+        try:
+            rgb = tuple(int(v) for v in rgb)
+        except (TypeError, ValueError):
+            rgb = ()
+        if len(rgb) != 3:
+            self.fail(f"Expected RGB {self.params.get('expected_rgb')!r} must be three integers.")
+        return rgb
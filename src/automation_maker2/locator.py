@@ -0,0 +1,239 @@
+"""Image search with per-object regions of interest.
+
+Most UI elements barely move from where they were captured, so searching
+the whole screen first is wasteful. For each image object the locator
+tries, in order:
+
+1. the object's ``capture_coords`` grown by its ``search_padding``,
+2. the padded area around where it was last found,
+3. the full frame.
+
+A ``search_padding`` of -1 disables the region search for that object.
+
+Each object also picks its matcher (``match_backend``: "auto", "numpy" or
+"pyautogui") and whether to match in grayscale, run the histogram
+pre-filter or search coarse-to-fine (``pyramid``); see matcher.py.
+
+With ``processes`` set, NumPy matching runs in a MatchPool of worker
+processes reading shared-memory frames (see matchpool.py); the region
+order above is unchanged, each worker tries the regions in turn.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .matcher import BACKENDS, create_matcher, resolve_backend
+
+DEFAULT_SEARCH_PADDING = 64
+DEFAULT_MATCH_BACKEND = "auto"
+
+
+class ImageTarget:
+    """An image object's template path and search policy, resolved at compile time."""
+    __slots__ = ("name", "path", "capture_box", "padding", "backend", "grayscale", "prefilter", "pyramid")
+
+    def __init__(self, name, path, capture_box=None, padding=DEFAULT_SEARCH_PADDING,
+                 backend=DEFAULT_MATCH_BACKEND, grayscale=False, prefilter=False, pyramid=False):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown match backend '{backend}'.")
+        self.name = name
+        self.path = path
+        self.capture_box = tuple(int(v) for v in capture_box) if capture_box else None
+        self.padding = int(padding)
+        self.backend = backend
+        self.grayscale = bool(grayscale)
+        self.prefilter = bool(prefilter)
+        self.pyramid = bool(pyramid)
+
+    @classmethod
+    def from_object(cls, name, obj):
+        padding = obj.get("search_padding")
+        return cls(name, obj.get("image_path"), obj.get("capture_coords") or obj.get("coords"),
+                   DEFAULT_SEARCH_PADDING if padding is None else padding,
+                   obj.get("match_backend", DEFAULT_MATCH_BACKEND),
+                   obj.get("grayscale", False), obj.get("prefilter", False), obj.get("pyramid", False))
+
+
+class ImageLocator:
+    """Finds image targets in frames from a FrameCapture, region first."""
+
+    def __init__(self, capture, templates, matchers=None, processes=0):
+        self.capture = capture
+        self.templates = templates
+        self.processes = int(processes)  # > 0 runs NumPy matching in that many worker processes
+        self._process_pool = None  # MatchPool, created on first use
+        self._matchers = dict(matchers or {})  # backend name -> matcher, created on first use
+        self._last_found = {}  # target name -> (left, top, width, height)
+        self._lock = threading.Lock()
+        self._pool = None  # thread pool for locate_any, created on first use
+        self.roi_hits = 0
+        self.last_location_hits = 0
+        self.full_searches = 0
+        self.pool_requests = 0  # searches run in worker processes, totalled as pools close
+        self.last_score = None
+
+    def matcher(self, backend):
+        backend = resolve_backend(backend)
+        with self._lock:
+            matcher = self._matchers.get(backend)
+            if matcher is None:
+                matcher = self._matchers[backend] = create_matcher(backend)
+            return matcher
+
+    def locate(self, target, confidence, frame=None):
+        """Return the match box ``(left, top, width, height)`` or None."""
+        box, score = self._locate(target, confidence, frame if frame is not None else self.capture.frame())
+        self.last_score = score
+        return box
+
+    def locate_any(self, requests, first=False, frame=None):
+        """Match several ``(target, confidence)`` pairs against one frame concurrently.
+
+        Returns ``(index, box, score)`` for the best-scoring match, or for the
+        first match to finish when ``first`` is true; None if nothing matched.
+        NumPy releases the GIL, so the pool's threads really run in parallel;
+        with ``processes`` set each thread just waits on a worker process.
+        """
+        if frame is None:
+            frame = self.capture.frame()
+        for target, _ in requests:
+            # Convert (or publish) the frame once up front instead of racing to do it in every thread
+            if self._in_processes(target):
+                self._match_pool().publish(frame, target.grayscale)
+            else:
+                self.matcher(target.backend).prepare_frame(frame, target.grayscale)
+        pool = self._executor()
+        futures = {pool.submit(self._locate, target, confidence, frame): i
+                   for i, (target, confidence) in enumerate(requests)}
+        best = None
+        for future in as_completed(futures):
+            box, score = future.result()
+            if box is None:
+                continue
+            i = futures[future]
+            if first:
+                for other in futures: other.cancel()
+                return i, box, score
+            # Backends without a score count as exactly meeting their confidence; ties go to list order
+            rank = (score if score is not None else requests[i][1], -i)
+            if best is None or rank > best[0]:
+                best = (rank, i, box, score)
+        return best[1:] if best else None
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=max(min(8, os.cpu_count() or 2), self.processes),
+                                                thread_name_prefix="ImageMatch")
+            return self._pool
+
+    def _in_processes(self, target):
+        return self.processes > 0 and resolve_backend(target.backend) == "numpy"
+
+    def _match_pool(self):
+        with self._lock:
+            if self._process_pool is None:
+                from .matchpool import MatchPool
+                self._process_pool = MatchPool(self.processes)
+            return self._process_pool
+
+    def start(self):
+        """Spawn the matcher processes up front so the first search does not pay for it."""
+        if self.processes > 0:
+            self._match_pool().start()
+
+    def close(self):
+        """Shut down the matching thread and process pools (they are recreated if needed)."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+            process_pool, self._process_pool = self._process_pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        if process_pool is not None:
+            self.pool_requests += process_pool.requests
+            process_pool.close()
+
+    def _locate(self, target, confidence, frame):
+        if self._in_processes(target):
+            size = self.templates.get(target.path).size
+            searches = self._regions(target, size, frame.size)
+            box, score, k = self._match_pool().submit(frame, target, [r for _, r in searches], confidence).result()
+            self._record(target, searches[k][0], box)
+            return box, score
+        matcher = self.matcher(target.backend)
+        needle = self.templates.prepared(target.path, matcher, target.grayscale)
+        scores = []
+        for source, region in self._regions(target, (needle.width, needle.height), frame.size):
+            box = self._search(matcher, needle, frame, region, confidence, target, scores)
+            if box is not None:
+                break
+        self._record(target, source, box)
+        return box, scores[-1] if scores else None
+
+    def _regions(self, target, needle_size, frame_size):
+        """``(source, region)`` pairs to search in order, ending with the full frame (region None)."""
+        searches, tried = [], set()
+        if target.padding >= 0:
+            for source, anchor in (("roi", target.capture_box), ("last", self._last_found.get(target.name))):
+                region = self._padded_region(anchor, target.padding, needle_size, frame_size)
+                if region is not None and region not in tried:
+                    tried.add(region)
+                    searches.append((source, region))
+        searches.append(("full", None))
+        return searches
+
+    def watch_region(self, targets, frame_size):
+        """The part of the frame a wait on ``targets`` looks at, as ``(left, top, right, bottom)``.
+
+        That is the bounding box of every target's padded capture box and last
+        location, or None (the full frame) if any target is searched full-frame
+        only (``padding`` -1) or has no region that fits it.
+        """
+        boxes = []
+        for target in targets:
+            size = self.templates.get(target.path).size
+            regions = [region for source, region in self._regions(target, size, frame_size) if region is not None]
+            if not regions:
+                return None
+            boxes.extend(regions)
+        if not boxes:
+            return None
+        return (min(b[0] for b in boxes), min(b[1] for b in boxes), max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+    def _record(self, target, source, box):
+        """Count where a search ended and remember where the target was found."""
+        with self._lock:
+            if source == "roi": self.roi_hits += 1
+            elif source == "last": self.last_location_hits += 1
+            else: self.full_searches += 1
+            if box is not None:
+                self._last_found[target.name] = box
+
+    @staticmethod
+    def _search(matcher, needle, frame, region, confidence, target, scores):
+        box, score = matcher.find(needle, frame, region, confidence, target.grayscale, target.prefilter,
+                                  target.pyramid)
+        scores.append(score)
+        return box
+
+    @staticmethod
+    def _padded_region(anchor, padding, needle_size, frame_size):
+        """Clamp the padded anchor box to the frame; None if the needle cannot fit."""
+        if not anchor:
+            return None
+        x, y, w, h = anchor[:4]
+        fw, fh = frame_size
+        left, top = max(0, x - padding), max(0, y - padding)
+        right, bottom = min(fw, x + w + padding), min(fh, y + h + padding)
+        if right - left < needle_size[0] or bottom - top < needle_size[1]:
+            return None
+        if left == 0 and top == 0 and right == fw and bottom == fh:
+            return None  # the region is the whole frame; leave it to the full search
+        return (left, top, right, bottom)
+
+    def stats(self):
+        rejections = sum(getattr(m, "prefilter_rejections", 0) for m in self._matchers.values())
+        pool = self._process_pool
+        return {"roi_hits": self.roi_hits, "last_location_hits": self.last_location_hits,
+                "full_searches": self.full_searches, "prefilter_rejections": rejections,
+                "process_searches": self.pool_requests + (pool.requests if pool else 0)}
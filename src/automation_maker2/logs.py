@@ -0,0 +1,98 @@
+"""Asynchronous logging for the app and the sequence engine.
+
+Everything logs to the ``automation_maker`` logger (the engine to its
+``automation_maker.engine`` child). ``configure`` gives that logger a
+single queue handler: the calling thread only builds a LogRecord and puts
+it on a queue, and a QueueListener thread formats it and writes it to the
+console and/or a rotating log file. Records are queued unformatted, so log
+calls must pass %-style arguments that are not mutated afterwards; a call
+below the logger's level does no formatting at all.
+
+The log file can be plain text or JSON lines (one object per record, with
+any ``extra=`` fields such as the step number as keys).
+"""
+import atexit
+import json
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+LOGGER_NAME = "automation_maker"
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(message)s"
+CONSOLE_FORMAT = "%(message)s"
+LOG_FILE_MAX_BYTES = 1_000_000
+LOG_FILE_BACKUPS = 5
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+_listener = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, thread, message and any extra fields."""
+
+    def format(self, record):
+        entry = {"ts": record.created, "level": record.levelname, "logger": record.name,
+                 "thread": record.threadName, "message": record.getMessage()}
+        entry.update((k, v) for k, v in vars(record).items() if k not in _RECORD_FIELDS)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """Queue records as they are; formatting happens on the listener thread."""
+
+    def prepare(self, record):
+        return record
+
+
+def configure(level="INFO", console=True, log_file=None, json_lines=False):
+    """(Re)build the automation_maker handlers behind a queue; returns the logger.
+
+    ``json_lines`` formats the log file as JSON lines, or the console when
+    there is no log file.
+    """
+    global _listener
+    logger = logging.getLogger(LOGGER_NAME)
+    shutdown()
+    handlers = []
+    if console:
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(JsonLinesFormatter() if json_lines and not log_file
+                            else logging.Formatter(CONSOLE_FORMAT))
+        handlers.append(stream)
+    if log_file:
+        file_handler = RotatingFileHandler(log_file, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUPS,
+                                           encoding="utf-8")
+        file_handler.setFormatter(JsonLinesFormatter() if json_lines else logging.Formatter(TEXT_FORMAT))
+        handlers.append(file_handler)
+    records = queue.SimpleQueue()
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.addHandler(_DeferredQueueHandler(records))
+    logger.setLevel(level)
+    logger.propagate = False
+    _listener = QueueListener(records, *handlers)
+    _listener.start()
+    return logger
+
+
+def ensure_configured():
+    """Default console logging for callers (e.g. ``engine.run``) that never called configure."""
+    if _listener is None and not logging.getLogger(LOGGER_NAME).handlers:
+        configure()
+
+
+def shutdown():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+atexit.register(shutdown)
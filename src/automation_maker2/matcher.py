@@ -0,0 +1,359 @@
+"""Template matching backends for image objects.
+
+``NumpyMatcher`` is a built-in normalized cross-correlation matcher
+(equivalent to OpenCV's ``TM_CCOEFF_NORMED``, which pyscreeze uses for
+``confidence=``) written with vectorized NumPy, so confidence matching
+works without OpenCV. Correlation uses an FFT for large templates and
+shifted-slice accumulation for small ones; window statistics come from
+integral images. An optional histogram pre-filter rejects haystacks that
+cannot contain the template before any correlation is computed.
+
+With ``pyramid=True`` the NumPy matcher searches coarse-to-fine: frame and
+template are block-averaged by a factor chosen from the template size (8,
+4 or 2; templates too small to shrink are searched at full resolution), the
+best few candidates on the coarse frame are kept, and only those spots are
+re-scored at full resolution.
+
+``PyAutoGUIMatcher`` keeps the previous pyautogui/pyscreeze path.
+
+Both expose ``prepare(image)`` (done once per template, cached by the
+TemplateCache), ``prepare_frame(frame)`` (optional per-frame work, done
+before matching several templates on one frame in parallel) and
+``find(prepared, frame, region, confidence)``, which
+returns ``(box, score)``; ``box`` is ``(left, top, width, height)`` in frame
+coordinates or None, and ``score`` is the best correlation (None when the
+backend cannot report one).
+"""
+import threading
+
+SLIDING_MAX_TEMPLATE_PIXELS = 64  # templates up to this many pixels skip the FFT
+HIST_BINS = 32
+SCORE_TOLERANCE = 1e-6  # floating-point slack so exact matches pass confidence=1.0
+PYRAMID_FACTORS = (8, 4, 2)
+PYRAMID_MIN_SIDE = 16  # the coarse template keeps at least this many pixels per side
+PYRAMID_CANDIDATES = 8
+PYRAMID_MARGIN = 0.3  # coarse scores run lower than full-resolution ones
+
+BACKENDS = ("auto", "numpy", "pyautogui")
+
+
+def numpy_available():
+    try:
+        import numpy  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class PyAutoGUIMatcher:
+    """Delegates to ``pyautogui.locate`` (needs OpenCV for confidence < 1)."""
+    name = "pyautogui"
+
+    def prepare(self, image, grayscale=False):
+        return image
+
+    def prepare_frame(self, frame, grayscale=False):
+        pass
+
+    def find(self, prepared, frame, region, confidence, grayscale=False, prefilter=False, pyramid=False):
+        from .engine import load_pyautogui
+        haystack = frame.crop(region) if region else frame
+        found = load_pyautogui().locate(prepared, haystack, confidence=confidence, grayscale=grayscale)
+        if not found:
+            return None, None
+        left, top = (region[0], region[1]) if region else (0, 0)
+        return (int(found[0]) + left, int(found[1]) + top, int(found[2]), int(found[3])), None
+
+
+class PreparedTemplate:
+    """Template statistics computed once: zero-mean pixels, energy and histogram."""
+    __slots__ = ("width", "height", "channels", "zero_mean", "energy", "mean", "hist", "nbytes", "_coarse")
+
+    def __init__(self, array):
+        import numpy as np
+        arr = array.astype(np.float64)
+        if arr.ndim == 2:
+            arr = arr[:, :, None]
+        self.height, self.width, self.channels = arr.shape
+        self.mean = arr.mean(axis=(0, 1))
+        self.zero_mean = arr - self.mean
+        self.energy = float((self.zero_mean ** 2).sum())
+        gray = arr.mean(axis=2)
+        self.hist = np.bincount((gray.astype(np.uint8) // (256 // HIST_BINS)).ravel(), minlength=HIST_BINS)
+        self.nbytes = self.zero_mean.nbytes
+        self._coarse = None
+
+    def pyramid_factor(self):
+        """Largest downscale factor that keeps the template recognisable (1 = none)."""
+        for factor in PYRAMID_FACTORS:
+            if min(self.width, self.height) // factor >= PYRAMID_MIN_SIDE:
+                return factor
+        return 1
+
+    def coarse(self, factor):
+        """This template block-averaged by ``factor``, prepared once."""
+        if self._coarse is None or self._coarse[0] != factor:
+            self._coarse = (factor, PreparedTemplate(_downscale(self.zero_mean + self.mean, factor)))
+        return self._coarse[1]
+
+
+class NumpyMatcher:
+    """Normalized cross-correlation matcher in pure NumPy."""
+    name = "numpy"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._frame = None  # frame the cached arrays below were made from
+        self._frame_arrays = {}  # (mode, factor) -> array
+        self.prefilter_rejections = 0
+
+    def prepare(self, image, grayscale=False):
+        import numpy as np
+        return PreparedTemplate(np.asarray(image.convert("L" if grayscale else "RGB")))
+
+    def prepare_frame(self, frame, grayscale=False):
+        self.frame_array(frame, grayscale)
+
+    def release_frame(self):
+        """Drop the arrays cached for the last frame (a match pool worker does so before closing its block)."""
+        with self._lock:
+            self._frame, self._frame_arrays = None, {}
+
+    def frame_array(self, frame, grayscale=False, factor=1):
+        """Convert (and optionally downscale) a PIL frame once; later checks on the same frame reuse it.
+
+        ``frame`` may also be a uint8 array already in the matching mode (match
+        pool workers pass views of shared memory).
+        """
+        import numpy as np
+        key = ("L" if grayscale else "RGB", factor)
+        with self._lock:
+            if self._frame is frame and key in self._frame_arrays:
+                return self._frame_arrays[key]
+        if factor == 1 and isinstance(frame, np.ndarray):
+            array = frame
+        elif factor == 1:
+            image = frame if frame.mode == key[0] else frame.convert(key[0])
+            array = np.asarray(image)
+        else:
+            array = _downscale(self.frame_array(frame, grayscale), factor)
+        with self._lock:
+            if self._frame is not frame:
+                self._frame, self._frame_arrays = frame, {}
+            self._frame_arrays[key] = array
+        return array
+
+    def find(self, prepared, frame, region, confidence, grayscale=False, prefilter=False, pyramid=False):
+        haystack = self.frame_array(frame, grayscale)
+        left, top = 0, 0
+        if region:
+            left, top, right, bottom = region
+            haystack = haystack[top:bottom, left:right]
+        if pyramid:
+            factor = prepared.pyramid_factor()
+            if factor > 1:
+                if prefilter and not self._prefilter(prepared, haystack, confidence):
+                    return None, None
+                coarse = self.frame_array(frame, grayscale, factor)
+                if region:
+                    # First whole block inside the region, and where it starts relative to the region
+                    coarse = coarse[-(-top // factor):bottom // factor, -(-left // factor):right // factor]
+                box, score = self.match_pyramid(prepared, haystack, coarse, factor, confidence,
+                                                offset=((-left) % factor, (-top) % factor))
+                if box is None:
+                    return None, score
+                return (box[0] + left, box[1] + top, box[2], box[3]), score
+        box, score = self.match_array(prepared, haystack, confidence, prefilter)
+        if box is None:
+            return None, score
+        return (box[0] + left, box[1] + top, box[2], box[3]), score
+
+    def match_array(self, prepared, haystack, confidence, prefilter=False):
+        """Best match of ``prepared`` in a HxW or HxWxC uint8 array."""
+        import numpy as np
+        if haystack.ndim == 2:
+            haystack = haystack[:, :, None]
+        H, W = haystack.shape[:2]
+        h, w = prepared.height, prepared.width
+        if h > H or w > W:
+            return None, None
+        if prefilter and not self._prefilter(prepared, haystack, confidence):
+            return None, None
+        scores = ncc_scores(haystack, prepared)
+        best = int(np.argmax(scores))
+        y, x = divmod(best, scores.shape[1])
+        score = float(scores[y, x])
+        if score + SCORE_TOLERANCE >= confidence:
+            return (x, y, w, h), score
+        return None, score
+
+    def match_pyramid(self, prepared, haystack, coarse, factor, confidence, offset=(0, 0)):
+        """Coarse-to-fine search: candidates on ``coarse``, re-scored on ``haystack``.
+
+        ``coarse`` is ``haystack`` block-averaged by ``factor``; ``offset`` is
+        where its first block starts inside ``haystack`` (non-zero when the
+        haystack is a region of a frame downscaled as a whole).
+        """
+        import numpy as np
+        if haystack.ndim == 2:
+            haystack = haystack[:, :, None]
+        if coarse.ndim == 2:
+            coarse = coarse[:, :, None]
+        small = prepared.coarse(factor)
+        if small.height > coarse.shape[0] or small.width > coarse.shape[1]:
+            return self.match_array(prepared, haystack, confidence)
+        scores = ncc_scores(coarse, small)
+        H, W = haystack.shape[:2]
+        h, w = prepared.height, prepared.width
+        threshold = confidence - PYRAMID_MARGIN
+        best_box, best_score = None, None
+        for _ in range(PYRAMID_CANDIDATES):
+            i = int(np.argmax(scores))
+            cy, cx = divmod(i, scores.shape[1])
+            if scores[cy, cx] < threshold:
+                break
+            # Suppress this peak's neighbourhood so the next candidate is a different spot
+            scores[max(0, cy - small.height // 2):cy + small.height // 2 + 1,
+                   max(0, cx - small.width // 2):cx + small.width // 2 + 1] = -np.inf
+            x0 = min(max(0, offset[0] + cx * factor - factor), W - w)
+            y0 = min(max(0, offset[1] + cy * factor - factor), H - h)
+            window = haystack[y0:min(H, y0 + h + 2 * factor), x0:min(W, x0 + w + 2 * factor)]
+            fine = ncc_scores(window, prepared)
+            j = int(np.argmax(fine))
+            fy, fx = divmod(j, fine.shape[1])
+            score = float(fine[fy, fx])
+            if best_score is None or score > best_score:
+                best_box, best_score = (x0 + fx, y0 + fy, w, h), score
+        if best_box is not None and best_score + SCORE_TOLERANCE >= confidence:
+            return best_box, best_score
+        return None, best_score
+
+    def _prefilter(self, prepared, haystack, confidence):
+        if haystack.ndim == 2:
+            haystack = haystack[:, :, None]
+        if self._histogram_may_match(prepared, haystack, confidence):
+            return True
+        with self._lock:
+            self.prefilter_rejections += 1
+        return False
+
+    @staticmethod
+    def _histogram_may_match(prepared, haystack, confidence):
+        """Reject when too much of the template's brightness mass is absent from the haystack."""
+        import numpy as np
+        gray = haystack if haystack.shape[2] == 1 else haystack.mean(axis=2, dtype=np.float32)
+        hist = np.bincount((gray.astype(np.uint8) // (256 // HIST_BINS)).ravel(), minlength=HIST_BINS)
+        total = prepared.width * prepared.height
+        covered = np.minimum(prepared.hist, hist).sum() / total
+        return covered >= max(0.0, 2 * confidence - 1)
+
+
+def ncc_scores(haystack, prepared):
+    """TM_CCOEFF_NORMED score map over all valid template positions.
+
+    Channels are combined the way OpenCV does: numerators and variances are
+    summed across channels before normalizing. Windows with zero variance
+    score 0, except that a flat template scores 1 - (largest per-channel
+    difference of means) / 255 against flat windows, so solid-colour
+    templates still match.
+    """
+    import numpy as np
+    frame = haystack.astype(np.float64)
+    H, W, C = frame.shape
+    h, w = prepared.height, prepared.width
+    n = h * w
+    out_h, out_w = H - h + 1, W - w + 1
+
+    # Window sums via integral images; squares are summed over channels first
+    window_sum = np.empty((out_h, out_w, C))
+    window_sq = _window_sums(np.einsum("ijk,ijk->ij", frame, frame), h, w)
+    for c in range(C):
+        s1 = window_sum[:, :, c] = _window_sums(frame[:, :, c], h, w)
+        window_sq -= s1 * s1 / n
+    window_var = np.maximum(window_sq, 0.0)
+
+    if prepared.energy == 0.0:
+        difference = np.abs(window_sum / n - prepared.mean).max(axis=2)
+        flat = window_var < 1e-6
+        return np.where(flat, 1.0 - difference / 255.0, 0.0)
+
+    if n <= SLIDING_MAX_TEMPLATE_PIXELS:
+        numerator = _correlate_sliding(frame, prepared.zero_mean, out_h, out_w)
+    else:
+        numerator = _correlate_fft(frame, prepared.zero_mean, out_h, out_w)
+
+    denominator = np.sqrt(window_var * prepared.energy)
+    scores = np.zeros_like(numerator)
+    np.divide(numerator, denominator, out=scores, where=denominator > 1e-6)
+    return np.clip(scores, -1.0, 1.0)
+
+
+def _downscale(array, factor):
+    """Block-average an HxW or HxWxC array by an integer factor (edges that do not fill a block are dropped)."""
+    import numpy as np
+    h, w = array.shape[0] // factor, array.shape[1] // factor
+    blocks = array[:h * factor, :w * factor].reshape((h, factor, w, factor) + array.shape[2:])
+    return blocks.mean(axis=(1, 3), dtype=np.float32)
+
+
+def _window_sums(values, h, w):
+    import numpy as np
+    ii = np.zeros((values.shape[0] + 1, values.shape[1] + 1))
+    np.cumsum(np.cumsum(values, axis=0), axis=1, out=ii[1:, 1:])
+    return ii[h:, w:] - ii[:-h, w:] - ii[h:, :-w] + ii[:-h, :-w]
+
+
+def _correlate_sliding(frame, template, out_h, out_w):
+    """Accumulate one shifted frame slice per template pixel (cheap for tiny templates)."""
+    import numpy as np
+    h, w, C = template.shape
+    acc = np.zeros((out_h, out_w))
+    for dy in range(h):
+        for dx in range(w):
+            window = frame[dy:dy + out_h, dx:dx + out_w, :]
+            acc += window @ template[dy, dx, :]
+    return acc
+
+
+def _correlate_fft(frame, template, out_h, out_w):
+    """Cross-correlate all channels with one inverse real FFT."""
+    import numpy as np
+    H, W, _ = frame.shape
+    shape = (_fast_len(H), _fast_len(W))
+    spectrum = np.fft.rfft2(frame, s=shape, axes=(0, 1))
+    spectrum *= np.conj(np.fft.rfft2(template, s=shape, axes=(0, 1)))
+    corr = np.fft.irfft2(spectrum.sum(axis=2), s=shape)
+    return corr[:out_h, :out_w]
+
+
+def _fast_len(n):
+    """Smallest 2^a * 3^b * 5^c >= n, an efficient FFT size."""
+    best = 1 << (n - 1).bit_length()
+    p5 = 1
+    while p5 < best:
+        p35 = p5
+        while p35 < best:
+            v = p35
+            while v < n:
+                v *= 2
+            best = min(best, v)
+            p35 *= 3
+        p5 *= 5
+    return best
+
+
+def resolve_backend(backend):
+    """"auto" picks NumPy when it is installed, else pyautogui."""
+    if backend == "auto":
+        return "numpy" if numpy_available() else "pyautogui"
+    return backend
+
+
+def create_matcher(backend):
+    """Matcher for an object's ``match_backend``."""
+    backend = resolve_backend(backend)
+    if backend == "numpy":
+        return NumpyMatcher()
+    if backend == "pyautogui":
+        return PyAutoGUIMatcher()
+    raise ValueError(f"Unknown match backend '{backend}'.")
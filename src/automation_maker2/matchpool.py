@@ -0,0 +1,173 @@
+"""Process-pool image matching over shared-memory frames.
+
+Matching in threads still takes the GIL between NumPy calls, so a wait
+checking many templates competes with the Tk loop and input calls.
+``MatchPool`` runs NumPy matching in worker processes instead:
+
+- each frame is written once per colour mode into a
+  ``multiprocessing.shared_memory`` block, and every worker reads that
+  block in place; each mode has two blocks, so writing a new frame never
+  overwrites one a worker may still be reading;
+- a request is a small tuple (ring slot, block name, frame generation,
+  shape, template path, match options, candidate regions, confidence) and
+  the reply is ``(box, score, index of the region that matched)``;
+- each worker keeps its own TemplateCache and NumpyMatcher, so a template
+  is decoded once per worker, and keeps one array view per frame
+  generation, so several templates checked on the same frame share its
+  downscaled copies. Workers attach one block per ring slot and close it
+  when the slot's block is replaced (the screen size changed).
+
+The pool pays for a frame copy per new grab and for a round trip per
+template, so it only beats in-process threads when there are more free
+cores than workers and each poll has enough matching to spread: several
+templates searched full-frame or with large regions on a big screen. With
+few templates, small regions or as many workers as cores it is slower;
+``benchmarks/bench_matchpool.py`` measures this on the machine at hand.
+The worker count is capped at the CPU count.
+
+Only the NumPy backend runs in the pool; pyautogui matching stays in the
+calling process.
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+SLOTS_PER_MODE = 2
+
+_worker = {}  # per-process state, set up by _init_worker
+
+
+def _init_worker():
+    from .matcher import NumpyMatcher
+    from .templates import TemplateCache
+    _worker.update(matcher=NumpyMatcher(), templates=TemplateCache(), blocks={}, views={})
+
+
+def _ping():
+    return True
+
+
+def _frame_view(key, name, generation, shape):
+    """Array over ring slot ``key``'s shared block; the same object while the block holds the same frame."""
+    import numpy as np
+    views, blocks = _worker["views"], _worker["blocks"]
+    view = views.get(key)
+    if view is None or view[0] != (name, generation):
+        block = blocks.get(key)
+        if block is not None and block.name != name:
+            # The slot was given a new block; let go of the old one so its memory can be freed
+            views.pop(key, None); view = None
+            _worker["matcher"].release_frame()
+            block.close()
+            block = None
+        if block is None:
+            block = blocks[key] = shared_memory.SharedMemory(name=name)
+        view = views[key] = ((name, generation), np.ndarray(shape, np.uint8, buffer=block.buf))
+    return view[1]
+
+
+def _match(request):
+    key, name, generation, shape, path, grayscale, prefilter, pyramid, regions, confidence = request
+    matcher = _worker["matcher"]
+    frame = _frame_view(key, name, generation, shape)
+    needle = _worker["templates"].prepared(path, matcher, grayscale)
+    score = None
+    for k, region in enumerate(regions):
+        box, score = matcher.find(needle, frame, region, confidence, grayscale, prefilter, pyramid)
+        if box is not None:
+            return box, score, k
+    return None, score, len(regions) - 1
+
+
+class _SharedSlot:
+    """One shared-memory frame block and the requests still reading it."""
+
+    def __init__(self, key, shape):
+        import numpy as np
+        self.key = key  # (mode, ring position), which workers key their attached blocks by
+        self.shape = shape
+        self.block = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)))
+        self.array = np.ndarray(shape, np.uint8, buffer=self.block.buf)
+        self.generation = 0
+        self.pending = []
+
+    def release(self):
+        wait(self.pending)
+        self.array = None
+        self.block.close()
+        self.block.unlink()
+
+
+class MatchPool:
+    """Worker processes that match templates against frames published to shared memory."""
+
+    def __init__(self, workers):
+        self.workers = max(1, min(int(workers), os.cpu_count() or 1))
+        if os.name == "posix":
+            # Workers attaching to a block register it for cleanup; with their own resource
+            # tracker they would unlink our blocks when they exit, so make them share ours
+            from multiprocessing import resource_tracker
+            resource_tracker.ensure_running()
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        self._lock = threading.RLock()
+        self._rings = {}  # mode -> [slot or None] * SLOTS_PER_MODE
+        self._next = {}  # mode -> ring position to write next
+        self._frame = None  # frame the published slots below hold
+        self._published = {}  # mode -> slot
+        self._generation = 0
+        self.frames_published = 0
+        self.requests = 0
+
+    def start(self):
+        """Spawn the workers now rather than on the first match."""
+        wait([self._executor.submit(_ping) for _ in range(self.workers)])
+
+    def publish(self, frame, grayscale=False):
+        """Copy ``frame`` into shared memory unless it is already there; returns its slot."""
+        import numpy as np
+        mode = "L" if grayscale else "RGB"
+        with self._lock:
+            if self._frame is not frame:
+                self._frame, self._published = frame, {}
+            slot = self._published.get(mode)
+            if slot is not None:
+                return slot
+            array = np.asarray(frame if frame.mode == mode else frame.convert(mode))
+            ring = self._rings.setdefault(mode, [None] * SLOTS_PER_MODE)
+            i = self._next.get(mode, 0)
+            self._next[mode] = (i + 1) % SLOTS_PER_MODE
+            slot = ring[i]
+            if slot is not None and slot.shape != array.shape:
+                slot.release()
+                slot = None
+            if slot is None:
+                slot = ring[i] = _SharedSlot((mode, i), array.shape)
+            # Requests for the frame this slot held before may still be running
+            wait(slot.pending)
+            np.copyto(slot.array, array)
+            self._generation += 1
+            slot.generation, slot.pending = self._generation, []
+            self._published[mode] = slot
+            self.frames_published += 1
+            return slot
+
+    def submit(self, frame, target, regions, confidence):
+        """Future for ``(box, score, region index)``; ``regions`` are tried in order (None = full frame)."""
+        with self._lock:
+            slot = self.publish(frame, target.grayscale)
+            request = (slot.key, slot.block.name, slot.generation, slot.shape, target.path, target.grayscale,
+                       target.prefilter, target.pyramid, list(regions), confidence)
+            future = self._executor.submit(_match, request)
+            slot.pending.append(future)
+            self.requests += 1
+        return future
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            for ring in self._rings.values():
+                for slot in ring:
+                    if slot is not None:
+                        slot.release()
+            self._rings, self._published, self._frame = {}, {}, None
@@ -0,0 +1,283 @@
+"""Sequence model: the steps being edited, with change notifications.
+
+A ``Sequence`` owns the ordered ``Step`` objects of the open sequence and is
+the single source of truth for them: editors bind to it and update only
+what changed, and saving or running reads it directly. Steps are compact
+``__slots__`` objects whose action is an interned ``Action`` member (a str,
+so it compares, hashes and serializes like the action name).
+
+Listeners registered with ``subscribe`` are called as
+``listener(kind, payload)``:
+
+    ``reset``    {}                  the whole step list was replaced
+    ``changed``  {}                  steps were inserted, deleted or moved
+    ``step``     {"step", "field"}   one step's object_name, action, params or note changed
+
+Structural changes made inside ``batch()`` are reported once, as a single
+``changed`` when the outermost batch exits.
+"""
+import sys
+from contextlib import contextmanager
+from enum import Enum
+
+
+class Action(str, Enum):
+    """Step actions; unknown names from files stay plain (interned) strings."""
+    GOTO_STEP = "Goto Step"
+    IF_IMAGE_FOUND = "If Image Found"
+    IF_PIXEL_COLOR = "If Pixel Color"
+    CLICK = "Click"
+    WAIT_FOR_IMAGE = "Wait for Image"
+    WAIT_FOR_ANY_IMAGE = "Wait for Any Image"
+    WAIT_FOR_PIXEL_COLOR = "Wait for Pixel Color"
+    WAIT = "Wait"
+    KEYBOARD_INPUT = "Keyboard Input"
+    PRESS_KEY = "Press Key"
+    HOTKEY_COMBO = "Hotkey Combo"
+    SCROLL = "Scroll"
+    TYPE_INTO_REGION = "Type into Region (Future)"
+
+    def __str__(self):
+        return self.value
+
+    @classmethod
+    def parse(cls, name):
+        try:
+            return cls(name)
+        except ValueError:
+            return sys.intern(str(name or ""))
+
+
+class Step:
+    """One step. Assigning a field (or ``set_param``) notifies the owning Sequence.
+
+    Steps also read like the step dicts of a saved sequence (``step["action"]``,
+    ``dict(step)``), which is what the engine copies them with.
+    """
+    __slots__ = ("_object_name", "_action", "_params", "_note", "_sequence")
+    FIELDS = ("object_name", "action", "params", "note")
+
+    def __init__(self, object_name=None, action=Action.WAIT, params=None, note=""):
+        self._object_name = object_name or None
+        self._action = Action.parse(action)
+        self._params = dict(params or {})
+        self._note = note or ""
+        self._sequence = None
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(data.get("object_name"), data.get("action", ""), data.get("params"), data.get("note", ""))
+
+    def to_data(self):
+        return {"object_name": self._object_name, "action": self._action, "params": dict(self._params), "note": self._note}
+
+    def _changed(self, field):
+        if self._sequence is not None:
+            self._sequence._notify("step", step=self, field=field)
+
+    @property
+    def object_name(self):
+        return self._object_name
+
+    @object_name.setter
+    def object_name(self, value):
+        if (value or None) != self._object_name:
+            self._object_name = value or None
+            self._changed("object_name")
+
+    @property
+    def action(self):
+        return self._action
+
+    @action.setter
+    def action(self, value):
+        value = Action.parse(value)
+        if value != self._action:
+            self._action = value
+            self._changed("action")
+
+    @property
+    def params(self):
+        """The parameter dict; change it through ``set_param`` or by assigning a new dict."""
+        return self._params
+
+    @params.setter
+    def params(self, value):
+        self._params = dict(value or {})
+        self._changed("params")
+
+    def set_param(self, key, value):
+        if self._params.get(key, self) != value:
+            self._params[key] = value
+            self._changed("params")
+
+    @property
+    def note(self):
+        return self._note
+
+    @note.setter
+    def note(self, value):
+        if (value or "") != self._note:
+            self._note = value or ""
+            self._changed("note")
+
+    def references(self, object_name):
+        """Whether the step uses the object: as its target, its condition or a Wait for Any Image branch."""
+        if self._object_name == object_name:
+            return True
+        params = self._params
+        return (params.get("condition_object_name") == object_name
+                or any(b.get("object_name") == object_name for b in params.get("branches") or ()))
+
+    def rename_object(self, old_name, new_name):
+        """Point every reference to ``old_name`` at ``new_name``."""
+        if self._object_name == old_name:
+            self.object_name = new_name
+        params = self._params
+        branches = params.get("branches") or ()
+        if params.get("condition_object_name") == old_name or any(b.get("object_name") == old_name for b in branches):
+            params = dict(params)
+            if params.get("condition_object_name") == old_name:
+                params["condition_object_name"] = new_name
+            if branches:
+                params["branches"] = [dict(b, object_name=new_name) if b.get("object_name") == old_name else b for b in branches]
+            self.params = params
+
+    def forget_object(self, name):
+        """Drop every reference to ``name``: the target, the condition and the Wait for Any Image branches."""
+        if self._object_name == name:
+            self.object_name = None
+        params = self._params
+        branches = params.get("branches") or ()
+        if params.get("condition_object_name") == name or any(b.get("object_name") == name for b in branches):
+            params = dict(params)
+            if params.get("condition_object_name") == name:
+                del params["condition_object_name"]
+            if branches:
+                params["branches"] = [b for b in branches if b.get("object_name") != name]
+            self.params = params
+
+    # Read-only mapping view, as a saved step dict
+    def keys(self):
+        return self.FIELDS
+
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.FIELDS else default
+
+    def __repr__(self):
+        return f"Step({self._object_name!r}, {str(self._action)!r}, {self._params!r})"
+
+
+class Sequence:
+    """The ordered steps of the open sequence, with change notifications."""
+
+    def __init__(self, steps=()):
+        self.steps = []
+        self._listeners = []
+        self._batch_depth = 0
+        self._pending = False
+        self.replace(steps)
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __iter__(self):
+        return iter(self.steps)
+
+    def __getitem__(self, index):
+        return self.steps[index]
+
+    # --- Notifications ---
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, kind, **payload):
+        if kind == "changed" and self._batch_depth:
+            self._pending = True
+            return
+        for listener in list(self._listeners):
+            listener(kind, payload)
+
+    @contextmanager
+    def batch(self):
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._pending:
+                self._pending = False
+                self._notify("changed")
+
+    # --- Edits ---
+    def _adopt(self, step):
+        """A Step owned by this sequence from a Step or step data; owned Steps are copied."""
+        if not isinstance(step, Step):
+            step = Step.from_data(step)
+        elif step._sequence is not None:
+            step = Step.from_data(step.to_data())
+        step._sequence = self
+        return step
+
+    def _release(self, steps):
+        for step in steps:
+            step._sequence = None
+
+    def replace(self, steps):
+        self._release(self.steps)
+        self.steps = [self._adopt(step) for step in steps]
+        self._notify("reset")
+
+    def insert(self, inserts):
+        """Insert ``[(index, step), ...]`` in one pass; indexes refer to the list before the insert,
+        and steps given the same index keep their order."""
+        by_index = {}
+        for index, step in inserts:
+            by_index.setdefault(min(max(index, 0), len(self.steps)), []).append(self._adopt(step))
+        if not by_index:
+            return
+        steps, start = [], 0
+        for index in sorted(by_index):
+            steps.extend(self.steps[start:index]); steps.extend(by_index[index]); start = index
+        steps.extend(self.steps[start:])
+        self.steps = steps
+        self._notify("changed")
+
+    def delete(self, indexes):
+        drop = {i for i in indexes if 0 <= i < len(self.steps)}
+        if drop:
+            self._release(self.steps[i] for i in drop)
+            self.steps = [step for i, step in enumerate(self.steps) if i not in drop]
+            self._notify("changed")
+
+    def move(self, indexes, to_index):
+        """Move the steps at ``indexes`` as one block (in list order) to ``to_index`` of the remaining list."""
+        picked = {i for i in indexes if 0 <= i < len(self.steps)}
+        if not picked:
+            return
+        block = [step for i, step in enumerate(self.steps) if i in picked]
+        rest = [step for i, step in enumerate(self.steps) if i not in picked]
+        to_index = min(max(to_index, 0), len(rest))
+        self.steps = rest[:to_index] + block + rest[to_index:]
+        self._notify("changed")
+
+    def swap(self, i, j):
+        steps = self.steps
+        steps[i], steps[j] = steps[j], steps[i]
+        self._notify("changed")
+
+    def referencing(self, object_name):
+        return [step for step in self.steps if step.references(object_name)]
+
+    def to_data(self):
+        """Plain step dicts, as saved in a sequence file; steps left without an action are not saved."""
+        return [step.to_data() for step in self.steps if step.action]
@@ -0,0 +1,61 @@
+"""Pixel colour checks for pointRGB and pixel signature objects.
+
+A ``PixelCheck`` holds the points one step reads, the colours it expects
+and a per-channel tolerance. ``FrameCapture.sample`` reads all its points
+from a single grab of their bounding box (or from a fresh full frame), and
+the comparison is vectorized when NumPy is available.
+
+A pixel signature object is N points checked together::
+
+    {"type": "pixelSignature", "tolerance": 10,
+     "points": [{"coords": [x, y], "rgb": [r, g, b]}, ...]}
+
+``tolerance`` is one number for all channels or ``[r, g, b]``; a pointRGB
+object is the one-point case with a default tolerance of 0 (exact match).
+"""
+
+
+def parse_tolerance(value):
+    """Per-channel tolerance triple from an int or a 3-item list."""
+    if isinstance(value, (list, tuple)):
+        tolerance = tuple(int(v) for v in value)
+        if len(tolerance) != 3:
+            raise ValueError("tolerance must be one number or three (R, G, B)")
+    else:
+        tolerance = (int(value),) * 3
+    if not all(0 <= v <= 255 for v in tolerance):
+        raise ValueError("tolerance must be between 0 and 255")
+    return tolerance
+
+
+class PixelCheck:
+    """Points, expected colours and tolerance for one pixel condition."""
+    __slots__ = ("points", "expected", "tolerance")
+
+    def __init__(self, points, expected, tolerance=(0, 0, 0)):
+        self.points = [(int(x), int(y)) for x, y in points]
+        self.expected = [tuple(int(v) for v in rgb) for rgb in expected]
+        if len(self.points) != len(self.expected) or not self.points:
+            raise ValueError("every point needs an expected colour")
+        if any(len(rgb) != 3 for rgb in self.expected):
+            raise ValueError("expected colours must be three integers")
+        self.tolerance = parse_tolerance(tolerance)
+
+    @classmethod
+    def from_signature(cls, obj, tolerance=None):
+        points = obj.get("points") or []
+        return cls([p["coords"][:2] for p in points], [p["rgb"] for p in points],
+                   obj.get("tolerance", 0) if tolerance is None else tolerance)
+
+    def sample(self, capture):
+        """Current colours of every point as a tuple of (r, g, b) tuples."""
+        return capture.sample(self.points)
+
+    def matches(self, colors):
+        try:
+            import numpy as np
+        except ImportError:
+            return all(abs(c - e) <= t for color, rgb in zip(colors, self.expected)
+                       for c, e, t in zip(color, rgb, self.tolerance))
+        difference = np.abs(np.asarray(colors, dtype=np.int16) - np.asarray(self.expected, dtype=np.int16))
+        return bool((difference <= np.asarray(self.tolerance, dtype=np.int16)).all())
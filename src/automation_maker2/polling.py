@@ -0,0 +1,58 @@
+"""Change-aware, adaptive polling for the wait actions.
+
+A wait used to sleep a fixed 0.25 s and run a full match on every tick even
+when nothing on screen had changed. ``AdaptivePoll`` fingerprints the
+watched pixels each tick so the caller can skip the match on an unchanged
+frame, and schedules the next tick:
+
+- right after an input action (a click, keypress or scroll within
+  ``settle_s``) it starts fast, since the screen is about to react;
+- every unchanged tick backs the interval off towards ``max_s``;
+- a change snaps it back to the fast interval.
+
+It also counts polls and matches so each wait can report its cost.
+"""
+import time
+import zlib
+
+FAST_S = 0.05
+BASE_S = 0.25
+MAX_S = 1.0
+BACKOFF = 1.5
+SETTLE_S = 1.0
+
+
+def frame_digest(frame, region=None):
+    """Cheap fingerprint of a PIL frame (or a ``(left, top, right, bottom)`` part of it)."""
+    return zlib.crc32((frame.crop(region) if region else frame).tobytes())
+
+
+class AdaptivePoll:
+    """Interval schedule and poll/match counters for one wait."""
+
+    def __init__(self, capture, fast_s=FAST_S, base_s=BASE_S, max_s=MAX_S, backoff=BACKOFF, settle_s=SETTLE_S):
+        self.fast_s = fast_s
+        self.max_s = max_s
+        self.backoff = backoff
+        recent_input = time.perf_counter() - capture.invalidated_at < settle_s
+        self.interval = fast_s if recent_input else base_s
+        self._digest = None
+        self.polls = 0
+        self.matches = 0
+
+    def changed(self, digest):
+        """Record a tick's fingerprint; True when the caller needs to (re)match."""
+        self.polls += 1
+        first = self._digest is None
+        changed = digest != self._digest
+        self._digest = digest
+        if changed:
+            self.matches += 1
+            if not first:
+                self.interval = self.fast_s
+        else:
+            self.interval = min(self.max_s, self.interval * self.backoff)
+        return changed
+
+    def summary(self):
+        return f"{self.polls} polls, {self.matches} matches"
@@ -0,0 +1,188 @@
+"""Per-step latency statistics for sequence runs.
+
+The engine brackets each step execution with ``step_started`` /
+``step_finished`` and the work inside it with the phase timers
+``capture`` (screen grabs and pixel reads), ``match`` (template and colour
+matching), ``input`` (mouse and keyboard calls) and ``sleep`` (waits and
+poll intervals)::
+
+    with stats.capture:
+        frame = capture.frame()
+
+With ``trace`` set to a RunTrace every step, phase, poll tick and jump is
+also recorded as a trace event (see tracing.py).
+
+Executions are aggregated per step index and per action type: count, mean,
+p50, p95 and max wall time, mean time per phase, poll counts and match
+scores. Percentiles come from the most recent ``SAMPLE_LIMIT`` executions
+of each step or action; count, mean and max cover the whole run.
+"""
+import csv
+import json
+import time
+from collections import deque
+
+PHASES = ("capture", "match", "input", "sleep")
+SAMPLE_LIMIT = 10000
+COLUMNS = ("step", "action", "object", "count", "mean_ms", "p50_ms", "p95_ms", "max_ms",
+           "capture_ms", "match_ms", "input_ms", "sleep_ms", "polls", "matches", "score_mean", "score_min")
+
+
+class _PhaseTimer:
+    """Adds the time spent inside ``with`` to one phase of the current step."""
+    __slots__ = ("_stats", "_slot", "_started")
+
+    def __init__(self, stats, slot):
+        self._stats = stats
+        self._slot = slot
+        self._started = 0.0
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        stats = self._stats
+        if stats._current is not None:
+            ended = time.perf_counter()
+            stats._current[self._slot] += ended - self._started
+            if stats.trace is not None:
+                stats.trace.slice(PHASES[self._slot], self._started, ended, "phase")
+        return False
+
+
+class _Aggregate:
+    """Running totals for one step index or action type."""
+    __slots__ = ("action", "object_name", "count", "total", "max", "samples", "phases",
+                 "polls", "matches", "score_total", "score_count", "score_min")
+
+    def __init__(self, action, object_name):
+        self.action = action
+        self.object_name = object_name
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=SAMPLE_LIMIT)
+        self.phases = [0.0] * len(PHASES)
+        self.polls = 0
+        self.matches = 0
+        self.score_total = 0.0
+        self.score_count = 0
+        self.score_min = None
+
+    def add(self, wall, phases, polls, matches, scores):
+        self.count += 1
+        self.total += wall
+        self.max = max(self.max, wall)
+        self.samples.append(wall)
+        for i, value in enumerate(phases):
+            self.phases[i] += value
+        self.polls += polls
+        self.matches += matches
+        for score in scores:
+            self.score_total += score
+            self.score_count += 1
+            self.score_min = score if self.score_min is None else min(self.score_min, score)
+
+    def row(self, step=None):
+        ordered = sorted(self.samples)
+        ms = lambda seconds: round(seconds * 1000, 3)
+        row = {"step": step, "action": self.action, "object": self.object_name, "count": self.count,
+               "mean_ms": ms(self.total / self.count), "p50_ms": ms(_percentile(ordered, 50)),
+               "p95_ms": ms(_percentile(ordered, 95)), "max_ms": ms(self.max)}
+        for name, total in zip(PHASES, self.phases):
+            row[f"{name}_ms"] = ms(total / self.count)
+        row.update(polls=self.polls, matches=self.matches,
+                   score_mean=round(self.score_total / self.score_count, 4) if self.score_count else None,
+                   score_min=round(self.score_min, 4) if self.score_min is not None else None)
+        return row
+
+
+def _percentile(ordered, p):
+    """Nearest-rank percentile of an ascending list."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, -(-p * len(ordered) // 100) - 1))]
+
+
+class RunStats:
+    """Collects step timings for one engine; read it once the run has finished."""
+
+    def __init__(self, name=""):
+        self.name = name
+        self.by_step = {}  # step index -> _Aggregate
+        self.by_action = {}  # action -> _Aggregate
+        self._current = None  # phase totals of the running step; None between steps
+        self._step = None  # (index, action, object name) of the running step
+        self._started = 0.0
+        self._polls = self._matches = 0
+        self._scores = []
+        self.trace = None  # RunTrace that also receives each step, phase, poll tick and jump
+        self.capture, self.match, self.input, self.sleep = (_PhaseTimer(self, i) for i in range(len(PHASES)))
+
+    def step_started(self, index, action, object_name=None):
+        self._step = (index, action, object_name)
+        self._current = [0.0] * len(PHASES)
+        self._started = time.perf_counter()
+        self._polls = self._matches = 0
+        self._scores = []
+
+    def note_score(self, score):
+        if score is not None and self._current is not None:
+            self._scores.append(score)
+
+    def poll_tick(self, poll):
+        """One wait iteration; only traced (the totals arrive through note_polls)."""
+        if self.trace is not None:
+            self.trace.counter("polls", time.perf_counter(), {"polls": poll.polls, "matches": poll.matches})
+
+    def note_polls(self, polls, matches):
+        if self._current is not None:
+            self._polls += polls
+            self._matches += matches
+
+    def step_finished(self, jump=-1):
+        """End the running step; ``jump`` is the 0-based step it jumps to, or -1."""
+        if self._current is None:
+            return
+        ended = time.perf_counter()
+        wall = ended - self._started
+        index, action, object_name = self._step
+        if self.trace is not None:
+            args = {"object": object_name} if object_name else {}
+            if jump != -1:
+                args["jump_to"] = jump + 1
+                self.trace.instant(f"Jump {index + 1} -> {jump + 1}", ended, "jump", {"from": index + 1, "to": jump + 1})
+            self.trace.slice(f"{index + 1} {action}", self._started, ended, "step", args)
+        for aggregates, key, obj in ((self.by_step, index, object_name), (self.by_action, action, None)):
+            aggregate = aggregates.get(key)
+            if aggregate is None:
+                aggregate = aggregates[key] = _Aggregate(action, obj)
+            aggregate.add(wall, self._current, self._polls, self._matches, self._scores)
+        self._current = None
+
+    def rows(self, by="step"):
+        """Aggregated rows, by step number (1-based) or by action, slowest mean first for actions."""
+        if by == "step":
+            return [self.by_step[i].row(i + 1) for i in sorted(self.by_step)]
+        return sorted((a.row() for a in self.by_action.values()), key=lambda r: -r["mean_ms"])
+
+    def to_json(self, path):
+        with open(path, "w") as f:
+            json.dump({"sequence": self.name, "steps": self.rows("step"), "actions": self.rows("action")}, f, indent=2)
+
+    def to_csv(self, path):
+        """Both tables in one CSV; the ``group`` column says which one a row belongs to."""
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=("group",) + COLUMNS)
+            writer.writeheader()
+            for group in ("step", "action"):
+                for row in self.rows(group):
+                    writer.writerow({"group": group, **row})
+
+    def export(self, path):
+        """Write CSV for a ``.csv`` path, JSON otherwise."""
+        if path.lower().endswith(".csv"):
+            self.to_csv(path)
+        else:
+            self.to_json(path)
@@ -0,0 +1,99 @@
+"""Decoded template cache for image objects.
+
+Image lookups used to hand a file path to pyautogui, which re-read and
+decoded the PNG on every call. The cache keeps decoded templates (and
+derived grayscale/downscaled variants) in memory, keyed by path, variant
+and file mtime, with least-recently-used eviction under a byte budget.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class TemplateCache:
+    """Thread-safe LRU cache of decoded PIL templates.
+
+    ``get(path, mode, scale)`` returns the template converted to ``mode``
+    ("RGB" or "L") and shrunk by the integer factor ``scale``. An entry is
+    reloaded when the file's mtime changes, so re-capturing an image object
+    takes effect without restarting.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = int(max_bytes)
+        self._entries = OrderedDict()  # (path, variant...) -> (mtime_ns, image, nbytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, path, mode="RGB", scale=1):
+        mtime = os.stat(path).st_mtime_ns
+        key = (path, mode, scale)
+        entry = self._lookup(key, mtime)
+        if entry is not None:
+            return entry
+        image = self._load(path, mode, scale)
+        self._store(key, mtime, image, image.width * image.height * len(image.getbands()))
+        return image
+
+    def prepared(self, path, matcher, grayscale=False):
+        """Template preprocessed by ``matcher.prepare`` (e.g. NumPy statistics)."""
+        mtime = os.stat(path).st_mtime_ns
+        key = (path, matcher.name, grayscale)
+        entry = self._lookup(key, mtime)
+        if entry is not None:
+            return entry
+        prepared = matcher.prepare(self.get(path), grayscale)
+        self._store(key, mtime, prepared, getattr(prepared, "nbytes", 0))
+        return prepared
+
+    def _lookup(self, key, mtime):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == mtime:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        return None
+
+    def _load(self, path, mode, scale):
+        if scale == 1 and mode == "RGB":
+            from PIL import Image
+            with Image.open(path) as img:
+                return img.convert("RGB")
+        # Derive variants from the cached full-size colour template
+        base = self.get(path, "RGB", 1)
+        image = base.convert(mode) if mode != "RGB" else base
+        if scale > 1:
+            from PIL import Image
+            w, h = image.size
+            image = image.resize((max(1, w // scale), max(1, h // scale)), Image.BILINEAR)
+        return image
+
+    def _store(self, key, mtime, image, nbytes):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._entries[key] = (mtime, image, nbytes)
+            self._bytes += nbytes
+            # Always keep the newest entry, even if it alone exceeds the budget
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, _, evicted_bytes) = self._entries.popitem(last=False)
+                self._bytes -= evicted_bytes
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes}
@@ -0,0 +1,82 @@
+"""Chrome / Perfetto trace-event export of sequence runs.
+
+A ``RunTrace`` collects trace events (the JSON format read by
+chrome://tracing and ui.perfetto.dev) while one or more engines run:
+
+- a slice per run, per loop iteration and per step execution, with the
+  capture, match, input and sleep phases of a step nested inside it;
+- a ``polls`` counter updated on every poll tick of a wait;
+- an instant event for every jump a step takes (Goto Step, If Image
+  Found, If Pixel Color, Wait for Any Image branches);
+- for the Sequence Looper, a slice per cycle around the runs it contains.
+
+Events are kept in memory and written by ``save``. Timestamps are
+microseconds since the trace was created, all on one track so slices nest
+by time.
+"""
+import json
+import os
+import threading
+import time
+
+
+class RunTrace:
+    """Trace events for one run or one Sequence Looper session."""
+
+    def __init__(self, name="Sequence run"):
+        self.events = []
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()  # the looper and the engine may add events from different threads
+        self._pid = os.getpid()
+        self._add({"ph": "M", "name": "process_name", "args": {"name": "automation_maker"}})
+        self._add({"ph": "M", "name": "thread_name", "args": {"name": name}})
+
+    def _us(self, when):
+        return round((when - self._origin) * 1e6, 1)
+
+    def _add(self, event):
+        event.setdefault("pid", self._pid)
+        event.setdefault("tid", 1)
+        with self._lock:
+            self.events.append(event)
+
+    def slice(self, name, start, end, cat, args=None):
+        """A complete slice from ``start`` to ``end`` (perf_counter seconds)."""
+        event = {"ph": "X", "name": name, "cat": cat, "ts": self._us(start), "dur": round((end - start) * 1e6, 1)}
+        if args:
+            event["args"] = args
+        self._add(event)
+
+    def instant(self, name, when, cat, args=None):
+        event = {"ph": "i", "s": "t", "name": name, "cat": cat, "ts": self._us(when)}
+        if args:
+            event["args"] = args
+        self._add(event)
+
+    def counter(self, name, when, values):
+        self._add({"ph": "C", "name": name, "ts": self._us(when), "args": dict(values)})
+
+    def span(self, name, cat, args=None):
+        """Context manager recording a slice around its body."""
+        return _Span(self, name, cat, args)
+
+    def save(self, path):
+        with self._lock:
+            events = list(self.events)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+class _Span:
+    def __init__(self, trace, name, cat, args):
+        self._trace, self._name, self._cat, self._args = trace, name, cat, args
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._trace.slice(self._name, self._start, time.perf_counter(), self._cat, self._args)
+        return False